@@ -5,17 +5,25 @@ App package initialization
 from .config import (
     GEMINI_API_KEY,
     GEMINI_MODEL,
+    GEMINI_API_BASE,
     GEMINI_API_ENDPOINT,
+    GEMINI_BATCH_ENDPOINT,
+    MAX_PROMPT_CHARS,
     SUPABASE_URL,
     SUPABASE_KEY,
+    SUPABASE_JWT_SECRET,
+    USER_CACHE_TTL_SECONDS,
     NOTION_CLIENT_ID,
     NOTION_CLIENT_SECRET,
     NOTION_REDIRECT_URI,
     ALLOWED_ORIGINS,
+    CACHE_DIR,
+    CACHE_TTL_DAYS,
     FREE_TIER_LIMIT,
     ADMIN_TIER_LIMIT,
     DEVELOPER_USER_IDS,
     PREFERRED_LANGUAGES,
+    YTDLP_FALLBACK_ENABLED,
     LOG_LEVEL,
     setup_logging,
     validate_startup,
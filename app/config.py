@@ -16,11 +16,17 @@ load_dotenv()
 # Gemini API
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
-GEMINI_API_ENDPOINT = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:generateContent"
+GEMINI_API_BASE = "https://generativelanguage.googleapis.com"
+GEMINI_API_ENDPOINT = f"{GEMINI_API_BASE}/v1beta/models/{GEMINI_MODEL}:generateContent"
+GEMINI_BATCH_ENDPOINT = f"{GEMINI_API_BASE}/v1beta/models/{GEMINI_MODEL}:batchGenerateContent"
+# Longer plain transcripts are sampled (head, middle, tail) down to this size
+MAX_PROMPT_CHARS = int(os.getenv("MAX_PROMPT_CHARS", "200000"))
 
 # Supabase
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")  # Enables local token verification
+USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", "300"))
 
 # Notion OAuth
 NOTION_CLIENT_ID = os.getenv("NOTION_CLIENT_ID")
@@ -30,6 +36,10 @@ NOTION_REDIRECT_URI = os.getenv("NOTION_REDIRECT_URI", "https://watchlater.up.ra
 # CORS
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "*").split(",")
 
+# On-disk cache for transcripts, titles and generated notes
+CACHE_DIR = os.getenv("CACHE_DIR", "/var/cache/yt-summary")
+CACHE_TTL_DAYS = int(os.getenv("CACHE_TTL_DAYS", "7"))
+
 # Logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 
@@ -42,6 +52,9 @@ ADMIN_TIER_LIMIT = 100
 # Developer overrides (user IDs that get admin-tier limits)
 DEVELOPER_USER_IDS = os.getenv("DEVELOPER_USER_IDS", "").split(",")
 
+# Fall back to yt-dlp when the InnerTube caption lookup fails (slow, heavyweight)
+YTDLP_FALLBACK_ENABLED = os.getenv("YTDLP_FALLBACK", "true").lower() in ("1", "true", "yes")
+
 # Preferred transcript languages (shared across all extraction methods)
 PREFERRED_LANGUAGES = [
     'en', 'en-US', 'en-GB',  # English variants
@@ -37,6 +37,16 @@ class SummarizeRequest(BaseModel):
     transcript: Optional[str] = None  # Client-provided transcript (bypasses server fetch)
 
 
+class BulkSummarizeRequest(BaseModel):
+    """Request to summarize many videos via the (cheaper, slower) Gemini batch API."""
+    urls: List[str]
+
+
+class BatchSummarizeRequest(BaseModel):
+    """Request to summarize several videos concurrently in one call."""
+    requests: List[SummarizeRequest]
+
+
 class IngestRequest(BaseModel):
     """Request to ingest any content source (article, PDF, podcast)."""
     url: str
@@ -62,20 +72,21 @@ class UserProfile(BaseModel):
 
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TranscriptSegment:
-    """A segment of transcript with timestamp"""
+    """A segment of transcript with timestamp.
+    
+    Frozen because coalesced requests share the same segment list.
+    """
     text: str
     start_time: float  # seconds from start
     end_time: float    # seconds from start
     
     def timestamp_str(self) -> str:
         """Format as MM:SS or HH:MM:SS"""
-        mins, secs = divmod(int(self.start_time), 60)
-        hours, mins = divmod(mins, 60)
-        if hours > 0:
-            return f"{hours}:{mins:02d}:{secs:02d}"
-        return f"{mins}:{secs:02d}"
+        hours, rem = divmod(int(self.start_time), 3600)
+        mins, secs = divmod(rem, 60)
+        return f"{hours}:{mins:02d}:{secs:02d}" if hours else f"{mins}:{secs:02d}"
 
 
 @dataclass
@@ -7,22 +7,28 @@ Provides endpoints for:
 - Subscription sync
 """
 
-import json
-import base64
+import asyncio
+import hashlib
 import logging
 import secrets
-from typing import Optional
+import threading
+import time
+from typing import Dict, Optional, Tuple
 from datetime import datetime
+from urllib.parse import urlencode
 
 import httpx
+import jwt
+import orjson
 from fastapi import APIRouter, HTTPException, Depends, Header
 from fastapi.responses import RedirectResponse
 from pydantic import BaseModel
-from notion_client import Client as NotionClient
 
 from ..config import (
     SUPABASE_URL,
     SUPABASE_KEY,
+    SUPABASE_JWT_SECRET,
+    USER_CACHE_TTL_SECONDS,
     NOTION_CLIENT_ID,
     NOTION_CLIENT_SECRET,
     NOTION_REDIRECT_URI,
@@ -31,6 +37,8 @@ from ..config import (
     DEVELOPER_USER_IDS,
 )
 from ..models import UserProfile
+from ..services.apple_receipt import verify_signed_transaction, ReceiptValidationError
+from ..services.notion import exchange_oauth_code, find_summaries_database
 
 logger = logging.getLogger(__name__)
 
@@ -51,6 +59,253 @@ router = APIRouter(tags=["auth"])
 
 # ============ Auth Helpers ============
 
+class _TTLCache:
+    """Small thread-safe TTL cache: dict + monotonic expiry, oldest-first eviction.
+    
+    Locked because writes also come from worker threads (asyncio.to_thread).
+    """
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: Dict[str, Tuple[float, object]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key: str):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+    
+    def set(self, key: str, value, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if key not in self._data and len(self._data) >= self.maxsize:
+                for k in [k for k, (exp, _) in self._data.items() if exp < now]:
+                    del self._data[k]
+                while len(self._data) >= self.maxsize:
+                    del self._data[next(iter(self._data))]  # Oldest insertion
+            self._data[key] = (now + (self.ttl if ttl is None else ttl), value)
+    
+    def pop(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+# Verified profiles by user id. Entries are dropped (or, for usage increments,
+# updated) whenever this process writes to the users table, so the TTL only
+# bounds staleness from writes made elsewhere (dashboard edits, other replicas).
+USER_CACHE_MAX_ENTRIES = 10_000
+_user_cache = _TTLCache(USER_CACHE_MAX_ENTRIES, USER_CACHE_TTL_SECONDS)
+
+# Rendered /me responses, valid for as long as the cached profile they came from
+_me_cache = _TTLCache(USER_CACHE_MAX_ENTRIES, USER_CACHE_TTL_SECONDS)
+
+# Tokens Supabase Auth has accepted: blake2b(token) -> (user_id, email).
+# Only used without SUPABASE_JWT_SECRET; raw tokens are never stored.
+TOKEN_CACHE_TTL_SECONDS = 60
+_token_cache = _TTLCache(USER_CACHE_MAX_ENTRIES, TOKEN_CACHE_TTL_SECONDS)
+
+# users columns read by request handlers via get_current_user; add to this
+# when a handler starts reading a new field
+USER_PROFILE_COLUMNS = (
+    "id,email,notion_access_token,notion_database_id,subscription_tier,"
+    "summaries_this_month,summaries_reset_at,email_digest_enabled,email_digest_time,timezone"
+)
+
+
+def _cached_user(user_id: str) -> Optional[dict]:
+    user = _user_cache.get(user_id)
+    return dict(user) if user is not None else None  # Callers may mutate their copy
+
+
+def _remember_user(user: dict) -> None:
+    _user_cache.set(user["id"], dict(user))
+    _me_cache.pop(user["id"])
+
+
+_usage_lock = threading.Lock()
+
+
+def _count_cached_usage(user_id: str) -> None:
+    """Mirror a successful usage increment into the cached profile.
+    
+    Keeps check_rate_limit answering from memory after each summary instead of
+    re-reading the row; increments made by other replicas are bounded by the TTL.
+    """
+    with _usage_lock:  # Saves from jobs run in worker threads; don't lose a concurrent +1
+        user = _user_cache.get(user_id)
+        if user is not None:
+            _remember_user({**user, "summaries_this_month": user.get("summaries_this_month", 0) + 1})
+        else:
+            _me_cache.pop(user_id)
+
+
+def _forget_user(user_id: str) -> None:
+    """Drop a cached profile after the users row changes."""
+    _user_cache.pop(user_id)
+    _me_cache.pop(user_id)
+
+
+def _token_key(token: str) -> str:
+    return hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
+
+def _token_ttl(token: str) -> float:
+    """Cache lifetime for a verified token: never past its own expiry."""
+    try:
+        exp = jwt.decode(token, options={"verify_signature": False}).get("exp")
+    except jwt.InvalidTokenError:
+        return 0
+    if exp is None:
+        return TOKEN_CACHE_TTL_SECONDS
+    return min(TOKEN_CACHE_TTL_SECONDS, exp - time.time())
+
+
+def _verify_token(token: str) -> Tuple[str, Optional[str]]:
+    """Validate an access token and return (user_id, email).
+    
+    With SUPABASE_JWT_SECRET set the signature is checked locally (HS256),
+    avoiding a round-trip to Supabase Auth; otherwise Supabase is asked and
+    its answer is cached briefly per token.
+    """
+    if SUPABASE_JWT_SECRET:
+        try:
+            payload = jwt.decode(
+                token, SUPABASE_JWT_SECRET, algorithms=["HS256"], audience="authenticated"
+            )
+        except jwt.InvalidTokenError as e:
+            logger.debug(f"Local token verification failed: {e}")
+            raise HTTPException(status_code=401, detail="Invalid token")
+        return payload["sub"], payload.get("email")
+    
+    key = _token_key(token)
+    cached = _token_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    user_response = supabase.auth.get_user(token)
+    if not user_response.user:
+        _token_cache.pop(key)
+        raise HTTPException(status_code=401, detail="Invalid token")
+    identity = (user_response.user.id, user_response.user.email)
+    ttl = _token_ttl(token)
+    if ttl > 0:
+        _token_cache.set(key, identity, ttl=ttl)
+    return identity
+
+
+async def _identify(token: str) -> Tuple[str, Optional[str]]:
+    """_verify_token, with only the Supabase Auth round-trip moved off the event loop."""
+    if SUPABASE_JWT_SECRET or _token_cache.get(_token_key(token)) is not None:
+        return _verify_token(token)
+    return await asyncio.to_thread(_verify_token, token)
+
+
+# Profile misses arriving within this window share one users query
+PROFILE_BATCH_WINDOW_SECONDS = 0.005
+_pending_profiles: Dict[str, asyncio.Future] = {}
+_profile_flush: Optional[asyncio.Task] = None
+
+
+def _select_profiles(user_ids: list) -> Dict[str, dict]:
+    """Fetch users rows by id, Notion credentials included, in one query."""
+    result = supabase.table("users").select(USER_PROFILE_COLUMNS).in_("id", user_ids).execute()
+    return {row["id"]: row for row in result.data or []}
+
+
+async def _flush_profiles() -> None:
+    """Resolve every profile requested during the batch window with one query.
+    
+    A failed query fails every waiter: treating it as "no row" would make
+    _load_user_profile insert a duplicate of an existing user.
+    """
+    global _profile_flush
+    batch = {}
+    try:
+        try:
+            await asyncio.sleep(PROFILE_BATCH_WINDOW_SECONDS)
+        finally:
+            # Misses from here on start a new batch. Also runs on cancellation
+            # (loop shutdown), so no later request reuses this task or its futures
+            batch = dict(_pending_profiles)
+            _pending_profiles.clear()
+            if _profile_flush is asyncio.current_task():
+                _profile_flush = None
+        rows = await asyncio.to_thread(_select_profiles, list(batch))
+    except asyncio.CancelledError:
+        for future in batch.values():
+            future.cancel()
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching user profiles: {e}")
+        for future in batch.values():
+            if not future.done():
+                future.set_exception(e)
+        return
+    for user_id, future in batch.items():
+        if not future.done():
+            future.set_result(rows.get(user_id))
+
+
+def _profile_flush_done(task: asyncio.Task) -> None:
+    """Clean up after a flush cancelled before it ran (its finally never executes)."""
+    global _profile_flush
+    if _profile_flush is task:
+        _profile_flush = None
+        for future in _pending_profiles.values():
+            future.cancel()
+        _pending_profiles.clear()
+
+
+async def _fetch_profile_row(user_id: str) -> Optional[dict]:
+    """The user's row, or None; read together with other profiles requested meanwhile."""
+    global _profile_flush
+    future = _pending_profiles.get(user_id)
+    if future is None:
+        future = _pending_profiles[user_id] = asyncio.get_running_loop().create_future()
+        if _profile_flush is None:
+            _profile_flush = asyncio.create_task(_flush_profiles())
+            _profile_flush.add_done_callback(_profile_flush_done)
+    return await asyncio.shield(future)  # A cancelled request mustn't fail others waiting on the row
+
+
+def _create_user_profile(user_id: str, email: Optional[str]) -> dict:
+    """Insert a free-tier row for a first-time user. Blocking."""
+    logger.info(f"Creating new user profile for {user_id}")
+    new_user = {
+        "id": user_id,
+        "email": email,
+        "subscription_tier": "free",
+        "summaries_this_month": 0,
+    }
+    supabase.table("users").insert(new_user).execute()
+    return new_user
+
+
+async def _load_user_profile(user_id: str, email: Optional[str]) -> dict:
+    """Fetch (or create) the user's profile and cache it."""
+    user = await _fetch_profile_row(user_id)
+    if user is None:
+        return await asyncio.to_thread(_create_user_profile, user_id, email)
+    
+    user = dict(user)  # Rows are shared between requests in the same batch
+    # Apply developer override if applicable
+    if user_id in DEVELOPER_USER_IDS and user.get("subscription_tier") == "free":
+        user["subscription_tier"] = "admin"
+    _remember_user(user)
+    return user
+
+
 async def get_current_user(authorization: Optional[str] = Header(None)):
     """Verify JWT and return user from Supabase."""
     if not authorization:
@@ -62,39 +317,14 @@ async def get_current_user(authorization: Optional[str] = Header(None)):
     token = authorization.replace("Bearer ", "")
     
     try:
-        # Verify token with Supabase
-        user_response = supabase.auth.get_user(token)
-        if not user_response.user:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        
-        user_id = user_response.user.id
+        user_id, email = await _identify(token)
         logger.debug(f"Token valid for user {user_id}")
         
-        # Get user profile from our users table
-        try:
-            result = supabase.table("users").select("*").eq("id", user_id).execute()
-            existing_users = result.data if result.data else []
-        except Exception as e:
-            logger.error(f"Error fetching user profile: {e}")
-            existing_users = []
-        
-        if existing_users and len(existing_users) > 0:
-            user = existing_users[0]
-            # Apply developer override if applicable
-            if user_id in DEVELOPER_USER_IDS and user.get("subscription_tier") == "free":
-                user["subscription_tier"] = "admin"
+        user = _cached_user(user_id)
+        if user is not None:
             return user
         
-        # Create user profile if doesn't exist
-        logger.info(f"Creating new user profile for {user_id}")
-        new_user = {
-            "id": user_id,
-            "email": user_response.user.email,
-            "subscription_tier": "free",
-            "summaries_this_month": 0,
-        }
-        supabase.table("users").insert(new_user).execute()
-        return new_user
+        return await _load_user_profile(user_id, email)
         
     except HTTPException:
         raise
@@ -121,7 +351,7 @@ def check_rate_limit(user: dict) -> int:
     if reset_at and user_id:
         try:
             if isinstance(reset_at, str):
-                reset_date = datetime.fromisoformat(reset_at.replace("Z", "+00:00"))
+                reset_date = datetime.fromisoformat(reset_at)  # Accepts "Z" on 3.11+
             else:
                 reset_date = reset_at
             
@@ -130,10 +360,15 @@ def check_rate_limit(user: dict) -> int:
             # Robust month comparison (handles year rollover)
             if (now.year, now.month) > (reset_date.year, reset_date.month):
                 logger.info(f"Resetting monthly usage for user {user_id}")
+                # Conditional on the row still being from a past month, so when
+                # several requests race at the start of a month only the first
+                # resets, and usage they've already counted isn't zeroed again
+                month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
                 supabase.table("users").update({
                     "summaries_this_month": 0,
                     "summaries_reset_at": now.isoformat()
-                }).eq("id", user_id).execute()
+                }).eq("id", user_id).lt("summaries_reset_at", month_start.isoformat()).execute()
+                _forget_user(user_id)
                 return limit
         except Exception as e:
             logger.warning(f"Usage reset check failed: {e}")
@@ -150,9 +385,42 @@ def check_rate_limit(user: dict) -> int:
     return remaining
 
 
+def reset_monthly_usage() -> int:
+    """Zero every counter last reset before this month (scheduled; see main.py).
+    
+    Returns the number of users reset. check_rate_limit still resets a stale
+    row itself if a request arrives before the next scheduled run.
+    """
+    result = supabase.rpc("reset_monthly_summaries", {}).execute()
+    count = result.data if isinstance(result.data, int) else 0
+    if count:
+        # Cached profiles may carry last month's counters
+        _user_cache.clear()
+        _me_cache.clear()
+    return count
+
+
 def increment_usage(user_id: str):
     """Increment the user's monthly usage counter."""
     supabase.rpc("increment_summaries", {"p_user_id": user_id}).execute()
+    _count_cached_usage(user_id)
+
+
+def log_summary_and_increment(user_id: str, url: str, title: str,
+                              notion_url: Optional[str] = None) -> Optional[str]:
+    """Insert a summaries row and increment usage in one RPC (one transaction).
+    
+    Returns:
+        The new summary id
+    """
+    result = supabase.rpc("log_and_increment", {
+        "p_user_id": user_id,
+        "p_url": url,
+        "p_title": title,
+        "p_notion_url": notion_url,
+    }).execute()
+    _count_cached_usage(user_id)
+    return result.data or None
 
 
 # ============ Endpoints ============
@@ -194,8 +462,6 @@ async def sync_subscription(
     # --- JWS Verification (preferred) ---
     if body.signed_transaction:
         try:
-            from ..services.apple_receipt import verify_signed_transaction, ReceiptValidationError
-            
             txn = verify_signed_transaction(body.signed_transaction)
             
             # Use verified values instead of client-provided ones
@@ -233,7 +499,8 @@ async def sync_subscription(
         if expires_at:
             update_data["subscription_expires_at"] = expires_at.isoformat()
         
-        supabase.table("users").update(update_data).eq("id", user_id).execute()
+        await asyncio.to_thread(supabase.table("users").update(update_data).eq("id", user_id).execute)
+        _forget_user(user_id)
         
         logger.info(f"Subscription synced: user={user_id}, product={product_id}, verified={verified}")
         
@@ -278,11 +545,12 @@ async def downgrade_subscription(user: dict = Depends(get_current_user)):
         }
     
     try:
-        supabase.table("users").update({
+        await asyncio.to_thread(supabase.table("users").update({
             "subscription_tier": "free",
             "subscription_expires_at": None,
             "updated_at": datetime.now().isoformat(),
-        }).eq("id", user_id).execute()
+        }).eq("id", user_id).execute)
+        _forget_user(user_id)
         
         logger.info(f"Subscription downgraded: user={user_id} (pro → free)")
         
@@ -316,125 +584,90 @@ async def notion_auth_start(user_id: str):
     return {"auth_url": auth_url}
 
 
+def _find_notion_database(user_id: str, access_token: str) -> Optional[str]:
+    """Pick the database summaries are saved to after a Notion (re)connect.
+    
+    Passes the user's current database along so find_summaries_database can
+    reuse it when the new token still has access.
+    """
+    try:
+        rows = supabase.table("users").select("notion_database_id").eq("id", user_id).limit(1).execute().data
+        current_id = rows[0].get("notion_database_id") if rows else None
+    except Exception as e:
+        logger.warning(f"Could not read current Notion database for {user_id}: {e}")
+        current_id = None
+    return find_summaries_database(access_token, current_id)
+
+
+# App deep links for each OAuth outcome, encoded once
+_NOTION_CONNECTED_URL = "watchlater://notion-connected?"
+_NOTION_REDIRECTS = {
+    outcome: _NOTION_CONNECTED_URL + urlencode(params)
+    for outcome, params in {
+        "ok": {"success": "true"},
+        "server_not_configured": {"success": "false", "error": "server_not_configured"},
+        "token_exchange_failed": {"success": "false", "error": "token_exchange_failed"},
+        "unknown": {"success": "false", "error": "unknown"},
+    }.items()
+}
+
+
+def _notion_redirect(outcome: str) -> RedirectResponse:
+    return RedirectResponse(url=_NOTION_REDIRECTS[outcome], status_code=302)
+
+
 @router.get("/auth/notion/callback")
 async def notion_auth_callback(code: str, state: str):
     """Handle Notion OAuth callback."""
     try:
         if not NOTION_CLIENT_SECRET or not NOTION_CLIENT_ID:
             logger.error("Notion OAuth not configured")
-            return RedirectResponse(url="watchlater://notion-connected?success=false&error=server_not_configured")
+            return _notion_redirect("server_not_configured")
         
         user_id = state.split(":")[0]
         logger.info(f"Notion OAuth callback for user: {user_id}")
         
-        token_url = "https://api.notion.com/v1/oauth/token"
-        credentials = base64.b64encode(f"{NOTION_CLIENT_ID}:{NOTION_CLIENT_SECRET}".encode()).decode()
-        
-        data = {
-            "grant_type": "authorization_code",
-            "code": code,
-            "redirect_uri": NOTION_REDIRECT_URI
-        }
-        
         try:
-            async with httpx.AsyncClient() as client:
-                token_response = await client.post(
-                    token_url,
-                    json=data,
-                    headers={
-                        'Content-Type': 'application/json',
-                        'Authorization': f'Basic {credentials}'
-                    },
-                    timeout=15.0
-                )
-                if token_response.status_code != 200:
-                    logger.error(f"Notion token exchange failed: {token_response.status_code} - {token_response.text}")
-                    return RedirectResponse(url="watchlater://notion-connected?success=false&error=token_exchange_failed")
-                token_data = token_response.json()
+            token_response = await exchange_oauth_code(
+                code, NOTION_REDIRECT_URI, NOTION_CLIENT_ID, NOTION_CLIENT_SECRET
+            )
+            if token_response.status_code != 200:
+                logger.error(f"Notion token exchange failed: {token_response.status_code} - {token_response.text}")
+                return _notion_redirect("token_exchange_failed")
+            token_data = orjson.loads(token_response.content)
         except httpx.RequestError as e:
             logger.error(f"Notion token exchange network error: {e}")
-            return RedirectResponse(url="watchlater://notion-connected?success=false&error=token_exchange_failed")
+            return _notion_redirect("token_exchange_failed")
         
         access_token = token_data.get("access_token")
         workspace_name = token_data.get("workspace_name")
         logger.info(f"Got Notion token for workspace: {workspace_name}")
         
-        notion = NotionClient(auth=access_token)
-        search_results = notion.search(filter={"property": "object", "value": "database"}).get("results", [])
+        database_id = await asyncio.to_thread(_find_notion_database, user_id, access_token)
         
-        database_id = None
-        first_database_id = None
-        
-        for db in search_results:
-            if not first_database_id:
-                first_database_id = db["id"]
-            
-            title = db.get("title", [{}])[0].get("plain_text", "")
-            title_lower = title.lower()
-            
-            keywords = ["youtube", "watch", "summary", "video", "notes", "learning", "lecture", "content"]
-            if any(kw in title_lower for kw in keywords):
-                database_id = db["id"]
-                logger.info(f"Found matching database: {title} ({database_id})")
-                break
-        
-        if not database_id and first_database_id:
-            logger.info(f"No keyword match - using first available database: {first_database_id}")
-            database_id = first_database_id
-        
-        if not database_id:
-            logger.info("No databases found - attempting to create 'YouTube Summaries' database")
-            try:
-                page_results = notion.search(filter={"property": "object", "value": "page"}).get("results", [])
-                
-                if page_results:
-                    parent_page_id = page_results[0]["id"]
-                    new_db = notion.databases.create(
-                        parent={"type": "page_id", "page_id": parent_page_id},
-                        title=[{"type": "text", "text": {"content": "YouTube Summaries"}}],
-                        properties={
-                            "Title": {"title": {}},
-                            "URL": {"url": {}},
-                            "Type": {
-                                "select": {
-                                    "options": [
-                                        {"name": "Lecture", "color": "blue"},
-                                        {"name": "Tutorial", "color": "green"},
-                                        {"name": "Interview", "color": "purple"},
-                                        {"name": "Documentary", "color": "orange"},
-                                        {"name": "General", "color": "gray"}
-                                    ]
-                                }
-                            },
-                            "Date Added": {"date": {}}
-                        }
-                    )
-                    database_id = new_db["id"]
-                    logger.info(f"Created new database: YouTube Summaries ({database_id})")
-                else:
-                    logger.warning("No pages found to use as parent")
-                    
-            except Exception as db_create_err:
-                logger.error(f"Failed to create database: {db_create_err}")
-        
-        supabase.table("users").update({
+        await asyncio.to_thread(supabase.table("users").update({
             "notion_access_token": access_token,
             "notion_database_id": database_id,
             "notion_workspace": workspace_name
-        }).eq("id", user_id).execute()
+        }).eq("id", user_id).execute)
+        _forget_user(user_id)
         
         logger.info(f"Notion connected for user {user_id}")
         
-        return RedirectResponse(url="watchlater://notion-connected?success=true")
+        return _notion_redirect("ok")
         
     except Exception as e:
         logger.error(f"Notion OAuth callback error: {e}", exc_info=True)
-        return RedirectResponse(url="watchlater://notion-connected?success=false&error=unknown")
+        return _notion_redirect("unknown")
 
 
 @router.get("/me")
 async def get_profile(user: dict = Depends(get_current_user)):
     """Get current user profile."""
+    cached = _me_cache.get(user["id"])
+    if cached is not None:
+        return cached
+    
     tier = user.get("subscription_tier", "free")
     used = user.get("summaries_this_month", 0)
     limit = ADMIN_TIER_LIMIT if tier == "admin" else FREE_TIER_LIMIT
@@ -450,12 +683,14 @@ async def get_profile(user: dict = Depends(get_current_user)):
     )
     
     # Add email digest preferences
-    return {
+    response = {
         **profile.model_dump(),
         "email_digest_enabled": user.get("email_digest_enabled", True),
         "email_digest_time": user.get("email_digest_time", "20:00"),
         "timezone": user.get("timezone", "UTC"),
     }
+    _me_cache.set(user["id"], response)
+    return response
 
 
 class EmailPreferencesRequest(BaseModel):
@@ -504,7 +739,8 @@ async def update_email_preferences(
         update_data["timezone"] = body.timezone
     
     try:
-        supabase.table("users").update(update_data).eq("id", user_id).execute()
+        await asyncio.to_thread(supabase.table("users").update(update_data).eq("id", user_id).execute)
+        _forget_user(user_id)
         
         return {
             "success": True,
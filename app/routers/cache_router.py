@@ -0,0 +1,33 @@
+"""
+Cache administration router.
+
+Lets admins drop cached transcripts, titles and notes for a video so the
+next request regenerates them (e.g. after captions were fixed upstream).
+"""
+
+import logging
+from fastapi import APIRouter, Depends, HTTPException
+
+from ..services.cache import invalidate_video
+from ..services.youtube import extract_video_id, forget_title
+from .auth import get_current_user
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["cache"])
+
+
+@router.delete("/cache/{video_id}")
+async def delete_video_cache(video_id: str, user: dict = Depends(get_current_user)):
+    """Invalidate every cached artifact for a video (admin only)."""
+    if user.get("subscription_tier") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    resolved_id = extract_video_id(video_id)
+    if not resolved_id:
+        raise HTTPException(status_code=400, detail="Invalid YouTube video ID")
+    
+    removed = invalidate_video(resolved_id)
+    forget_title(resolved_id)
+    logger.info(f"Cache invalidated for {resolved_id} by {user['id']}: {removed} entries")
+    return {"success": True, "video_id": resolved_id, "removed": removed}
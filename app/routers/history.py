@@ -5,14 +5,19 @@ Provides endpoint for fetching user's summary history with search and pagination
 and individual summary detail with full content for in-app reading.
 """
 
+import asyncio
 import logging
+import re
 from typing import List, Optional
 from pydantic import BaseModel
 from fastapi import APIRouter, Depends, Request, Query, HTTPException
+from fastapi.responses import Response
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
 from .auth import get_current_user, supabase
+from ..services.exporters.formats import export_summary
+from ..services.youtube import extract_video_id
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +26,9 @@ router = APIRouter(tags=["history"])
 # Rate limiter for abuse prevention
 limiter = Limiter(key_func=get_remote_address)
 
+# Characters stripped from titles when building export filenames
+_UNSAFE_FILENAME_RE = re.compile(r'[^\w\s-]')
+
 
 class SummaryItem(BaseModel):
     """A summary history item."""
@@ -83,7 +91,7 @@ async def get_summaries(
         # Ordering and pagination
         query = query.order("created_at", desc=True).range(offset, offset + limit - 1)
         
-        result = query.execute()
+        result = await asyncio.to_thread(query.execute)
         return result.data if result.data else []
         
     except Exception as e:
@@ -100,13 +108,13 @@ async def get_summary_detail(
 ):
     """Get full summary detail including content for in-app reading."""
     try:
-        result = (
+        query = (
             supabase.table("summaries")
             .select("id, youtube_url, title, notion_url, created_at")
             .eq("id", summary_id)
             .eq("user_id", user["id"])
-            .execute()
         )
+        result = await asyncio.to_thread(query.execute)
         
         if not result.data:
             raise HTTPException(status_code=404, detail="Summary not found")
@@ -129,18 +137,15 @@ async def export_summary_endpoint(
     format: str = Query("markdown", description="Export format: markdown, html, text"),
 ):
     """Export a summary in the requested format for Obsidian, Apple Notes, etc."""
-    from fastapi.responses import Response
-    from ..services.exporters.formats import export_summary
-    
     try:
         # Fetch the full summary
-        result = (
+        query = (
             supabase.table("summaries")
             .select("id, youtube_url, title, notion_url, created_at")
             .eq("id", summary_id)
             .eq("user_id", user["id"])
-            .execute()
         )
+        result = await asyncio.to_thread(query.execute)
         
         if not result.data:
             raise HTTPException(status_code=404, detail="Summary not found")
@@ -150,13 +155,7 @@ async def export_summary_endpoint(
         if not summary.get("summary_json"):
             raise HTTPException(status_code=404, detail="Export not available — summary content is not stored in database")
         
-        # Extract video_id from youtube_url
-        yt_url = summary.get("youtube_url", "")
-        vid = ""
-        if "v=" in yt_url:
-            vid = yt_url.split("v=")[1].split("&")[0]
-        elif "youtu.be/" in yt_url:
-            vid = yt_url.split("youtu.be/")[1].split("?")[0]
+        vid = extract_video_id(summary.get("youtube_url") or "") or ""
         
         try:
             content, content_type = export_summary(summary, fmt=format, video_id=vid)
@@ -165,8 +164,7 @@ async def export_summary_endpoint(
         
         # Build filename
         # Build filename — sanitize for safe download
-        import re as _re
-        title_slug = _re.sub(r'[^\w\s-]', '', (summary.get("title") or "summary"))[:50].strip().replace(" ", "_")
+        title_slug = _UNSAFE_FILENAME_RE.sub('', (summary.get("title") or "summary"))[:50].strip().replace(" ", "_")
         if not title_slug:
             title_slug = "summary"
         ext_map = {"markdown": "md", "md": "md", "html": "html", "text": "txt", "txt": "txt"}
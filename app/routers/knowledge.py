@@ -7,6 +7,7 @@ a user's cross-video knowledge map.
 
 import asyncio
 import logging
+import uuid
 from fastapi import APIRouter, Depends, Request, HTTPException
 from slowapi import Limiter
 from slowapi.util import get_remote_address
@@ -18,6 +19,7 @@ from ..services.knowledge_map import (
     update_notion_url,
 )
 from ..services.jobs import create_job, update_job, JobStatus
+from ..services.notion import create_knowledge_map_page
 
 logger = logging.getLogger(__name__)
 
@@ -60,20 +62,19 @@ async def build_map(request: Request, user: dict = Depends(get_current_user)):
     Creates an async job (same pattern as /summarize) and returns
     a job_id for polling via /status/{job_id}.
     """
-    import uuid
     user_id = user["id"]
     
     # Create a job for tracking (without youtube_url since this isn't a video job)
     job_id = str(uuid.uuid4())
     try:
-        supabase.table("jobs").insert({
+        await asyncio.to_thread(supabase.table("jobs").insert({
             "id": job_id,
             "user_id": user_id,
             "youtube_url": "knowledge-map-build",
             "status": "pending",
             "progress": 0,
             "stage": "queued",
-        }).execute()
+        }).execute)
     except Exception as e:
         logger.warning(f"Job creation failed: {e}")
     
@@ -109,8 +110,8 @@ async def _build_map_job(job_id: str, user_id: str, user: dict):
         if notion_token and notion_db_id:
             try:
                 await update_job(job_id, progress=85, stage="Saving to Notion...")
-                from ..services.notion import create_knowledge_map_page
-                notion_url = create_knowledge_map_page(
+                notion_url = await asyncio.to_thread(
+                    create_knowledge_map_page,
                     notion_token=notion_token,
                     database_id=notion_db_id,
                     knowledge_map=knowledge_map,
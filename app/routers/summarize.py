@@ -7,54 +7,139 @@ Jobs are created immediately and processed in the background.
 
 import asyncio
 import logging
-from typing import Optional
+import re
+import time
+from typing import Awaitable, Callable, Dict, List, NoReturn, Optional, Tuple, TypeVar
 from fastapi import APIRouter, HTTPException, Depends, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 
-from ..models import SummarizeRequest, SummarizeResponse, IngestRequest, TranscriptSegment, SourceType
-from ..services.youtube import extract_video_id, get_transcript_with_timestamps
-from ..services.gemini import process_long_transcript
-from ..services.notion import create_lecture_notes_page
-from ..services.jobs import create_job, update_job, JobStatus
-from .auth import get_current_user, check_rate_limit, increment_usage, supabase
+from ..models import (
+    SummarizeRequest, SummarizeResponse, IngestRequest, BulkSummarizeRequest,
+    BatchSummarizeRequest,
+    TranscriptSegment, SourceType, LectureNotes, ContentType,
+)
+from ..services.youtube import extract_video_id, get_transcript_with_timestamps, transcript_pool
+from ..services.extractors import detect_source_type, extract_content
+from ..services.gemini import (
+    process_long_transcript, prepare_segments_prompt, submit_batch, get_batch, batch_state,
+    download_batch_results, notes_from_batch_response,
+    BATCH_SUCCEEDED_STATES, BATCH_FAILED_STATES,
+)
+from ..services.notion import check_database_access, create_lecture_notes_page
+from ..services.jobs import create_job, update_job, find_idle_jobs, JobStatus
+from ..services.cache import content_hash
+from .auth import get_current_user, check_rate_limit, log_summary_and_increment, _load_user_profile
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["summarize"])
 
+T = TypeVar("T")
 
-def get_friendly_error(error: str) -> str:
-    """Convert technical error messages to user-friendly ones."""
-    error_lower = error.lower()
-    
-    if "subtitles are disabled" in error_lower or "transcriptsdisabled" in error_lower:
-        return "This video doesn't have subtitles enabled. The video owner has disabled captions."
-    
-    if "no subtitles available" in error_lower or "no transcript" in error_lower:
-        return "No subtitles available for this video. Try a different video."
-    
-    if "sign in to confirm you're not a bot" in error_lower or "cookies" in error_lower:
-        return "Unable to access this video right now. Please try again in a few minutes."
-    
-    if "invalid" in error_lower and "url" in error_lower:
-        return "Invalid YouTube URL. Please paste a valid YouTube link."
-    
-    if "could not extract video id" in error_lower:
-        return "Couldn't recognize this as a YouTube video. Please check the URL."
-    
-    if "timeout" in error_lower or "connection" in error_lower:
-        return "Connection error. Please check your internet and try again."
+# In-flight work keyed by video, so concurrent requests for the same video
+# share one transcript fetch and one Gemini run (Notion pages stay per-user)
+_inflight: Dict[str, asyncio.Future] = {}
+
+
+async def coalesce(key: str, work: Callable[[], Awaitable[T]]) -> T:
+    """Run `work` once per key; concurrent callers with the same key await its result.
     
-    if "rate limit" in error_lower or "too many requests" in error_lower:
-        return "Too many requests. Please wait a moment and try again."
+    Failures propagate to every waiter. Nothing is retained after the work
+    finishes: later callers start fresh (and hit the disk cache instead).
+    """
+    fut = _inflight.get(key)
+    if fut is not None:
+        try:
+            return await asyncio.shield(fut)
+        except asyncio.CancelledError:
+            if not fut.cancelled() or asyncio.current_task().cancelling():
+                raise
+            # The leader's job was cancelled, not ours: take over the work
+            return await coalesce(key, work)
     
+    fut = asyncio.get_running_loop().create_future()
+    _inflight[key] = fut
+    try:
+        result = await work()
+    except BaseException as e:
+        if isinstance(e, asyncio.CancelledError):
+            fut.cancel()
+        else:
+            fut.set_exception(e)
+            fut.exception()  # Mark retrieved: there may be no other waiters
+        raise
+    else:
+        fut.set_result(result)
+        return result
+    finally:
+        del _inflight[key]
+
+
+async def _fetch_transcript(url: str) -> Tuple[List[TranscriptSegment], str, str]:
+    """get_transcript_with_timestamps on the dedicated transcript pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(transcript_pool, get_transcript_with_timestamps, url)
+
+
+# Friendly messages by error category, in priority order: when several
+# categories match, the first one listed here wins
+_FRIENDLY_ERRORS = {
+    "no_subs": "This video doesn't have subtitles enabled. The video owner has disabled captions.",
+    "no_trans": "No subtitles available for this video. Try a different video.",
+    "bot": "Unable to access this video right now. Please try again in a few minutes.",
+    "url": "Invalid YouTube URL. Please paste a valid YouTube link.",
+    "video_id": "Couldn't recognize this as a YouTube video. Please check the URL.",
+    "net": "Connection error. Please check your internet and try again.",
+    "rate": "Too many requests. Please wait a moment and try again.",
+    "notion": "Couldn't access your Notion database. Please reconnect Notion in Settings.",
     # PoToken enforcement (YouTube 2026+)
-    if "potoken" in error_lower or "authentication token" in error_lower:
-        return "This video has restricted captions that require additional verification. Please try a different video."
-    
+    "potoken": "This video has restricted captions that require additional verification. Please try a different video.",
     # Multiple empty responses = PoToken enforcement
-    if "multiple empty responses" in error_lower:
-        return "This video's captions are protected. Please try a different video."
+    "empty": "This video's captions are protected. Please try a different video.",
+}
+
+# One case-insensitive pass finds every category present in the message. The
+# outer lookahead makes matches zero-width, so a phrase can't consume the start
+# of a higher-priority one that overlaps it. Only literal phrases, so the scan
+# stays linear in the message length
+_ERROR_RE = re.compile(
+    r"(?="
+    r"(?P<no_subs>subtitles are disabled|transcriptsdisabled)"
+    r"|(?P<no_trans>no subtitles available|no transcript)"
+    r"|(?P<bot>sign in to confirm you're not a bot|cookies)"
+    r"|(?P<url_invalid>invalid)|(?P<url_word>url)"  # Both present (any order) means "url"
+    r"|(?P<video_id>could not extract video id)"
+    r"|(?P<net>timeout|connection)"
+    r"|(?P<rate>rate limit|too many requests)"
+    r"|(?P<notion>notion database not accessible)"
+    r"|(?P<potoken>potoken|authentication token)"
+    r"|(?P<empty>multiple empty responses)"
+    r")",
+    re.IGNORECASE,
+)
+_ERROR_RANK = {category: rank for rank, category in enumerate(_FRIENDLY_ERRORS)}
+_URL_PARTS = frozenset({"url_invalid", "url_word"})
+_ERROR_MESSAGES = list(_FRIENDLY_ERRORS.values())
+
+
+def get_friendly_error(error: str) -> str:
+    """Convert technical error messages to user-friendly ones."""
+    best = None
+    url_parts = set()
+    for match in _ERROR_RE.finditer(error):
+        category = match.lastgroup
+        if category in _URL_PARTS:
+            url_parts.add(category)
+            if url_parts != _URL_PARTS:
+                continue
+            category = "url"
+        rank = _ERROR_RANK[category]
+        if best is None or rank < best:
+            best = rank
+            if rank == 0:
+                break  # Nothing outranks the first category
+    if best is not None:
+        return _ERROR_MESSAGES[best]
     
     if len(error) > 100:
         return "Something went wrong. Please try a different video."
@@ -62,6 +147,51 @@ def get_friendly_error(error: str) -> str:
     return error
 
 
+def _raise_first(job_id: str, eg: ExceptionGroup) -> NoReturn:
+    """Re-raise a TaskGroup's first error, logging the others so they aren't lost."""
+    for extra in eg.exceptions[1:]:
+        logger.warning(f"Job {job_id[:8]}: Also failed: {extra}")
+    raise eg.exceptions[0]
+
+
+def save_notes(
+    job_id: str,
+    user: dict,
+    url: str,
+    notes: LectureNotes,
+    video_url: str,
+    video_id: str = ""
+) -> Tuple[Optional[str], Optional[str]]:
+    """Persist generated notes: Notion page (if connected), then summary row + usage count.
+    
+    Only the Notion write can raise; the summary/usage RPC is best-effort.
+    
+    Returns:
+        Tuple of (notion_url, summary_id)
+    """
+    notion_token = user.get("notion_access_token")
+    database_id = user.get("notion_database_id")
+    
+    notion_url = None
+    if notion_token and database_id:
+        notion_url = create_lecture_notes_page(
+            notion_token=notion_token,
+            database_id=database_id,
+            notes=notes,
+            video_url=video_url,
+            video_id=video_id
+        )
+    
+    # Log summary + increment usage in one round-trip (non-critical)
+    summary_id = None
+    try:
+        summary_id = log_summary_and_increment(user["id"], url, notes.title, notion_url)
+    except Exception as log_err:
+        logger.warning(f"Job {job_id[:8]}: Summary logging failed: {log_err}")
+    
+    return notion_url, summary_id
+
+
 async def process_summarization_job(
     job_id: str,
     user: dict,
@@ -88,13 +218,29 @@ async def process_summarization_job(
             logger.info(f"Job {job_id[:8]}: Using client-provided transcript")
             segments = [TranscriptSegment(text=transcript, start_time=0, end_time=0)]
             video_title = None
-            await update_job(job_id, progress=25, stage="Transcript received")
+            progress = update_job(job_id, progress=25, stage="Transcript received")
+            if notion_token and database_id:
+                await asyncio.gather(progress, asyncio.to_thread(check_database_access, notion_token, database_id))
+            else:
+                await progress
         else:
             if client_extraction_failed:
                 logger.info(f"Job {job_id[:8]}: Client extraction failed, attempting server-side")
             else:
                 logger.info(f"Job {job_id[:8]}: No transcript provided, fetching server-side")
-            segments, transcript, video_title = get_transcript_with_timestamps(url)
+            try:
+                # Check the Notion database while the transcript downloads, so a
+                # revoked token fails now instead of after Gemini has run
+                async with asyncio.TaskGroup() as tg:
+                    fetch = tg.create_task(coalesce(
+                        f"transcript:{video_id}",
+                        lambda: _fetch_transcript(url),
+                    ))
+                    if notion_token and database_id:
+                        tg.create_task(asyncio.to_thread(check_database_access, notion_token, database_id))
+            except ExceptionGroup as eg:
+                _raise_first(job_id, eg)
+            segments, transcript, video_title = fetch.result()
             await update_job(job_id, progress=25, stage="Transcript extracted")
         
         logger.info(f"Job {job_id[:8]}: Got {len(segments)} segments ({len(transcript)} chars)")
@@ -105,46 +251,30 @@ async def process_summarization_job(
         # Stage 3: Summarization (50-85%) - longest stage
         await update_job(job_id, progress=50, stage="Generating summary")
         logger.info(f"Job {job_id[:8]}: Generating lecture notes")
-        notes = process_long_transcript(segments, video_title, video_id)
+        notes = await coalesce(
+            f"notes:{video_id}:{content_hash(transcript)}",
+            lambda: process_long_transcript(segments, video_title, video_id),
+        )
         await update_job(job_id, progress=85, stage="Summary complete")
         logger.info(f"Job {job_id[:8]}: Generated: {notes.title}")
         
         # Stage 4: Notion (85-100%) — only if user has Notion connected
-        notion_url = None
         if notion_token and database_id:
-            await update_job(job_id, progress=90, stage="Saving to Notion")
+            stage = "Saving to Notion"
             logger.info(f"Job {job_id[:8]}: Creating Notion page")
-            notion_url = create_lecture_notes_page(
-                notion_token=notion_token,
-                database_id=database_id,
-                notes=notes,
-                video_url=f"https://youtu.be/{video_id}",
-                video_id=video_id
-            )
         else:
+            stage = "Saving summary"
             logger.info(f"Job {job_id[:8]}: Notion not connected, skipping")
-            await update_job(job_id, progress=90, stage="Saving summary")
-        
-        # Increment usage (non-critical)
-        try:
-            increment_usage(user["id"])
-        except Exception as usage_err:
-            logger.warning(f"Job {job_id[:8]}: Usage increment failed: {usage_err}")
-        
-        # Log summary with full content (non-critical)
-        summary_id = None
-        try:
-            summary_data = {
-                "user_id": user["id"],
-                "youtube_url": url,
-                "title": notes.title,
-                "notion_url": notion_url,
-            }
-            result = supabase.table("summaries").insert(summary_data).execute()
-            if result.data:
-                summary_id = result.data[0].get("id")
-        except Exception as log_err:
-            logger.warning(f"Job {job_id[:8]}: Summary logging failed: {log_err}")
+        # The progress write and the save go to different services; overlap
+        # them (update_job never raises, so save errors still fail the job)
+        _, (notion_url, summary_id) = await asyncio.gather(
+            update_job(job_id, progress=90, stage=stage),
+            asyncio.to_thread(
+                save_notes, job_id, user, url, notes,
+                video_url=f"https://youtu.be/{video_id}",
+                video_id=video_id,
+            ),
+        )
         
         # Complete!
         await update_job(
@@ -189,7 +319,7 @@ async def summarize(request: Request, body: SummarizeRequest, user: dict = Depen
     
     try:
         # Check user-level rate limit (monthly quota)
-        remaining = check_rate_limit(user)
+        remaining = await asyncio.to_thread(check_rate_limit, user)
         
         # Validate URL
         video_id = extract_video_id(body.url)
@@ -212,7 +342,7 @@ async def summarize(request: Request, body: SummarizeRequest, user: dict = Depen
         )
         
         # Return immediately with job ID (HTTP 202 Accepted)
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=202,
             content={
                 "job_id": job.id,
@@ -230,6 +360,88 @@ async def summarize(request: Request, body: SummarizeRequest, user: dict = Depen
         raise HTTPException(status_code=500, detail=get_friendly_error(error_msg))
 
 
+# ============ Concurrent batch ============
+
+BATCH_MAX_REQUESTS = 50
+BATCH_CONCURRENCY = 8
+
+
+async def process_batch_jobs(jobs: List[Tuple[str, SummarizeRequest, str]], user: dict):
+    """Run summarization jobs concurrently, at most BATCH_CONCURRENCY at a time.
+    
+    Args:
+        jobs: (job_id, request, video_id) tuples, one per video
+        user: The authenticated user, shared by every job
+    """
+    sem = asyncio.Semaphore(BATCH_CONCURRENCY)
+    
+    async def _one(job_id: str, item: SummarizeRequest, video_id: str):
+        async with sem:
+            await process_summarization_job(
+                job_id=job_id,
+                user=user,
+                url=item.url,
+                transcript=item.transcript,
+                video_id=video_id
+            )
+    
+    # Each job records its own failure, so one bad video doesn't stop the rest
+    await asyncio.gather(*(_one(*job) for job in jobs), return_exceptions=True)
+
+
+@router.post("/summarize/batch")
+async def summarize_batch(request: Request, body: BatchSummarizeRequest, user: dict = Depends(get_current_user)):
+    """Create summarization jobs for several videos in one call (authenticated).
+    
+    Auth and the quota check happen once for the whole batch. Videos are
+    processed concurrently in the background through the regular pipeline;
+    each gets its own job, so poll /status/{job_id} per video.
+    """
+    try:
+        if not body.requests:
+            raise HTTPException(status_code=400, detail="Provide at least one request")
+        if len(body.requests) > BATCH_MAX_REQUESTS:
+            raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_REQUESTS} requests per batch")
+        
+        video_ids = [extract_video_id(item.url) for item in body.requests]
+        for item, video_id in zip(body.requests, video_ids):
+            if not video_id:
+                raise HTTPException(status_code=400, detail=f"Invalid YouTube URL: {item.url}")
+        
+        # Every video counts against the monthly quota
+        remaining = await asyncio.to_thread(check_rate_limit, user)
+        if remaining != -1 and len(body.requests) > remaining:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Only {remaining} summaries left this month. Upgrade to Pro for unlimited summaries."
+            )
+        
+        jobs = []
+        for item, video_id in zip(body.requests, video_ids):
+            job = await create_job(user["id"], item.url)
+            jobs.append((job.id, item, video_id))
+        logger.info(f"Created {len(jobs)} batch jobs for user {user['id']}")
+        
+        asyncio.create_task(process_batch_jobs(jobs, user))
+        
+        return ORJSONResponse(
+            status_code=202,
+            content={
+                "jobs": [{"url": item.url, "job_id": job_id} for job_id, item, _ in jobs],
+                "status": "pending",
+                "message": "Jobs created. Poll /status/{job_id} for progress.",
+                "remaining": remaining - len(jobs) if remaining > 0 else -1
+            }
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        error_msg = str(e)
+        logger.error(f"Error creating batch jobs: {error_msg}")
+        raise HTTPException(status_code=500, detail=get_friendly_error(error_msg))
+
+
 async def process_ingest_job(
     job_id: str,
     user: dict,
@@ -238,58 +450,39 @@ async def process_ingest_job(
     content: Optional[str] = None,
 ):
     """Background task to process a non-YouTube content ingestion job."""
-    from ..services.extractors import extract_content
-    
     try:
         notion_token = user.get("notion_access_token")
         database_id = user.get("notion_database_id")
         
         # Stage 1: Extract content (0-30%)
         await update_job(job_id, status=JobStatus.PROCESSING, progress=5, stage="Extracting content")
-        segments, title, detected_type = extract_content(url, source_type=source_type, content=content)
+        # Page fetches and PDF parsing are blocking; keep them off the event loop,
+        # and check the Notion database meanwhile so a revoked token fails before Gemini
+        try:
+            async with asyncio.TaskGroup() as tg:
+                extract = tg.create_task(asyncio.to_thread(
+                    extract_content, url, source_type=source_type, content=content
+                ))
+                if notion_token and database_id:
+                    tg.create_task(asyncio.to_thread(check_database_access, notion_token, database_id))
+        except ExceptionGroup as eg:
+            _raise_first(job_id, eg)
+        segments, title, detected_type = extract.result()
         await update_job(job_id, progress=30, stage="Content extracted")
         logger.info(f"Job {job_id[:8]}: Extracted {len(segments)} segments from {detected_type.value}")
         
         # Stage 2: Summarization (30-85%)
         await update_job(job_id, progress=40, stage="Generating summary")
-        notes = process_long_transcript(segments, title, video_id="")
+        notes = await process_long_transcript(segments, title, video_id="")
         await update_job(job_id, progress=85, stage="Summary complete")
         logger.info(f"Job {job_id[:8]}: Generated: {notes.title}")
         
         # Stage 3: Notion (85-95%) — only if connected
-        notion_url = None
-        if notion_token and database_id:
-            await update_job(job_id, progress=90, stage="Saving to Notion")
-            notion_url = create_lecture_notes_page(
-                notion_token=notion_token,
-                database_id=database_id,
-                notes=notes,
-                video_url=url,
-                video_id=""
-            )
-        else:
-            await update_job(job_id, progress=90, stage="Saving summary")
-        
-        # Increment usage
-        try:
-            increment_usage(user["id"])
-        except Exception:
-            pass
-        
-        # Store in Supabase
-        summary_id = None
-        try:
-            summary_data = {
-                "user_id": user["id"],
-                "youtube_url": url,
-                "title": notes.title,
-                "notion_url": notion_url,
-            }
-            result = supabase.table("summaries").insert(summary_data).execute()
-            if result.data:
-                summary_id = result.data[0].get("id")
-        except Exception as log_err:
-            logger.warning(f"Job {job_id[:8]}: Summary logging failed: {log_err}")
+        stage = "Saving to Notion" if notion_token and database_id else "Saving summary"
+        _, (notion_url, summary_id) = await asyncio.gather(
+            update_job(job_id, progress=90, stage=stage),
+            asyncio.to_thread(save_notes, job_id, user, url, notes, video_url=url, video_id=""),
+        )
         
         await update_job(
             job_id,
@@ -325,10 +518,9 @@ async def ingest(request: Request, body: IngestRequest, user: dict = Depends(get
     Returns immediately with a job_id. Poll /status/{job_id} for progress.
     """
     try:
-        remaining = check_rate_limit(user)
+        remaining = await asyncio.to_thread(check_rate_limit, user)
         
         # Auto-detect source type if not provided
-        from ..services.extractors import detect_source_type
         source_type = body.source_type or detect_source_type(body.url)
         
         if source_type == SourceType.YOUTUBE:
@@ -351,7 +543,7 @@ async def ingest(request: Request, body: IngestRequest, user: dict = Depends(get
             )
         )
         
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=202,
             content={
                 "job_id": job.id,
@@ -368,3 +560,210 @@ async def ingest(request: Request, body: IngestRequest, user: dict = Depends(get
         error_msg = str(e)
         logger.error(f"Error creating ingest job: {error_msg}")
         raise HTTPException(status_code=500, detail=get_friendly_error(error_msg))
+
+
+# ============ Bulk (Gemini Batch API) ============
+
+BULK_MAX_URLS = 50
+BULK_POLL_INTERVAL_SECONDS = 60
+BULK_MAX_WAIT_SECONDS = 24 * 3600  # Gemini batch SLO is 24h
+BULK_WAITING_STAGE = "Waiting for batch"
+BULK_RESUME_IDLE_SECONDS = 10 * BULK_POLL_INTERVAL_SECONDS  # A live job touches its row every poll
+
+
+async def _fail_bulk_job(job_id: str, error_msg: str):
+    """Mark a bulk job failed with a user-facing error."""
+    logger.error(f"Job {job_id[:8]}: Bulk failed: {error_msg}")
+    await update_job(
+        job_id,
+        status=JobStatus.FAILED,
+        progress=0,
+        stage="Failed",
+        error=get_friendly_error(error_msg)
+    )
+
+
+async def process_bulk_job(job_id: str, user: dict, urls: List[str]):
+    """Background task for /summarize/bulk.
+    
+    Fetches all transcripts, submits a single Gemini batch, polls until it
+    finishes, then saves each result like a normal summarization job.
+    The batch id, deadline and items are stored on the job so
+    resume_bulk_jobs() can finish it after a restart.
+    """
+    try:
+        # Stage 1: Transcripts (0-30%)
+        await update_job(job_id, status=JobStatus.PROCESSING, progress=5, stage="Fetching transcripts")
+        items = []  # [{url, video_id, title, content_type, prompt_index, error}]
+        prompts = []
+        for url in urls:
+            video_id = extract_video_id(url)
+            item = {"url": url, "video_id": video_id, "title": None, "error": None}
+            items.append(item)
+            try:
+                segments, _, video_title = await coalesce(
+                    f"transcript:{video_id or url}", lambda: _fetch_transcript(url)
+                )
+                prompt, content_type = prepare_segments_prompt(segments, video_title, video_id)
+                item.update(title=video_title, content_type=content_type.value, prompt_index=len(prompts))
+                prompts.append(prompt)
+            except Exception as e:
+                logger.warning(f"Job {job_id[:8]}: Transcript failed for {url}: {e}")
+                item["error"] = get_friendly_error(str(e))
+        
+        if not prompts:
+            raise Exception("No transcripts could be fetched for any of the videos")
+        
+        # Stage 2: Submit batch (30-40%)
+        await update_job(job_id, progress=30, stage="Submitting batch")
+        batch_id = await asyncio.to_thread(submit_batch, prompts, f"bulk-{job_id[:8]}")
+        deadline = time.time() + BULK_MAX_WAIT_SECONDS
+        await update_job(
+            job_id, progress=40, stage=BULK_WAITING_STAGE,
+            result={"batchId": batch_id, "deadline": deadline, "items": items}
+        )
+        logger.info(f"Job {job_id[:8]}: Submitted {len(prompts)} prompts as {batch_id}")
+    except Exception as e:
+        await _fail_bulk_job(job_id, str(e))
+        return
+    
+    await _finish_bulk_job(job_id, user, batch_id, deadline, items)
+
+
+async def _finish_bulk_job(job_id: str, user: dict, batch_id: str, deadline: float, items: List[dict]):
+    """Poll a submitted bulk batch to completion and save its results."""
+    try:
+        # Stage 3: Poll (40-80%)
+        while True:
+            operation = await asyncio.to_thread(get_batch, batch_id)
+            state = batch_state(operation)
+            if state in BATCH_SUCCEEDED_STATES:
+                break
+            if state in BATCH_FAILED_STATES:
+                raise Exception(f"Gemini batch {batch_id} ended in state {state}")
+            if time.time() >= deadline:
+                raise Exception(f"Gemini batch {batch_id} did not finish within 24 hours")
+            await asyncio.sleep(BULK_POLL_INTERVAL_SECONDS)
+            await update_job(job_id, stage=BULK_WAITING_STAGE)  # Heartbeat for resume_bulk_jobs
+        
+        responses = await asyncio.to_thread(download_batch_results, operation)
+        await update_job(job_id, progress=80, stage="Saving summaries")
+        
+        # Stage 4: Save each result (80-100%)
+        for item in items:
+            if item["error"]:
+                continue
+            try:
+                # Raises for failed/unparseable responses: no placeholder page, no quota charge
+                notes = notes_from_batch_response(
+                    responses.get(item["prompt_index"]), ContentType(item["content_type"]), item["title"] or ""
+                )
+                notion_url, summary_id = await asyncio.to_thread(
+                    save_notes, job_id, user, item["url"], notes,
+                    f"https://youtu.be/{item['video_id']}", item["video_id"],
+                )
+                item.update(title=notes.title, notionUrl=notion_url, summaryId=summary_id)
+            except Exception as e:
+                logger.warning(f"Job {job_id[:8]}: Saving failed for {item['url']}: {e}")
+                item["error"] = get_friendly_error(str(e))
+        
+        await update_job(
+            job_id,
+            status=JobStatus.COMPLETE,
+            progress=100,
+            stage="Complete",
+            result={
+                "success": True,
+                "batchId": batch_id,
+                "items": [
+                    {
+                        "url": item["url"],
+                        "title": item["title"],
+                        "notionUrl": item.get("notionUrl"),
+                        "summaryId": item.get("summaryId"),
+                        "error": item["error"],
+                    }
+                    for item in items
+                ],
+            }
+        )
+        summarized = sum(1 for item in items if not item["error"])
+        logger.info(f"Job {job_id[:8]}: Bulk complete ({summarized}/{len(items)} summarized)")
+        
+    except Exception as e:
+        await _fail_bulk_job(job_id, str(e))
+
+
+async def resume_bulk_jobs() -> int:
+    """Pick up bulk jobs whose polling task died with a previous server process.
+    
+    Called from the hourly maintenance task. Returns the number resumed.
+    """
+    resumed = 0
+    for job in await find_idle_jobs(BULK_WAITING_STAGE, BULK_RESUME_IDLE_SECONDS):
+        stored = job.result or {}
+        if not stored.get("batchId") or "deadline" not in stored or stored.get("items") is None:
+            await _fail_bulk_job(job.id, "Bulk job was interrupted before its state was saved")
+            continue
+        try:
+            user = await _load_user_profile(job.user_id, None)
+        except Exception as e:
+            logger.warning(f"Job {job.id[:8]}: Could not load user to resume bulk job: {e}")
+            continue
+        await update_job(job.id, stage=BULK_WAITING_STAGE)  # Claim it before the next sweep
+        logger.info(f"Job {job.id[:8]}: Resuming bulk batch {stored['batchId']}")
+        asyncio.create_task(_finish_bulk_job(
+            job.id, user, stored["batchId"], stored["deadline"], stored["items"]
+        ))
+        resumed += 1
+    return resumed
+
+
+@router.post("/summarize/bulk")
+async def summarize_bulk(request: Request, body: BulkSummarizeRequest, user: dict = Depends(get_current_user)):
+    """Summarize many videos at once through the Gemini batch API (authenticated).
+    
+    Batch jobs cost about half as much as interactive calls but can take
+    minutes to hours. Returns immediately with a job_id; the Gemini batch id
+    appears in the job result once submitted. Poll /status/{job_id}.
+    """
+    try:
+        if not body.urls:
+            raise HTTPException(status_code=400, detail="Provide at least one URL")
+        if len(body.urls) > BULK_MAX_URLS:
+            raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_URLS} URLs per bulk request")
+        
+        invalid = [url for url in body.urls if not extract_video_id(url)]
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Invalid YouTube URL: {invalid[0]}")
+        
+        # Every video counts against the monthly quota
+        remaining = await asyncio.to_thread(check_rate_limit, user)
+        if remaining != -1 and len(body.urls) > remaining:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Only {remaining} summaries left this month. Upgrade to Pro for unlimited summaries."
+            )
+        
+        job = await create_job(user["id"], "summarize-bulk")
+        logger.info(f"Created bulk job {job.id[:8]} for user {user['id']}: {len(body.urls)} videos")
+        
+        asyncio.create_task(process_bulk_job(job_id=job.id, user=user, urls=body.urls))
+        
+        return ORJSONResponse(
+            status_code=202,
+            content={
+                "job_id": job.id,
+                "status": "pending",
+                "count": len(body.urls),
+                "message": "Bulk job created. Poll /status/{job_id} for progress.",
+                "remaining": remaining - len(body.urls) if remaining > 0 else -1
+            }
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        error_msg = str(e)
+        logger.error(f"Error creating bulk job: {error_msg}")
+        raise HTTPException(status_code=500, detail=get_friendly_error(error_msg))
@@ -18,6 +18,7 @@ from .gemini import (
     generate_lecture_notes_from_segments,
     process_long_transcript,
     summarize_with_gemini,
+    submit_batch,
 )
 
 from .notion import (
@@ -13,7 +13,6 @@ using Apple's public certificates embedded in the JWS itself.
 Reference: https://developer.apple.com/documentation/appstoreserverapi/jwstransaction
 """
 
-import json
 import base64
 import logging
 from datetime import datetime, timezone
@@ -21,6 +20,7 @@ from dataclasses import dataclass
 from typing import Optional
 
 import jwt
+import orjson
 from cryptography import x509
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import ec, utils as asym_utils
@@ -72,8 +72,8 @@ def _extract_jws_parts(signed_transaction: str) -> tuple[dict, dict, bytes]:
     if len(parts) != 3:
         raise ReceiptValidationError("Invalid JWS format: expected 3 parts")
     
-    header = json.loads(_base64url_decode(parts[0]))
-    payload = json.loads(_base64url_decode(parts[1]))
+    header = orjson.loads(_base64url_decode(parts[0]))
+    payload = orjson.loads(_base64url_decode(parts[1]))
     signature = _base64url_decode(parts[2])
     
     return header, payload, signature
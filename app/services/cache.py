@@ -0,0 +1,145 @@
+"""
+On-disk cache for expensive per-video work.
+
+Transcript segments, titles and generated notes are keyed by YouTube video ID so
+repeat requests (retries, or the same video summarized by several users)
+skip the network and Gemini round-trips. Entries are JSON files with a TTL;
+writes are atomic so concurrent workers never read a partial file.
+"""
+
+import os
+import re
+import time
+import hashlib
+import logging
+import tempfile
+from typing import Any, Optional
+
+import orjson
+
+from ..config import CACHE_DIR, CACHE_TTL_DAYS
+
+logger = logging.getLogger(__name__)
+
+# Namespaces whose entries are keyed (or key-prefixed) by video ID
+VIDEO_NAMESPACES = ("title", "segments", "notes")
+
+_SAFE_KEY_RE = re.compile(r'[A-Za-z0-9_-]{1,100}')
+
+_cache_dir: Optional[str] = None
+
+
+def _get_cache_dir() -> str:
+    """Resolve the cache directory, falling back to the temp dir if not writable."""
+    global _cache_dir
+    if _cache_dir is None:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            _cache_dir = CACHE_DIR
+        except OSError:
+            _cache_dir = os.path.join(tempfile.gettempdir(), "yt-summary-cache")
+            os.makedirs(_cache_dir, exist_ok=True)
+            logger.warning(f"Cache dir {CACHE_DIR} not writable, using {_cache_dir}")
+    return _cache_dir
+
+
+def _entry_path(namespace: str, key: str) -> str:
+    """Map a key to a file path. Safe keys (video IDs) are used verbatim."""
+    filename = key if _SAFE_KEY_RE.fullmatch(key) else hashlib.sha256(key.encode('utf-8')).hexdigest()
+    return os.path.join(_get_cache_dir(), namespace, f"{filename}.json")
+
+
+def content_hash(*parts: str) -> str:
+    """Stable hash of arbitrary text for use in cache keys.
+    
+    Each part is length-prefixed, so ("a\nb",) and ("a", "b") hash differently,
+    and fed to the hash one at a time so a large transcript isn't copied into
+    a joined string first. SHA-256 rather than BLAKE2: with SHA extensions it
+    is the faster of the two.
+    
+    Raises:
+        TypeError: If a part is not a str (e.g. a missing title passed as None)
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, str):
+            raise TypeError(f"content_hash parts must be str, got {type(part).__name__}")
+        data = part.encode('utf-8')
+        h.update(len(data).to_bytes(8, 'big'))
+        h.update(data)
+    return h.hexdigest()[:32]
+
+
+def cache_get(namespace: str, key: str) -> Optional[Any]:
+    """Return the cached value, or None if missing or expired."""
+    path = _entry_path(namespace, key)
+    try:
+        with open(path, 'rb') as f:
+            entry = orjson.loads(f.read())
+    except (OSError, ValueError):
+        return None
+    
+    if entry.get("expires_at", 0) < time.time():
+        _remove(path)
+        return None
+    return entry.get("value")
+
+
+def cache_set(namespace: str, key: str, value: Any, ttl_seconds: Optional[int] = None) -> None:
+    """Store a JSON-serializable value. Failures are logged, never raised."""
+    ttl = ttl_seconds if ttl_seconds is not None else CACHE_TTL_DAYS * 86400
+    path = _entry_path(namespace, key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, 'wb') as f:
+            f.write(orjson.dumps({"expires_at": time.time() + ttl, "value": value}))
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning(f"Cache write failed for {namespace}/{key[:40]}: {e}")
+
+
+def invalidate_video(video_id: str) -> int:
+    """Delete every cached artifact for a video. Returns the number removed."""
+    if not _SAFE_KEY_RE.fullmatch(video_id or ""):
+        return 0
+    removed = 0
+    for namespace in VIDEO_NAMESPACES:
+        ns_dir = os.path.join(_get_cache_dir(), namespace)
+        if not os.path.isdir(ns_dir):
+            continue
+        for filename in os.listdir(ns_dir):
+            if filename == f"{video_id}.json" or filename.startswith(f"{video_id}-"):
+                removed += _remove(os.path.join(ns_dir, filename))
+    return removed
+
+
+def prune_expired() -> int:
+    """Delete expired entries across all namespaces. Returns the number removed."""
+    removed = 0
+    now = time.time()
+    root = _get_cache_dir()
+    for namespace in os.listdir(root):
+        ns_dir = os.path.join(root, namespace)
+        if not os.path.isdir(ns_dir):
+            continue
+        for filename in os.listdir(ns_dir):
+            if not filename.endswith(".json"):
+                continue  # Skip in-flight .tmp writes
+            path = os.path.join(ns_dir, filename)
+            try:
+                with open(path, 'rb') as f:
+                    expired = orjson.loads(f.read()).get("expires_at", 0) < now
+            except (OSError, ValueError):
+                expired = True
+            if expired:
+                removed += _remove(path)
+    return removed
+
+
+def _remove(path: str) -> int:
+    try:
+        os.remove(path)
+        return 1
+    except OSError:
+        return 0
@@ -12,6 +12,7 @@ from typing import Optional
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 import httpx
+import orjson
 
 from app.utils import escape_html as _esc
 
@@ -45,7 +46,7 @@ def send_email(to: str, subject: str, html: str) -> bool:
             timeout=10,
         )
         response.raise_for_status()
-        result = response.json()
+        result = orjson.loads(response.content)
         logger.info(f"Email sent to {to}: {result.get('id', 'ok')}")
         return True
     except Exception as e:
@@ -5,6 +5,7 @@ Normalizes articles, PDFs, and podcasts into TranscriptSegment[] so the
 same Gemini pipeline can process any content uniformly.
 """
 
+import io
 import re
 import logging
 import urllib.request
@@ -16,15 +17,11 @@ logger = logging.getLogger(__name__)
 
 # ============ Source Detection ============
 
-# YouTube URL patterns
-_YT_PATTERNS = [
-    r"(?:https?://)?(?:www\.)?youtube\.com/",
-    r"(?:https?://)?youtu\.be/",
-    r"(?:https?://)?m\.youtube\.com/",
-]
+# YouTube URL patterns (www./m. youtube.com and youtu.be), matched at the start
+_YT_RE = re.compile(r"(?:https?://)?(?:(?:www\.|m\.)?youtube\.com/|youtu\.be/)")
 
 # PDF URL pattern
-_PDF_PATTERN = r"\.pdf(\?.*)?$"
+_PDF_RE = re.compile(r"\.pdf(\?.*)?$", re.IGNORECASE)
 
 # Podcast domain hints
 _PODCAST_DOMAINS = [
@@ -42,12 +39,11 @@ def detect_source_type(url: str) -> SourceType:
     url_lower = url.lower().strip()
     
     # YouTube
-    for pattern in _YT_PATTERNS:
-        if re.match(pattern, url_lower):
-            return SourceType.YOUTUBE
+    if _YT_RE.match(url_lower):
+        return SourceType.YOUTUBE
     
     # PDF
-    if re.search(_PDF_PATTERN, url_lower, re.IGNORECASE):
+    if _PDF_RE.search(url_lower):
         return SourceType.PDF
     
     # Podcast platforms
@@ -115,32 +111,37 @@ def extract_article(url: str) -> Tuple[List[TranscriptSegment], str]:
     return segments, title
 
 
+_TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+_PARAGRAPH_RE = re.compile(r"<p[^>]*>(.*?)</p>", re.IGNORECASE | re.DOTALL)
+# Non-content elements, removed together with their bodies in one pass
+_BOILERPLATE_RE = re.compile(
+    r"<(script|style|nav|header|footer|aside|noscript)[^>]*>.*?</\1>",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
 def _basic_html_extract(html: str) -> Tuple[str, str]:
     """Fallback HTML extraction without external libraries."""
     # Extract title
     title = "Untitled Article"
-    title_match = re.search(r"<title[^>]*>(.*?)</title>", html, re.IGNORECASE | re.DOTALL)
+    title_match = _TITLE_RE.search(html)
     if title_match:
-        title = re.sub(r"<[^>]+>", "", title_match.group(1)).strip()
+        title = _TAG_RE.sub("", title_match.group(1)).strip()
     
     # Strip scripts, styles, nav, header, footer
-    for tag in ["script", "style", "nav", "header", "footer", "aside", "noscript"]:
-        html = re.sub(rf"<{tag}[^>]*>.*?</{tag}>", "", html, flags=re.IGNORECASE | re.DOTALL)
+    html = _BOILERPLATE_RE.sub("", html)
     
     # Extract text from paragraph tags
-    paragraphs = re.findall(r"<p[^>]*>(.*?)</p>", html, re.IGNORECASE | re.DOTALL)
+    paragraphs = _PARAGRAPH_RE.findall(html)
     
     if paragraphs:
         # Strip remaining HTML tags
-        text = "\n\n".join(
-            re.sub(r"<[^>]+>", "", p).strip() 
-            for p in paragraphs 
-            if len(re.sub(r"<[^>]+>", "", p).strip()) > 20
-        )
+        stripped = (_TAG_RE.sub("", p).strip() for p in paragraphs)
+        text = "\n\n".join(p for p in stripped if len(p) > 20)
     else:
         # Last resort: strip all tags
-        text = re.sub(r"<[^>]+>", " ", html)
-        text = re.sub(r"\s+", " ", text).strip()
+        text = " ".join(_TAG_RE.sub(" ", html).split())
     
     return text, title
 
@@ -252,7 +253,6 @@ def extract_pdf(url: Optional[str] = None, content: Optional[str] = None) -> Tup
     # Fallback: pdfminer.six
     try:
         from pdfminer.high_level import extract_text as pdfminer_extract
-        import io
         
         text = pdfminer_extract(io.BytesIO(pdf_bytes))
         if not text or len(text.strip()) < 50:
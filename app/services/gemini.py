@@ -5,19 +5,90 @@ Provides functions for calling the Gemini API, detecting content types,
 building prompts, and generating lecture notes from transcripts.
 """
 
+import asyncio
 import re
-import json
-import time
-import urllib.request
-from typing import List
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
-from ..config import GEMINI_API_KEY, GEMINI_API_ENDPOINT
+import httpx
+import orjson
+
+from ..config import (
+    GEMINI_API_KEY, GEMINI_API_BASE, GEMINI_API_ENDPOINT, GEMINI_MODEL,
+    GEMINI_BATCH_ENDPOINT, MAX_PROMPT_CHARS,
+)
 from ..models import ContentType, LectureNotes, TranscriptSegment
+from .cache import cache_get, cache_set, content_hash
+
+# Overview used for placeholder notes when the model output can't be parsed;
+# such notes are never cached.
+PARSE_ERROR_OVERVIEW = "Notes generation encountered an error"
+
+# Part of every cached-notes key: bump when prompts or the notes schema change
+# so notes generated by the old prompts stop being served
+NOTES_CACHE_VERSION = "v2"
+
+
+# Shared connection pools: reusing one client per process keeps TLS sessions
+# and HTTP/2 connections to generativelanguage.googleapis.com alive between
+# calls instead of paying a fresh handshake for every request.
+_http = httpx.Client(http2=True, timeout=180)  # Batch/Files API helpers (run in threads)
+_async_http = httpx.AsyncClient(
+    http2=True, timeout=180, limits=httpx.Limits(max_keepalive_connections=20)
+)
+
+
+async def close_http_clients() -> None:
+    """Close the shared Gemini connection pools (call on shutdown)."""
+    _http.close()
+    await _async_http.aclose()
+
+
+def _strip_code_fence(text: str) -> str:
+    """Remove a surrounding ```json ... ``` fence, if present."""
+    if text.startswith('```'):
+        text = text[3:].removeprefix('json').removeprefix('\n')
+        text = text.removesuffix('```').removesuffix('\n')
+    return text
+
+
+_GENERATION_CONFIG = {
+    "temperature": 0.3,
+    "topP": 0.8,
+    "maxOutputTokens": 8192
+}
+_GENERATION_CONFIG_KEY = orjson.dumps(_GENERATION_CONFIG, option=orjson.OPT_SORT_KEYS).decode()
+
 
+def _notes_cache_key(*parts: str) -> str:
+    """Content hash for cached notes: the inputs plus everything that shapes the output."""
+    return content_hash(NOTES_CACHE_VERSION, GEMINI_MODEL, _GENERATION_CONFIG_KEY, *parts)
+
+
+def _build_request_body(prompt: str) -> dict:
+    """Build the generateContent request body shared by the interactive and batch paths."""
+    return {
+        "contents": [{"parts": [{"text": prompt}]}],
+        "generationConfig": _GENERATION_CONFIG,
+    }
 
-def call_gemini_api(prompt: str, max_retries: int = 3, timeout: int = 180) -> dict:
+
+# Everything after the prompt text is fixed, so it's serialized once here and
+# each request body is a single concatenation around the encoded prompt
+_REQUEST_BODY_HEAD = b'{"contents":[{"parts":[{"text":'
+_REQUEST_BODY_TAIL = b'}]}],"generationConfig":' + orjson.dumps(_GENERATION_CONFIG) + b'}'
+
+
+def _encode_request_body(prompt: str) -> bytes:
+    """Serialized _build_request_body(prompt), without building the dict."""
+    return _REQUEST_BODY_HEAD + orjson.dumps(prompt) + _REQUEST_BODY_TAIL
+
+
+async def call_gemini_api(prompt: str, max_retries: int = 3, timeout: int = 180) -> dict:
     """Call Gemini API with retry logic and exponential backoff.
     
+    Async over the shared HTTP/2 pool; retry waits don't block the event loop.
+    
     Args:
         prompt: The prompt to send to Gemini
         max_retries: Maximum number of retry attempts (default 3)
@@ -31,110 +102,131 @@ def call_gemini_api(prompt: str, max_retries: int = 3, timeout: int = 180) -> di
     """
     url = f"{GEMINI_API_ENDPOINT}?key={GEMINI_API_KEY}"
     
-    data = {
-        "contents": [{"parts": [{"text": prompt}]}],
-        "generationConfig": {
-            "temperature": 0.3,
-            "topP": 0.8,
-            "maxOutputTokens": 8192
-        }
-    }
+    body = _encode_request_body(prompt)
     
     last_error = None
     for attempt in range(max_retries):
         try:
-            req = urllib.request.Request(
+            response = await _async_http.post(
                 url,
-                data=json.dumps(data).encode('utf-8'),
+                content=body,
                 headers={'Content-Type': 'application/json'},
-                method='POST'
+                timeout=timeout
             )
-            
-            with urllib.request.urlopen(req, timeout=timeout) as response:
-                return json.loads(response.read().decode('utf-8'))
+            response.raise_for_status()
+            return orjson.loads(response.content)
                 
-        except urllib.error.HTTPError as e:
+        except httpx.HTTPStatusError as e:
             last_error = e
-            if e.code == 429:  # Rate limited
+            code = e.response.status_code
+            if code == 429:  # Rate limited
                 wait_time = (2 ** attempt) * 2  # 2, 4, 8 seconds
                 print(f"    ⚠ Rate limited, waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
-                time.sleep(wait_time)
-            elif e.code >= 500:  # Server error
+                await asyncio.sleep(wait_time)
+            elif code >= 500:  # Server error
                 wait_time = (2 ** attempt) * 1  # 1, 2, 4 seconds
-                print(f"    ⚠ Server error {e.code}, retrying in {wait_time}s ({attempt + 1}/{max_retries})")
-                time.sleep(wait_time)
+                print(f"    ⚠ Server error {code}, retrying in {wait_time}s ({attempt + 1}/{max_retries})")
+                await asyncio.sleep(wait_time)
             else:
                 raise  # Don't retry client errors (4xx except 429)
                 
-        except (urllib.error.URLError, TimeoutError) as e:
+        except httpx.TransportError as e:  # Connect/read errors and timeouts
             last_error = e
             wait_time = (2 ** attempt) * 1
             print(f"    ⚠ Network error, retrying in {wait_time}s ({attempt + 1}/{max_retries})")
-            time.sleep(wait_time)
+            await asyncio.sleep(wait_time)
     
     raise Exception(f"Gemini API failed after {max_retries} retries: {last_error}")
 
 
-def detect_content_type(transcript: str, title: str) -> ContentType:
-    """Detect video content type for optimized processing.
-    Uses heuristics first, then Gemini for ambiguous cases.
-    """
-    text_lower = transcript.lower()[:5000]  # Check beginning for patterns
-    title_lower = title.lower()
-    
-    # Tutorial indicators
-    tutorial_patterns = [
+# Content type indicators in priority order: when several types match, the
+# earliest listed wins. Phrases containing another phrase of the same type
+# (e.g. "coding tutorial") are left out as they can never change the result.
+_CONTENT_TYPE_PHRASES = [
+    (ContentType.TUTORIAL, [
         "step by step", "how to", "tutorial", "let me show you",
         "follow along", "in this video i'll show", "let's build",
-        "coding tutorial", "walkthrough"
-    ]
-    if any(p in text_lower or p in title_lower for p in tutorial_patterns):
-        return ContentType.TUTORIAL
-    
-    # Interview/podcast indicators
-    interview_patterns = [
+        "walkthrough"
+    ]),
+    # Interview/podcast
+    (ContentType.INTERVIEW, [
         "podcast", "interview", "my guest today", "welcome to the show",
         "thanks for having me", "let's talk about", "conversation with",
         "episode", "q&a"
-    ]
-    if any(p in text_lower or p in title_lower for p in interview_patterns):
-        return ContentType.INTERVIEW
-    
-    # Lecture indicators
-    lecture_patterns = [
+    ]),
+    (ContentType.LECTURE, [
         "lecture", "class", "lesson", "today we'll learn", "professor",
         "let's examine", "the concept of", "as we discussed",
         "university", "course", "curriculum"
-    ]
-    if any(p in text_lower or p in title_lower for p in lecture_patterns):
-        return ContentType.LECTURE
-    
-    # Documentary indicators
-    documentary_patterns = [
+    ]),
+    (ContentType.DOCUMENTARY, [
         "documentary", "the story of", "history of", "investigation",
         "the truth about", "behind the scenes", "untold story"
-    ]
-    if any(p in text_lower or p in title_lower for p in documentary_patterns):
-        return ContentType.DOCUMENTARY
-    
-    return ContentType.GENERAL
+    ]),
+]
 
+# All types in one pass: a named group per type, tried in priority order at
+# each position. The lookahead keeps matches zero-width so a lower-priority
+# phrase can't consume text that a higher-priority one starts inside.
+_CONTENT_TYPE_RE = re.compile('(?=' + '|'.join(
+    f"(?P<{content_type.name}>{'|'.join(map(re.escape, phrases))})"
+    for content_type, phrases in _CONTENT_TYPE_PHRASES
+) + ')')
+_CONTENT_TYPE_RANK = {content_type.name: rank for rank, (content_type, _) in enumerate(_CONTENT_TYPE_PHRASES)}
 
-def _build_lecture_prompt(transcript: str, content_type: ContentType, word_count: int) -> str:
-    """Build specialized prompt based on content type."""
-    approx_minutes = word_count // 150
+
+# Leading transcript characters the content-type heuristic looks at
+CONTENT_TYPE_SCAN_CHARS = 5000
+
+
+def detect_content_type(transcript: str, title: str) -> ContentType:
+    """Detect video content type for optimized processing.
+    Uses heuristics first, then Gemini for ambiguous cases.
+    """
+    # Only the beginning of the transcript is inspected, so that's all the
+    # cache key needs to hold
+    return _detect_content_type(transcript[:CONTENT_TYPE_SCAN_CHARS], title)
+
+
+@lru_cache(maxsize=256)
+def _detect_content_type(transcript_head: str, title: str) -> ContentType:
+    # No phrase spans a newline, so joining head and title can't create
+    # false matches
+    haystack = transcript_head.lower() + '\n' + title.lower()
     
-    # Base context
-    context = f"""VIDEO LENGTH: Approximately {approx_minutes} minutes ({word_count:,} words)
-CONTENT TYPE: {content_type.value}
+    best = None
+    for match in _CONTENT_TYPE_RE.finditer(haystack):
+        rank = _CONTENT_TYPE_RANK[match.lastgroup]
+        if best is None or rank < best:
+            best = rank
+            if rank == 0:
+                break  # Nothing outranks the first type
+    
+    return ContentType.GENERAL if best is None else _CONTENT_TYPE_PHRASES[best][0]
 
-TRANSCRIPT:
-{transcript}
-"""
+
+# Types the prompts ask the model to classify into (see "contentType" below)
+_MODEL_CONTENT_TYPES = {t.value: t for t in (
+    ContentType.LECTURE, ContentType.INTERVIEW, ContentType.TUTORIAL,
+    ContentType.DOCUMENTARY, ContentType.GENERAL,
+)}
+
+
+def _reported_content_type(data: dict, hint: ContentType) -> ContentType:
+    """The model's own contentType when it's one we know, else the heuristic hint.
     
-    # Content-type specific instructions
-    if content_type == ContentType.LECTURE:
-        instructions = """
+    detect_content_type only sees the title and transcript head; the model
+    classifies the whole transcript in the same call that writes the notes.
+    """
+    reported = data.get("contentType")
+    if isinstance(reported, str):
+        return _MODEL_CONTENT_TYPES.get(reported.strip().lower(), hint)
+    return hint
+
+
+# Content-type specific instructions and the output format for _build_lecture_prompt
+_LECTURE_INSTRUCTIONS = {
+    ContentType.LECTURE: """
 You are creating comprehensive LECTURE NOTES for a student. Extract:
 1. Main concepts with clear definitions
 2. Examples and case studies mentioned
@@ -142,10 +234,9 @@ You are creating comprehensive LECTURE NOTES for a student. Extract:
 4. Connections between concepts
 5. Any recommended readings or resources
 
-Think like a diligent student taking notes - capture EVERYTHING important."""
+Think like a diligent student taking notes - capture EVERYTHING important.""",
 
-    elif content_type == ContentType.INTERVIEW:
-        instructions = """
+    ContentType.INTERVIEW: """
 You are creating notes from a PODCAST/INTERVIEW. Extract:
 1. Key perspectives from each speaker
 2. Important quotes (verbatim when possible)
@@ -153,10 +244,9 @@ You are creating notes from a PODCAST/INTERVIEW. Extract:
 4. Advice or recommendations given
 5. Books, people, or resources mentioned
 
-Capture the unique insights from this conversation."""
+Capture the unique insights from this conversation.""",
 
-    elif content_type == ContentType.TUTORIAL:
-        instructions = """
+    ContentType.TUTORIAL: """
 You are creating a STEP-BY-STEP GUIDE from this tutorial. Extract:
 1. Prerequisites or setup required
 2. Each step in order with details
@@ -164,10 +254,9 @@ You are creating a STEP-BY-STEP GUIDE from this tutorial. Extract:
 4. Common mistakes or warnings mentioned
 5. Tips and best practices
 
-Make these notes actionable - someone should be able to follow them."""
+Make these notes actionable - someone should be able to follow them.""",
 
-    elif content_type == ContentType.DOCUMENTARY:
-        instructions = """
+    ContentType.DOCUMENTARY: """
 You are creating notes from a DOCUMENTARY. Extract:
 1. Timeline of events or narrative arc
 2. Key facts and statistics
@@ -175,10 +264,9 @@ You are creating notes from a DOCUMENTARY. Extract:
 4. Sources or evidence cited
 5. Main arguments or conclusions
 
-Capture the story and its supporting evidence."""
+Capture the story and its supporting evidence.""",
 
-    else:  # GENERAL
-        instructions = """
+    ContentType.GENERAL: """
 You are creating comprehensive NOTES from this video. Extract:
 1. Main topic and thesis
 2. Key points and supporting details
@@ -186,14 +274,14 @@ You are creating comprehensive NOTES from this video. Extract:
 4. Notable quotes or statements
 5. Any calls to action or recommendations
 
-Be thorough - capture all important information."""
+Be thorough - capture all important information.""",
+}
 
-    # Output format specification
-    output_format = """
+_LECTURE_OUTPUT_FORMAT = """
 Respond in this EXACT JSON format (no markdown, just raw JSON):
 {
   "title": "Clear, descriptive title",
-  "contentType": "detected content type",
+  "contentType": "lecture, interview, tutorial, documentary or general: your own reading of the whole transcript",
   "overview": "One comprehensive sentence summarizing the entire content",
   "tableOfContents": [
     {"section": "Section name", "timestamp": "MM:SS", "description": "Brief description"}
@@ -225,57 +313,31 @@ GUIDELINES:
 - Empty arrays are fine if that section doesn't apply
 """
 
-    return context + instructions + output_format
+# Everything after the transcript, joined once per content type (GENERAL covers the rest)
+_LECTURE_PROMPT_TAILS = {
+    ct: _LECTURE_INSTRUCTIONS.get(ct, _LECTURE_INSTRUCTIONS[ContentType.GENERAL]) + _LECTURE_OUTPUT_FORMAT
+    for ct in ContentType
+}
 
 
-def _build_timestamped_prompt(segments: List[TranscriptSegment], content_type: ContentType, video_id: str = "") -> str:
-    """Build prompt with timestamped transcript for precise references.
-    
-    Formats the transcript to include timestamps every ~30 seconds,
-    allowing Gemini to correlate content with video times.
-    """
-    # Format segments with timestamps inline
-    formatted_chunks = []
-    current_chunk = []
-    last_timestamp_shown = -60  # Show timestamps every ~60 seconds
-    
-    for seg in segments:
-        # Add timestamp marker periodically
-        if seg.start_time - last_timestamp_shown >= 60:
-            if current_chunk:
-                formatted_chunks.append(' '.join(current_chunk))
-                current_chunk = []
-            timestamp = seg.timestamp_str()
-            current_chunk.append(f"\n[{timestamp}] ")
-            last_timestamp_shown = seg.start_time
-        current_chunk.append(seg.text)
-    
-    if current_chunk:
-        formatted_chunks.append(' '.join(current_chunk))
-    
-    timestamped_transcript = ''.join(formatted_chunks)
-    word_count = len(timestamped_transcript.split())
+def _build_lecture_prompt(transcript: str, content_type: ContentType, word_count: int) -> str:
+    """Build specialized prompt based on content type."""
     approx_minutes = word_count // 150
     
-    # Calculate total duration from last segment
-    total_duration = segments[-1].end_time if segments else 0
-    duration_str = f"{int(total_duration // 60)}:{int(total_duration % 60):02d}"
-    
-    context = f"""VIDEO INFO:
-- Duration: {duration_str} (approximately {approx_minutes} minutes of spoken content)
-- Word count: {word_count:,} words
-- Content type: {content_type.value}
-{f"- Video ID: {video_id}" if video_id else ""}
-
-TIMESTAMPED TRANSCRIPT:
-The transcript below includes [MM:SS] timestamps. Use these to reference when topics appear.
+    # Base context
+    context = f"""VIDEO LENGTH: Approximately {approx_minutes} minutes ({word_count:,} words)
+CONTENT TYPE: {content_type.value}
 
-{timestamped_transcript}
+TRANSCRIPT:
+{transcript}
 """
     
-    # Content-type specific instructions (same as before)
-    if content_type == ContentType.LECTURE:
-        instructions = """
+    return context + _LECTURE_PROMPT_TAILS[content_type]
+
+
+# The same for _build_timestamped_prompt, asking for timestamps throughout
+_TIMESTAMPED_INSTRUCTIONS = {
+    ContentType.LECTURE: """
 You are creating comprehensive LECTURE NOTES for a student. Extract:
 1. Main concepts with clear definitions - note WHEN each concept is introduced
 2. Examples and case studies mentioned
@@ -283,10 +345,9 @@ You are creating comprehensive LECTURE NOTES for a student. Extract:
 4. Connections between concepts
 5. Any recommended readings or resources
 
-Think like a diligent student taking notes - capture EVERYTHING important with timestamps."""
+Think like a diligent student taking notes - capture EVERYTHING important with timestamps.""",
 
-    elif content_type == ContentType.INTERVIEW:
-        instructions = """
+    ContentType.INTERVIEW: """
 You are creating notes from a PODCAST/INTERVIEW. Extract:
 1. Key perspectives from each speaker - note when they make their points
 2. Important quotes (verbatim when possible) with timestamps
@@ -294,10 +355,9 @@ You are creating notes from a PODCAST/INTERVIEW. Extract:
 4. Advice or recommendations given
 5. Books, people, or resources mentioned
 
-Capture the unique insights with precise timestamps for easy reference."""
+Capture the unique insights with precise timestamps for easy reference.""",
 
-    elif content_type == ContentType.TUTORIAL:
-        instructions = """
+    ContentType.TUTORIAL: """
 You are creating a STEP-BY-STEP GUIDE from this tutorial. Extract:
 1. Prerequisites or setup required
 2. Each step in order with timestamp when it starts
@@ -305,10 +365,9 @@ You are creating a STEP-BY-STEP GUIDE from this tutorial. Extract:
 4. Common mistakes or warnings mentioned
 5. Tips and best practices
 
-Make these notes actionable with timestamps so users can jump to each step."""
+Make these notes actionable with timestamps so users can jump to each step.""",
 
-    elif content_type == ContentType.DOCUMENTARY:
-        instructions = """
+    ContentType.DOCUMENTARY: """
 You are creating notes from a DOCUMENTARY. Extract:
 1. Timeline of events or narrative arc with timestamps
 2. Key facts and statistics
@@ -316,10 +375,9 @@ You are creating notes from a DOCUMENTARY. Extract:
 4. Sources or evidence cited
 5. Main arguments or conclusions
 
-Capture the story with timestamps for key moments."""
+Capture the story with timestamps for key moments.""",
 
-    else:  # GENERAL
-        instructions = """
+    ContentType.GENERAL: """
 You are creating comprehensive NOTES from this video. Extract:
 1. Main topic and thesis
 2. Key points and supporting details - note when discussed
@@ -327,13 +385,14 @@ You are creating comprehensive NOTES from this video. Extract:
 4. Notable quotes or statements with timestamps
 5. Any calls to action or recommendations
 
-Be thorough - capture all important information with timestamps."""
+Be thorough - capture all important information with timestamps.""",
+}
 
-    output_format = """
+_TIMESTAMPED_OUTPUT_FORMAT = """
 Respond in this EXACT JSON format (no markdown, just raw JSON):
 {
   "title": "Clear, descriptive title",
-  "contentType": "detected content type",
+  "contentType": "lecture, interview, tutorial, documentary or general: your own reading of the whole transcript",
   "overview": "One comprehensive sentence summarizing the entire content",
   "tableOfContents": [
     {"section": "Section name", "timestamp": "MM:SS", "description": "Brief description"}
@@ -363,19 +422,110 @@ CRITICAL TIMESTAMP INSTRUCTIONS:
 - Format: "MM:SS" (e.g., "5:30", "1:15:00" for longer videos)
 """
 
-    return context + instructions + output_format
+# Everything after the transcript, joined once per content type (GENERAL covers the rest)
+_TIMESTAMPED_PROMPT_TAILS = {
+    ct: _TIMESTAMPED_INSTRUCTIONS.get(ct, _TIMESTAMPED_INSTRUCTIONS[ContentType.GENERAL]) + _TIMESTAMPED_OUTPUT_FORMAT
+    for ct in ContentType
+}
 
 
-def generate_lecture_notes(transcript: str, title: str = "") -> LectureNotes:
+def _build_timestamped_prompt(segments: List[TranscriptSegment], content_type: ContentType, video_id: str = "") -> str:
+    """Build prompt with timestamped transcript for precise references.
+    
+    Formats the transcript to include timestamps every ~30 seconds,
+    allowing Gemini to correlate content with video times.
+    """
+    # Format segments with timestamps inline
+    formatted_chunks = []
+    current_chunk = []
+    last_timestamp_shown = -60  # Show timestamps every ~60 seconds
+    
+    for seg in segments:
+        # Add timestamp marker periodically
+        if seg.start_time - last_timestamp_shown >= 60:
+            if current_chunk:
+                formatted_chunks.append(' '.join(current_chunk))
+                current_chunk = []
+            timestamp = seg.timestamp_str()
+            current_chunk.append(f"\n[{timestamp}] ")
+            last_timestamp_shown = seg.start_time
+        current_chunk.append(seg.text)
+    
+    if current_chunk:
+        formatted_chunks.append(' '.join(current_chunk))
+    
+    timestamped_transcript = ''.join(formatted_chunks)
+    word_count = len(timestamped_transcript.split())
+    approx_minutes = word_count // 150
+    
+    # Calculate total duration from last segment
+    total_duration = segments[-1].end_time if segments else 0
+    duration_str = f"{int(total_duration // 60)}:{int(total_duration % 60):02d}"
+    
+    context = f"""VIDEO INFO:
+- Duration: {duration_str} (approximately {approx_minutes} minutes of spoken content)
+- Word count: {word_count:,} words
+- Content type: {content_type.value}
+{f"- Video ID: {video_id}" if video_id else ""}
+
+TIMESTAMPED TRANSCRIPT:
+The transcript below includes [MM:SS] timestamps. Use these to reference when topics appear.
+
+{_sample_transcript(timestamped_transcript)}
+"""
+    
+    return context + _TIMESTAMPED_PROMPT_TAILS[content_type]
+
+
+_OMITTED_MARKER = "\n\n[... part of the transcript omitted for length ...]\n\n"
+
+
+def _sample_transcript(transcript: str, max_chars: int = MAX_PROMPT_CHARS) -> str:
+    """Fit a transcript into max_chars by keeping its first 60%, a middle 20%
+    and its last 20%, so the prompt still covers how the video ends.
+    
+    Cuts are moved back to the nearest space or newline, so no word or
+    [MM:SS] marker is split (the pieces only get shorter).
+    """
+    if len(transcript) <= max_chars:
+        return transcript
+    head = max_chars * 3 // 5
+    middle = max_chars // 5
+    tail = max_chars - head - middle
+    middle_start = (len(transcript) - middle) // 2
+    middle_end = middle_start + middle
+    tail_start = len(transcript) - tail
+    return (
+        transcript[:_boundary_before(transcript, 0, head)] + _OMITTED_MARKER
+        + transcript[_boundary_after(transcript, middle_start, middle_end):
+                     _boundary_before(transcript, middle_start, middle_end)] + _OMITTED_MARKER
+        + transcript[_boundary_after(transcript, tail_start, len(transcript)):]
+    )
+
+
+def _boundary_before(text: str, start: int, end: int) -> int:
+    """Last space/newline in text[start:end], or end if there is none."""
+    cut = max(text.rfind(' ', start, end), text.rfind('\n', start, end))
+    return cut if cut > start else end
+
+
+def _boundary_after(text: str, start: int, end: int) -> int:
+    """Just past the first space/newline in text[start:end], or start if there is none."""
+    if start == 0 or text[start - 1].isspace():
+        return start  # Already on a boundary
+    found = [i for i in (text.find(' ', start, end), text.find('\n', start, end)) if i >= 0]
+    return min(found) + 1 if found else start
+
+
+async def generate_lecture_notes(transcript: str, title: str = "") -> LectureNotes:
     """Generate comprehensive lecture notes from transcript.
     
     This is the new core summarization engine that produces detailed,
     structured notes suitable for any video type.
     """
-    # Gemini 2.0 Flash handles up to ~1M tokens, we use 200k chars (~50k tokens)
-    # for better results with very long content
-    max_transcript_length = 200000
-    transcript_text = transcript[:max_transcript_length]
+    # Gemini 2.0 Flash handles up to ~1M tokens, we cap at MAX_PROMPT_CHARS
+    # (200k chars, ~50k tokens by default) for better results with very long content
+    transcript_text = _sample_transcript(transcript)
     word_count = len(transcript_text.split())
     
     # Detect content type
@@ -386,21 +536,18 @@ def generate_lecture_notes(transcript: str, title: str = "") -> LectureNotes:
     prompt = _build_lecture_prompt(transcript_text, content_type, word_count)
     
     # Call Gemini API with retry logic
-    result = call_gemini_api(prompt)
+    result = await call_gemini_api(prompt)
     
     text = result['candidates'][0]['content']['parts'][0]['text'].strip()
     
-    # Clean markdown code blocks if present
-    if text.startswith('```'):
-        text = re.sub(r'^```json?\n?', '', text)
-        text = re.sub(r'\n?```$', '', text)
+    text = _strip_code_fence(text)
     
     try:
-        data = json.loads(text)
+        data = orjson.loads(text)
         
         return LectureNotes(
             title=data.get("title", title or "Untitled Notes"),
-            content_type=content_type,
+            content_type=_reported_content_type(data, content_type),
             overview=data.get("overview", ""),
             table_of_contents=data.get("tableOfContents", []),
             main_concepts=data.get("mainConcepts", []),
@@ -411,18 +558,18 @@ def generate_lecture_notes(transcript: str, title: str = "") -> LectureNotes:
             action_items=data.get("actionItems", []),
             questions_raised=data.get("questionsRaised", [])
         )
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         print(f"  ⚠ JSON parsing failed: {e}")
         # Return minimal notes on parse failure
         return LectureNotes(
             title=title or "Video Notes",
             content_type=ContentType.GENERAL,
-            overview="Notes generation encountered an error",
+            overview=PARSE_ERROR_OVERVIEW,
             key_insights=[{"insight": "Could not parse AI response", "context": str(e)}]
         )
 
 
-def generate_lecture_notes_from_segments(
+async def generate_lecture_notes_from_segments(
     segments: List[TranscriptSegment], 
     title: str = "",
     video_id: str = ""
@@ -442,66 +589,86 @@ def generate_lecture_notes_from_segments(
             key_insights=[]
         )
     
-    # Create flat text for content detection
-    flat_text = ' '.join([s.text for s in segments])
-    word_count = len(flat_text.split())
+    prompt, content_type = prepare_segments_prompt(segments, title, video_id)
     
-    # Detect content type
-    content_type = detect_content_type(flat_text, title)
+    # Call Gemini API with retry logic
+    result = await call_gemini_api(prompt)
+    
+    try:
+        return _parse_segments_notes(result, content_type, title)
+    except orjson.JSONDecodeError as e:
+        print(f"  ⚠ JSON parsing failed: {e}")
+        # Fallback to non-timestamped version
+        print("  → Falling back to generate_lecture_notes")
+        flat_text = ' '.join([s.text for s in segments])
+        return await generate_lecture_notes(flat_text, title)
+
+
+def prepare_segments_prompt(
+    segments: List[TranscriptSegment],
+    title: str = "",
+    video_id: str = ""
+) -> Tuple[str, ContentType]:
+    """Detect content type and build the (truncated) timestamped prompt.
+    
+    Returns:
+        Tuple of (prompt, content_type)
+    """
+    # Detection only reads the head, so don't join the whole transcript for it
+    head = []
+    head_chars = 0
+    for seg in segments:
+        head.append(seg.text)
+        head_chars += len(seg.text) + 1
+        if head_chars >= CONTENT_TYPE_SCAN_CHARS:
+            break
+    content_type = detect_content_type(' '.join(head), title)
     print(f"  → Detected content type: {content_type.value}")
     print(f"  → Processing {len(segments)} timestamped segments")
     
-    # Build timestamped prompt
+    # Build timestamped prompt (the transcript part is sampled to MAX_PROMPT_CHARS,
+    # so the instructions and output format after it are never cut off)
     prompt = _build_timestamped_prompt(segments, content_type, video_id)
     
-    # Truncate prompt if too long (keep ~200k chars for transcript)
-    max_prompt_length = 250000
-    if len(prompt) > max_prompt_length:
-        print(f"  ⚠ Truncating prompt from {len(prompt)} to {max_prompt_length} chars")
-        prompt = prompt[:max_prompt_length]
-    
-    # Call Gemini API with retry logic
-    result = call_gemini_api(prompt)
+    return prompt, content_type
+
+
+def _parse_segments_notes(result: dict, content_type: ContentType, title: str = "") -> LectureNotes:
+    """Parse a generateContent response for a timestamped prompt into LectureNotes.
     
+    Raises:
+        orjson.JSONDecodeError: If the model output is not valid JSON
+    """
     text = result['candidates'][0]['content']['parts'][0]['text'].strip()
     
-    # Clean markdown code blocks
-    if text.startswith('```'):
-        text = re.sub(r'^```json?\n?', '', text)
-        text = re.sub(r'\n?```$', '', text)
+    text = _strip_code_fence(text)
     
-    try:
-        data = json.loads(text)
-        
-        # Process notable quotes - handle both old format (strings) and new format (objects)
-        notable_quotes = data.get("notableQuotes", [])
-        processed_quotes = []
-        for q in notable_quotes:
-            if isinstance(q, dict):
-                # New format with quote/speaker/timestamp
-                processed_quotes.append(q.get("quote", str(q)))
-            else:
-                # Old format (plain string)
-                processed_quotes.append(str(q))
-        
-        return LectureNotes(
-            title=data.get("title", title or "Untitled Notes"),
-            content_type=content_type,
-            overview=data.get("overview", ""),
-            table_of_contents=data.get("tableOfContents", []),
-            main_concepts=data.get("mainConcepts", []),
-            key_insights=data.get("keyInsights", []),
-            detailed_notes=data.get("detailedNotes", []),
-            notable_quotes=processed_quotes,
-            resources_mentioned=data.get("resourcesMentioned", []),
-            action_items=data.get("actionItems", []),
-            questions_raised=data.get("questionsRaised", [])
-        )
-    except json.JSONDecodeError as e:
-        print(f"  ⚠ JSON parsing failed: {e}")
-        # Fallback to non-timestamped version
-        print("  → Falling back to generate_lecture_notes")
-        return generate_lecture_notes(flat_text, title)
+    data = orjson.loads(text)
+    
+    # Process notable quotes - handle both old format (strings) and new format (objects)
+    notable_quotes = data.get("notableQuotes", [])
+    processed_quotes = []
+    for q in notable_quotes:
+        if isinstance(q, dict):
+            # New format with quote/speaker/timestamp
+            processed_quotes.append(q.get("quote", str(q)))
+        else:
+            # Old format (plain string)
+            processed_quotes.append(str(q))
+    
+    return LectureNotes(
+        title=data.get("title", title or "Untitled Notes"),
+        content_type=_reported_content_type(data, content_type),
+        overview=data.get("overview", ""),
+        table_of_contents=data.get("tableOfContents", []),
+        main_concepts=data.get("mainConcepts", []),
+        key_insights=data.get("keyInsights", []),
+        detailed_notes=data.get("detailedNotes", []),
+        notable_quotes=processed_quotes,
+        resources_mentioned=data.get("resourcesMentioned", []),
+        action_items=data.get("actionItems", []),
+        questions_raised=data.get("questionsRaised", [])
+    )
 
 
 # ============ Long-Form Chunked Processing ============
@@ -540,7 +707,7 @@ def _split_into_chunks(segments: List[TranscriptSegment], max_minutes: int = 30)
     return chunks
 
 
-def _generate_notes_for_chunk(
+async def _generate_notes_for_chunk(
     segments: List[TranscriptSegment], 
     chunk_index: int, 
     total_chunks: int,
@@ -559,7 +726,7 @@ def _generate_notes_for_chunk(
     # Modify title to indicate chunk
     chunk_title = f"{title} (Part {chunk_index + 1}/{total_chunks})"
     
-    return generate_lecture_notes_from_segments(segments, chunk_title, video_id)
+    return await generate_lecture_notes_from_segments(segments, chunk_title, video_id)
 
 
 def _synthesize_notes(chunk_notes: List[LectureNotes], original_title: str) -> LectureNotes:
@@ -621,9 +788,9 @@ def _synthesize_notes(chunk_notes: List[LectureNotes], original_title: str) -> L
     )
 
 
-def process_long_transcript(
+async def process_long_transcript(
     segments: List[TranscriptSegment], 
-    title: str = "",
+    title: Optional[str] = "",
     video_id: str = ""
 ) -> LectureNotes:
     """Process very long transcripts (2+ hours) by chunking and synthesizing.
@@ -643,6 +810,32 @@ def process_long_transcript(
             key_insights=[]
         )
     
+    # Same video + same transcript → reuse previously generated notes
+    flat_text = ' '.join(s.text for s in segments)
+    digest = _notes_cache_key(title or "", flat_text)  # No title for client-supplied transcripts
+    cache_key = f"{video_id}-{digest}" if video_id else digest
+    cached = cache_get("notes", cache_key)
+    if cached:
+        print(f"  → Using cached notes for {video_id or 'content'}")
+        return LectureNotes.from_dict(cached)
+    
+    notes = await _process_segments(segments, title, video_id)
+    _cache_notes(cache_key, notes)
+    return notes
+
+
+def _cache_notes(cache_key: str, notes: LectureNotes) -> None:
+    """Cache notes unless they are a parse-failure placeholder."""
+    if notes.overview != PARSE_ERROR_OVERVIEW:
+        cache_set("notes", cache_key, notes.to_dict())
+
+
+async def _process_segments(
+    segments: List[TranscriptSegment],
+    title: str = "",
+    video_id: str = ""
+) -> LectureNotes:
+    """Uncached body of process_long_transcript (standard or chunked processing)."""
     # Calculate total duration
     total_duration = segments[-1].end_time if segments else 0
     total_minutes = total_duration / 60
@@ -651,7 +844,7 @@ def process_long_transcript(
     # (200k chars handles ~80 minutes well)
     if total_minutes < 90:
         print(f"  → Video is {total_minutes:.0f} min, using standard processing")
-        return generate_lecture_notes_from_segments(segments, title, video_id)
+        return await generate_lecture_notes_from_segments(segments, title, video_id)
     
     print(f"  → Long video detected ({total_minutes:.0f} min), using chunked processing")
     
@@ -662,7 +855,7 @@ def process_long_transcript(
     # Process each chunk
     chunk_notes = []
     for i, chunk in enumerate(chunks):
-        notes = _generate_notes_for_chunk(chunk, i, len(chunks), title, video_id)
+        notes = await _generate_notes_for_chunk(chunk, i, len(chunks), title, video_id)
         chunk_notes.append(notes)
     
     # Synthesize all chunk notes
@@ -672,11 +865,180 @@ def process_long_transcript(
     return final_notes
 
 
-def summarize_with_gemini(transcript: str) -> dict:
+async def summarize_with_gemini(transcript: str) -> dict:
     """Legacy summarization function - now uses generate_lecture_notes internally.
     
     Maintained for backward compatibility with existing API.
     Returns the old format: {title, oneLiner, keyTakeaways, insights}
     """
-    notes = generate_lecture_notes(transcript)
+    cache_key = _notes_cache_key(transcript)
+    cached = cache_get("notes", cache_key)
+    if cached:
+        return LectureNotes.from_dict(cached).to_legacy_format()
+    
+    notes = await generate_lecture_notes(transcript)
+    _cache_notes(cache_key, notes)
     return notes.to_legacy_format()
+
+
+# ============ Batch API (non-interactive, ~50% cheaper) ============
+
+BATCH_SUCCEEDED_STATES = {"BATCH_STATE_SUCCEEDED", "JOB_STATE_SUCCEEDED"}
+BATCH_FAILED_STATES = {
+    "BATCH_STATE_FAILED", "BATCH_STATE_CANCELLED", "BATCH_STATE_EXPIRED",
+    "JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED",
+}
+
+
+def _gemini_http(url: str, data: Optional[bytes] = None, headers: Optional[dict] = None,
+                 method: str = "GET", timeout: int = 60) -> Tuple[bytes, dict]:
+    """Perform a raw request against the Gemini REST API.
+    
+    Returns:
+        Tuple of (response body bytes, response headers)
+    """
+    response = _http.request(method, url, content=data, headers=headers, timeout=timeout)
+    response.raise_for_status()
+    return response.content, dict(response.headers)
+
+
+def build_batch_jsonl(prompts: List[str]) -> bytes:
+    """Serialize prompts as Gemini batch JSONL, one `{"key", "request"}` line each.
+    
+    Keys are the prompt's index in the input list so results can be
+    matched back to their source even though batch output is unordered.
+    """
+    lines = [
+        orjson.dumps({"key": str(i), "request": _build_request_body(prompt)})
+        for i, prompt in enumerate(prompts)
+    ]
+    return b"\n".join(lines) + b"\n"
+
+
+def _upload_batch_file(payload: bytes, display_name: str) -> str:
+    """Upload a JSONL payload via the Files API (resumable protocol).
+    
+    Returns:
+        The file resource name (e.g. "files/abc123")
+    """
+    start_url = f"{GEMINI_API_BASE}/upload/v1beta/files?key={GEMINI_API_KEY}"
+    _, headers = _gemini_http(
+        start_url,
+        data=orjson.dumps({"file": {"display_name": display_name}}),
+        headers={
+            'Content-Type': 'application/json',
+            'X-Goog-Upload-Protocol': 'resumable',
+            'X-Goog-Upload-Command': 'start',
+            'X-Goog-Upload-Header-Content-Length': str(len(payload)),
+            'X-Goog-Upload-Header-Content-Type': 'application/jsonl',
+        },
+        method='POST',
+    )
+    upload_url = {k.lower(): v for k, v in headers.items()}.get('x-goog-upload-url')
+    if not upload_url:
+        raise Exception("Gemini Files API did not return an upload URL")
+    
+    body, _ = _gemini_http(
+        upload_url,
+        data=payload,
+        headers={
+            'Content-Length': str(len(payload)),
+            'X-Goog-Upload-Offset': '0',
+            'X-Goog-Upload-Command': 'upload, finalize',
+        },
+        method='POST',
+        timeout=120,
+    )
+    return orjson.loads(body)['file']['name']
+
+
+def submit_batch(prompts: List[str], display_name: str = "yt-summary-batch") -> str:
+    """Submit prompts to the Gemini async batch API.
+    
+    Batch jobs are billed at roughly half the interactive rate but may take
+    minutes to hours to complete, so only use this for latency-tolerant work
+    (bulk imports, backfills, reprocessing).
+    
+    Returns:
+        The batch resource name (e.g. "batches/xyz"), used as the batch id
+    """
+    if not prompts:
+        raise ValueError("submit_batch requires at least one prompt")
+    
+    file_name = _upload_batch_file(build_batch_jsonl(prompts), display_name)
+    print(f"  → Uploaded batch input {file_name} ({len(prompts)} requests)")
+    
+    body, _ = _gemini_http(
+        f"{GEMINI_BATCH_ENDPOINT}?key={GEMINI_API_KEY}",
+        data=orjson.dumps({
+            "batch": {
+                "display_name": display_name,
+                "input_config": {"file_name": file_name},
+            }
+        }),
+        headers={'Content-Type': 'application/json'},
+        method='POST',
+    )
+    batch_name = orjson.loads(body)['name']
+    print(f"  → Created Gemini batch {batch_name}")
+    return batch_name
+
+
+def get_batch(batch_name: str) -> dict:
+    """Fetch the current batch operation (state and, once done, output location)."""
+    body, _ = _gemini_http(f"{GEMINI_API_BASE}/v1beta/{batch_name}?key={GEMINI_API_KEY}")
+    return orjson.loads(body)
+
+
+def batch_state(operation: dict) -> str:
+    """Extract the batch state string from a batch operation."""
+    return operation.get("metadata", {}).get("state", "BATCH_STATE_UNSPECIFIED")
+
+
+def parse_batch_results(payload: bytes) -> Dict[int, Optional[dict]]:
+    """Parse batch output JSONL into {prompt_index: generateContent response}.
+    
+    Requests that failed inside the batch map to None.
+    """
+    results: Dict[int, Optional[dict]] = {}
+    for line in payload.splitlines():
+        if not line.strip():
+            continue
+        entry = orjson.loads(line)
+        try:
+            index = int(entry.get("key", ""))
+        except ValueError:
+            continue
+        results[index] = entry.get("response") if "error" not in entry else None
+    return results
+
+
+def download_batch_results(operation: dict) -> Dict[int, Optional[dict]]:
+    """Download and parse the output file of a succeeded batch."""
+    response = operation.get("response", {})
+    responses_file = response.get("responsesFile") or response.get("responses_file")
+    if not responses_file:
+        raise Exception("Batch finished without a responses file")
+    
+    body, _ = _gemini_http(
+        f"{GEMINI_API_BASE}/download/v1beta/{responses_file}:download?alt=media&key={GEMINI_API_KEY}",
+        timeout=120,
+    )
+    return parse_batch_results(body)
+
+
+def notes_from_batch_response(response: Optional[dict], content_type: ContentType,
+                              title: str = "") -> LectureNotes:
+    """Convert a single batch response into LectureNotes.
+    
+    Unlike the interactive path there is no retry on malformed output.
+    Raises ValueError for a failed or unparseable response so the caller
+    can mark that video as failed without saving placeholder notes.
+    """
+    if not response:
+        raise ValueError("Notes generation failed for this video")
+    try:
+        return _parse_segments_notes(response, content_type, title)
+    except (orjson.JSONDecodeError, KeyError, IndexError) as e:
+        print(f"  ⚠ Batch response parsing failed: {e}")
+        raise ValueError("Could not parse the AI response for this video") from e
@@ -5,13 +5,13 @@ Persists jobs in Supabase for durability across server restarts.
 Falls back to in-memory storage if Supabase is unavailable.
 """
 
+import asyncio
 import uuid
-import json
 import logging
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 logger = logging.getLogger(__name__)
 
@@ -61,8 +61,8 @@ def _row_to_job(row: dict) -> Job:
         stage=row.get("stage", "queued"),
         result=row.get("result"),
         error=row.get("error"),
-        created_at=datetime.fromisoformat(row["created_at"].replace("Z", "+00:00")) if isinstance(row.get("created_at"), str) else datetime.utcnow(),
-        updated_at=datetime.fromisoformat(row["updated_at"].replace("Z", "+00:00")) if isinstance(row.get("updated_at"), str) else datetime.utcnow(),
+        created_at=datetime.fromisoformat(row["created_at"]) if isinstance(row.get("created_at"), str) else datetime.utcnow(),
+        updated_at=datetime.fromisoformat(row["updated_at"]) if isinstance(row.get("updated_at"), str) else datetime.utcnow(),
     )
 
 
@@ -81,7 +81,7 @@ async def create_job(user_id: str, youtube_url: str) -> Job:
                 "progress": 0,
                 "stage": "queued",
             }
-            result = supabase.table("jobs").insert(row).execute()
+            result = await asyncio.to_thread(supabase.table("jobs").insert(row).execute)
             if result.data:
                 logger.info(f"Job {job_id[:8]} created in Supabase")
                 return _row_to_job(result.data[0])
@@ -100,7 +100,7 @@ async def get_job(job_id: str) -> Optional[Job]:
     supabase = _get_supabase()
     if supabase:
         try:
-            result = supabase.table("jobs").select("*").eq("id", job_id).execute()
+            result = await asyncio.to_thread(supabase.table("jobs").select("*").eq("id", job_id).execute)
             if result.data:
                 return _row_to_job(result.data[0])
             return None
@@ -136,7 +136,11 @@ async def update_job(
     supabase = _get_supabase()
     if supabase:
         try:
-            db_result = supabase.table("jobs").update(updates).eq("id", job_id).execute()
+            # In a thread: progress writes happen several times per job and
+            # shouldn't stall the event loop (or other jobs) on a round trip
+            db_result = await asyncio.to_thread(
+                supabase.table("jobs").update(updates).eq("id", job_id).execute
+            )
             if db_result.data:
                 return _row_to_job(db_result.data[0])
         except Exception as e:
@@ -161,12 +165,37 @@ async def update_job(
     return job
 
 
+async def find_idle_jobs(stage: str, idle_seconds: int) -> List[Job]:
+    """Processing jobs in `stage` whose row hasn't been touched for idle_seconds."""
+    cutoff = datetime.utcnow() - timedelta(seconds=idle_seconds)
+    
+    supabase = _get_supabase()
+    if supabase:
+        try:
+            result = await asyncio.to_thread(
+                supabase.table("jobs").select("*")
+                .eq("status", JobStatus.PROCESSING.value)
+                .eq("stage", stage)
+                .lt("updated_at", cutoff.isoformat())
+                .execute
+            )
+            return [_row_to_job(row) for row in result.data or []]
+        except Exception as e:
+            logger.warning(f"Supabase idle job query failed, checking fallback: {e}")
+    
+    # Fallback
+    return [
+        job for job in _fallback_jobs.values()
+        if job.status == JobStatus.PROCESSING and job.stage == stage and job.updated_at < cutoff
+    ]
+
+
 async def cleanup_old_jobs(max_age_hours: int = 24) -> int:
     """Remove jobs older than max_age_hours."""
     supabase = _get_supabase()
     if supabase:
         try:
-            result = supabase.rpc("cleanup_old_jobs", {"max_age_hours": max_age_hours}).execute()
+            result = await asyncio.to_thread(supabase.rpc("cleanup_old_jobs", {"max_age_hours": max_age_hours}).execute)
             count = result.data if isinstance(result.data, int) else 0
             logger.info(f"Cleaned up {count} old jobs from Supabase")
             return count
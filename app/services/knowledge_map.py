@@ -6,11 +6,12 @@ a cross-video topic graph with facts, connections, and importance scores.
 """
 
 import asyncio
-import json
 import logging
 from datetime import datetime, timezone
 from typing import Optional
 
+import orjson
+
 from ..config import SUPABASE_URL, SUPABASE_KEY
 from ..models import KnowledgeMap, Topic, TopicConnection, TopicFact
 from .gemini import call_gemini_api
@@ -20,16 +21,26 @@ logger = logging.getLogger(__name__)
 
 # ============ Supabase Helpers ============
 
+_supabase = None
+
+
 def _get_supabase():
-    """Get a Supabase client, or None if not configured."""
+    """Get the shared Supabase client, or None if not configured.
+    
+    Created once: each client holds its own HTTP connection pool. Only a
+    successful client is kept, so a failed attempt is retried on the next call.
+    """
+    global _supabase
+    if _supabase is not None:
+        return _supabase
     if not SUPABASE_URL or not SUPABASE_KEY:
         return None
     try:
         from supabase import create_client
-        return create_client(SUPABASE_URL, SUPABASE_KEY)
+        _supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
     except Exception as e:
         logger.error(f"Failed to create Supabase client: {e}")
-        return None
+    return _supabase
 
 
 # ============ Summary Condensation ============
@@ -136,11 +147,11 @@ async def build_knowledge_map(user_id: str, supabase_client=None) -> KnowledgeMa
     
     # Fetch all summaries for this user
     logger.info(f"Building knowledge map for user {user_id}")
-    result = client.table("summaries").select(
+    result = await asyncio.to_thread(client.table("summaries").select(
         "id, youtube_url, title, notion_url, created_at"
     ).eq("user_id", user_id).order(
         "created_at", desc=True
-    ).execute()
+    ).execute)
     
     summaries = result.data or []
     if not summaries:
@@ -166,15 +177,21 @@ async def build_knowledge_map(user_id: str, supabase_client=None) -> KnowledgeMa
     return knowledge_map
 
 
+def _to_prompt_json(value) -> str:
+    """Pretty-print data for a prompt. orjson keeps non-ASCII text (e.g. Korean)
+    as-is instead of \\u-escaping it, which also saves prompt tokens."""
+    return orjson.dumps(value, option=orjson.OPT_INDENT_2).decode()
+
+
 async def _synthesize_single_batch(condensed: list) -> KnowledgeMap:
     """Process all summaries in a single Gemini call."""
     prompt = f"""{KNOWLEDGE_MAP_SYSTEM_PROMPT}
 
 Here are {len(condensed)} video summaries to analyze:
 
-{json.dumps(condensed, indent=2)}"""
+{_to_prompt_json(condensed)}"""
     
-    response = await asyncio.to_thread(call_gemini_api, prompt, 3, 120)
+    response = await call_gemini_api(prompt, 3, 120)
     return _parse_knowledge_map_response(response)
 
 
@@ -194,9 +211,9 @@ async def _synthesize_chunked(condensed: list) -> KnowledgeMap:
 
 Here are {len(chunk)} video summaries to analyze (batch {i + 1} of {len(chunks)}):
 
-{json.dumps(chunk, indent=2)}"""
+{_to_prompt_json(chunk)}"""
         
-        response = await asyncio.to_thread(call_gemini_api, prompt, 3, 120)
+        response = await call_gemini_api(prompt, 3, 120)
         partial_map = _parse_knowledge_map_response(response)
         partial_maps.append(partial_map)
     
@@ -218,11 +235,11 @@ Here are {len(chunk)} video summaries to analyze (batch {i + 1} of {len(chunks)}
 async def _merge_maps(map1: KnowledgeMap, map2: KnowledgeMap) -> KnowledgeMap:
     """Merge two partial knowledge maps using Gemini."""
     prompt = MERGE_PROMPT.format(
-        map1=json.dumps(map1.to_dict(), indent=2),
-        map2=json.dumps(map2.to_dict(), indent=2),
+        map1=_to_prompt_json(map1.to_dict()),
+        map2=_to_prompt_json(map2.to_dict()),
     )
     
-    response = await asyncio.to_thread(call_gemini_api, prompt, 3, 120)
+    response = await call_gemini_api(prompt, 3, 120)
     return _parse_knowledge_map_response(response)
 
 
@@ -253,8 +270,8 @@ def _parse_knowledge_map_response(response: dict) -> KnowledgeMap:
         text = text.strip()
     
     try:
-        data = json.loads(text)
-    except json.JSONDecodeError as e:
+        data = orjson.loads(text)
+    except orjson.JSONDecodeError as e:
         logger.error(f"Failed to parse knowledge map JSON: {e}\nResponse: {text[:500]}")
         return KnowledgeMap()
     
@@ -265,9 +282,9 @@ async def _persist_knowledge_map(client, user_id: str, knowledge_map: KnowledgeM
     """Upsert the knowledge map into Supabase."""
     try:
         # Check if a map already exists
-        existing = client.table("knowledge_maps").select("id, version").eq(
+        existing = await asyncio.to_thread(client.table("knowledge_maps").select("id, version").eq(
             "user_id", user_id
-        ).execute()
+        ).execute)
         
         now = datetime.now(timezone.utc).isoformat()
         map_data = knowledge_map.to_dict()
@@ -278,22 +295,22 @@ async def _persist_knowledge_map(client, user_id: str, knowledge_map: KnowledgeM
             knowledge_map.version = new_version
             map_data["version"] = new_version
             
-            client.table("knowledge_maps").update({
+            await asyncio.to_thread(client.table("knowledge_maps").update({
                 "map_json": map_data,
                 "version": new_version,
                 "summary_count": knowledge_map.total_summaries,
                 "updated_at": now,
-            }).eq("user_id", user_id).execute()
+            }).eq("user_id", user_id).execute)
             
             logger.info(f"Updated knowledge map for user {user_id} (v{new_version})")
         else:
             # Insert new
-            client.table("knowledge_maps").insert({
+            await asyncio.to_thread(client.table("knowledge_maps").insert({
                 "user_id": user_id,
                 "map_json": map_data,
                 "version": 1,
                 "summary_count": knowledge_map.total_summaries,
-            }).execute()
+            }).execute)
             
             logger.info(f"Created knowledge map for user {user_id}")
     except Exception as e:
@@ -311,9 +328,9 @@ async def get_knowledge_map(user_id: str, supabase_client=None) -> Optional[dict
         return None
     
     try:
-        result = client.table("knowledge_maps").select(
+        result = await asyncio.to_thread(client.table("knowledge_maps").select(
             "map_json, version, summary_count, notion_url, updated_at"
-        ).eq("user_id", user_id).execute()
+        ).eq("user_id", user_id).execute)
         
         if not result.data:
             return None
@@ -322,9 +339,9 @@ async def get_knowledge_map(user_id: str, supabase_client=None) -> Optional[dict
         map_data = row["map_json"]
         
         # Check staleness: count current summaries
-        count_result = client.table("summaries").select(
+        count_result = await asyncio.to_thread(client.table("summaries").select(
             "id", count="exact"
-        ).eq("user_id", user_id).execute()
+        ).eq("user_id", user_id).execute)
         
         current_count = count_result.count if hasattr(count_result, "count") else len(count_result.data or [])
         
@@ -349,8 +366,8 @@ async def update_notion_url(user_id: str, notion_url: str, supabase_client=None)
         return
     
     try:
-        client.table("knowledge_maps").update({
+        await asyncio.to_thread(client.table("knowledge_maps").update({
             "notion_url": notion_url,
-        }).eq("user_id", user_id).execute()
+        }).eq("user_id", user_id).execute)
     except Exception as e:
         logger.error(f"Failed to update knowledge map notion_url: {e}")
@@ -5,68 +5,450 @@ Provides functions for creating Notion pages with formatted lecture notes
 and legacy summary formats.
 """
 
-from datetime import date
-from notion_client import Client as NotionClient
+import threading
+import time
+import base64
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from itertools import islice
+from typing import Optional, Tuple
+
+import httpx
+import orjson
+from notion_client import APIErrorCode, APIResponseError, Client as NotionClient
+from notion_client.helpers import iterate_paginated_api
 
 from ..models import ContentType, LectureNotes, KnowledgeMap
 
 
-def create_notion_page(notion_token: str, database_id: str, title: str, url: str, 
-                       one_liner: str, takeaways: list, insights: list) -> str:
-    """Create a Notion page with the summary using user's token.
-    Legacy function kept for backward compatibility."""
-    notion = NotionClient(auth=notion_token)
+# Notion rejects more than 100 children per pages.create / blocks.children.append
+NOTION_MAX_BLOCKS_PER_REQUEST = 100
+
+
+# ============ Clients ============
+
+NOTION_API_BASE = "https://api.notion.com/v1"
+NOTION_VERSION = "2022-06-28"  # Same version notion-client sends
+
+# Shared pool for raw requests that bypass notion-client (see create_notion_page)
+_notion_http = httpx.AsyncClient(base_url=NOTION_API_BASE, timeout=60)
+
+
+@lru_cache(maxsize=2048)
+def _notion_for(token: str) -> NotionClient:
+    """Return a per-token sync Notion client, reused across requests.
     
-    children = [
-        {
-            "object": "block",
-            "type": "callout",
-            "callout": {
-                "rich_text": [{"type": "text", "text": {"content": one_liner}}],
-                "icon": {"emoji": "💡"},
-                "color": "blue_background"
+    Each client owns an httpx connection pool, so reusing it keeps the
+    TLS connection to api.notion.com warm between pages for the same user.
+    """
+    return NotionClient(auth=token)
+
+
+# Errors that mean the stored token/database will never work until the user reconnects
+_NOTION_ACCESS_ERRORS = {
+    APIErrorCode.ObjectNotFound,
+    APIErrorCode.Unauthorized,
+    APIErrorCode.RestrictedResource,
+}
+
+
+def check_database_access(notion_token: str, database_id: str) -> None:
+    """Fail fast if the user's Notion database is gone or no longer shared.
+    
+    Only definitive access errors raise; transient failures (rate limits,
+    outages) are left for the page write to retry or report.
+    
+    Raises:
+        Exception: If the database can't be accessed with this token
+    """
+    try:
+        _notion_for(notion_token).databases.retrieve(database_id=database_id)
+    except APIResponseError as e:
+        if e.code in _NOTION_ACCESS_ERRORS:
+            raise Exception(f"Notion database not accessible ({e.code}). Please reconnect Notion.") from e
+        print(f"  → Notion database check inconclusive: {e.code}")
+
+
+# Database titles that look like a home for summaries, in no particular order
+_SUMMARY_DB_KEYWORDS = ("youtube", "watch", "summary", "video", "notes", "learning", "lecture", "content")
+
+
+def find_summaries_database(notion_token: str, current_id: Optional[str] = None) -> Optional[str]:
+    """Pick the database summaries are saved to after a Notion (re)connect.
+    
+    Reuses current_id when this token can still open it, which skips the
+    workspace search on re-auth. Otherwise searches for a database with a
+    summary-ish title (else the first one), and as a last resort creates
+    "YouTube Summaries" under the first accessible page.
+    
+    Returns:
+        Database ID, or None if nothing usable was found or created
+    """
+    notion = _notion_for(notion_token)
+    
+    if current_id:
+        try:
+            notion.databases.retrieve(database_id=current_id)
+            print(f"  → Notion: Reusing database {current_id}")
+            return current_id
+        except Exception as e:
+            print(f"  → Notion: Previous database not accessible with new token: {e}")
+    
+    def db_title(db: dict) -> str:
+        return (db.get("title") or [{}])[0].get("plain_text", "")
+    
+    # Walk every page of results, but stop at the first keyword match
+    first = None
+    for db in iterate_paginated_api(
+        notion.search, filter={"property": "object", "value": "database"}, page_size=100
+    ):
+        if any(kw in db_title(db).lower() for kw in _SUMMARY_DB_KEYWORDS):
+            print(f"  → Notion: Found matching database: {db_title(db)} ({db['id']})")
+            return db["id"]
+        if first is None:
+            first = db
+    if first is not None:
+        print(f"  → Notion: No keyword match - using first available database: {first['id']}")
+        return first["id"]
+    
+    print("  → Notion: No databases found - attempting to create 'YouTube Summaries' database")
+    try:
+        page_results = notion.search(
+            filter={"property": "object", "value": "page"}, page_size=1
+        ).get("results", [])
+        
+        if not page_results:
+            print("  → Notion: No pages found to use as parent")
+            return None
+        new_db = notion.databases.create(
+            parent={"type": "page_id", "page_id": page_results[0]["id"]},
+            title=[{"type": "text", "text": {"content": "YouTube Summaries"}}],
+            properties={
+                "Title": {"title": {}},
+                "URL": {"url": {}},
+                "Type": {
+                    "select": {
+                        "options": [
+                            {"name": "Lecture", "color": "blue"},
+                            {"name": "Tutorial", "color": "green"},
+                            {"name": "Interview", "color": "purple"},
+                            {"name": "Documentary", "color": "orange"},
+                            {"name": "General", "color": "gray"}
+                        ]
+                    }
+                },
+                "Date Added": {"date": {}}
             }
-        },
-        {"object": "block", "type": "divider", "divider": {}},
-        {
-            "object": "block",
-            "type": "heading_2",
-            "heading_2": {"rich_text": [{"type": "text", "text": {"content": "🎯 Key Takeaways"}}]}
-        },
-    ]
+        )
+        print(f"  → Notion: Created new database: YouTube Summaries ({new_db['id']})")
+        return new_db["id"]
+    except Exception as db_create_err:
+        print(f"  → Notion: Failed to create database: {db_create_err}")
+        return None
+
+
+async def exchange_oauth_code(code: str, redirect_uri: str, client_id: str, client_secret: str) -> httpx.Response:
+    """Trade an OAuth authorization code for an access token (POST /oauth/token).
     
-    for takeaway in takeaways:
-        children.append({
-            "object": "block",
-            "type": "bulleted_list_item",
-            "bulleted_list_item": {"rich_text": [{"type": "text", "text": {"content": takeaway}}]}
-        })
+    Runs on the shared pool, so OAuth callbacks reuse the same warm connection
+    to api.notion.com as page writes. The response is returned unchecked.
+    """
+    return await _notion_http.post(
+        "/oauth/token",
+        json={"grant_type": "authorization_code", "code": code, "redirect_uri": redirect_uri},
+        headers={"Authorization": _basic_auth(client_id, client_secret)},
+        timeout=15.0,
+    )
+
+
+@lru_cache(maxsize=1)
+def _basic_auth(client_id: str, client_secret: str) -> str:
+    """Basic auth header for the integration's (process-constant) credentials."""
+    return "Basic " + base64.b64encode(f"{client_id}:{client_secret}".encode()).decode()
+
+
+async def close_http_client() -> None:
+    """Close the shared raw-request pool (call on shutdown)."""
+    await _notion_http.aclose()
+
+
+# Times a rate-limited append is retried before giving up on the batch
+NOTION_RATE_LIMIT_RETRIES = 3
+
+
+# Notion allows an average of 3 requests/s per integration connection;
+# page creates and appends are paced just under that so long pages don't trip 429s
+NOTION_REQUEST_RATE = 2.8
+NOTION_REQUEST_BURST = 10
+
+
+class _TokenBucket:
+    """Thread-safe token bucket; acquire() sleeps until a token is free."""
+
+    def __init__(self, rate: float, capacity: int):
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            self._tokens -= 1  # Reserve now; a negative balance is the queue ahead of us
+            wait = -self._tokens / self._rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+
+@lru_cache(maxsize=2048)
+def _rate_limiter(token: str) -> _TokenBucket:
+    """One bucket per user token, shared by page creates and appends.
+    
+    Keyed by the token string rather than the client, so clients evicted
+    from _notion_for (and their connection pools) aren't kept alive here.
+    """
+    return _TokenBucket(NOTION_REQUEST_RATE, NOTION_REQUEST_BURST)
+
+
+def _create_page(notion: NotionClient, **kwargs) -> dict:
+    """pages.create, paced by the token's rate limiter."""
+    _rate_limiter(notion.options.auth).acquire()
+    return notion.pages.create(**kwargs)
+
+
+def _append_batch(notion: NotionClient, block_id: str, batch: list) -> None:
+    """blocks.children.append, paced and waiting out Notion's rate limit instead of failing."""
+    limiter = _rate_limiter(notion.options.auth)
+    for attempt in range(NOTION_RATE_LIMIT_RETRIES + 1):
+        limiter.acquire()
+        try:
+            notion.blocks.children.append(block_id=block_id, children=batch)
+            return
+        except APIResponseError as e:
+            if e.code != APIErrorCode.RateLimited or attempt == NOTION_RATE_LIMIT_RETRIES:
+                raise
+            retry_after = e.headers.get("retry-after", "")
+            wait = float(retry_after) if retry_after.isdigit() else 2 ** attempt
+            print(f"  → Notion: Rate limited, retrying append in {wait:.0f}s")
+            time.sleep(wait)
+
+
+def _append_blocks(notion: NotionClient, block_id: str, blocks: list) -> int:
+    """Append blocks in NOTION_MAX_BLOCKS_PER_REQUEST batches, in order.
     
-    children.append({"object": "block", "type": "divider", "divider": {}})
-    children.append({
+    Stops at the first batch that still fails after rate-limit retries.
+    Returns the number of blocks appended.
+    """
+    appended = 0
+    for i in range(0, len(blocks), NOTION_MAX_BLOCKS_PER_REQUEST):
+        batch = blocks[i:i + NOTION_MAX_BLOCKS_PER_REQUEST]
+        try:
+            _append_batch(notion, block_id, batch)
+        except Exception as e:
+            print(f"  → Notion: Failed to append blocks {i + 1}-{i + len(batch)}: {type(e).__name__}: {e}")
+            break
+        appended += len(batch)
+    return appended
+
+
+# Page "Date Added" values: (local date, timestamp of the next local midnight)
+_today_cache = ("", 0.0)
+
+
+def _today_iso() -> str:
+    """Local date as YYYY-MM-DD, recomputed only when the day changes."""
+    global _today_cache
+    if time.time() >= _today_cache[1]:
+        today = date.today()
+        next_midnight = datetime.combine(today + timedelta(days=1), datetime.min.time()).timestamp()
+        _today_cache = (today.isoformat(), next_midnight)
+    return _today_cache[0]
+
+
+# ============ Block Factories ============
+
+# Dividers carry no content, so one shared instance is safe to reuse
+_DIVIDER = {"object": "block", "type": "divider", "divider": {}}
+
+
+def _bullet(content) -> dict:
+    """Plain-text bulleted list item; non-string model output is stringified."""
+    if type(content) is not str:
+        content = str(content)
+    return {
+        "object": "block",
+        "type": "bulleted_list_item",
+        "bulleted_list_item": {"rich_text": [{"type": "text", "text": {"content": content}}]}
+    }
+
+
+def _heading(content: str) -> dict:
+    """Plain-text heading_2 block."""
+    return {
         "object": "block",
         "type": "heading_2",
-        "heading_2": {"rich_text": [{"type": "text", "text": {"content": "✨ Notable Insights"}}]}
-    })
-    
-    for insight in insights:
-        children.append({
-            "object": "block",
-            "type": "bulleted_list_item",
-            "bulleted_list_item": {"rich_text": [{"type": "text", "text": {"content": insight}}]}
-        })
+        "heading_2": {"rich_text": [{"type": "text", "text": {"content": content}}]}
+    }
+
+
+def _heading3(content: str) -> dict:
+    """Plain-text heading_3 block."""
+    return {
+        "object": "block",
+        "type": "heading_3",
+        "heading_3": {"rich_text": [{"type": "text", "text": {"content": content}}]}
+    }
+
+
+def _paragraph(content: str) -> dict:
+    """Plain-text paragraph block."""
+    return {
+        "object": "block",
+        "type": "paragraph",
+        "paragraph": {"rich_text": [{"type": "text", "text": {"content": content}}]}
+    }
+
+
+def _quote(content) -> dict:
+    """Plain-text quote block; non-string model output is stringified."""
+    if type(content) is not str:
+        content = str(content)
+    return {
+        "object": "block",
+        "type": "quote",
+        "quote": {"rich_text": [{"type": "text", "text": {"content": content}}]}
+    }
+
+
+def _todo(content) -> dict:
+    """Unchecked to-do block; non-string model output is stringified."""
+    if type(content) is not str:
+        content = str(content)
+    return {
+        "object": "block",
+        "type": "to_do",
+        "to_do": {"rich_text": [{"type": "text", "text": {"content": content}}], "checked": False}
+    }
+
+
+def _text(content: str, link: Optional[str] = None, **annotations) -> dict:
+    """Rich-text run, optionally linked and annotated (bold=True, color="gray", ...)."""
+    text = {"content": content}
+    if link:
+        text["link"] = {"url": link}
+    if annotations:
+        return {"type": "text", "text": text, "annotations": annotations}
+    return {"type": "text", "text": text}
+
+
+def _rich_bullet(rich_text: list) -> dict:
+    """Bulleted list item from prepared rich-text runs."""
+    return {
+        "object": "block",
+        "type": "bulleted_list_item",
+        "bulleted_list_item": {"rich_text": rich_text}
+    }
+
+
+def _callout(rich_text: list, emoji: str, color: str) -> dict:
+    """Callout block from prepared rich-text runs."""
+    return {
+        "object": "block",
+        "type": "callout",
+        "callout": {"rich_text": rich_text, "icon": {"emoji": emoji}, "color": color}
+    }
+
+
+# Placeholder body for toggles with nothing inside (Notion needs a child)
+_EMPTY_PARAGRAPH = {"object": "block", "type": "paragraph", "paragraph": {"rich_text": []}}
+
+# Overview callout icon per content type
+_CONTENT_TYPE_ICONS = {
+    ContentType.LECTURE: "📚",
+    ContentType.INTERVIEW: "🎙️",
+    ContentType.TUTORIAL: "🔧",
+    ContentType.DOCUMENTARY: "🎬",
+    ContentType.GENERAL: "📝"
+}
+
+
+def _one_liner_callout(content: str) -> dict:
+    """Blue 💡 callout used for the legacy summary's one-liner."""
+    return _callout([_text(content)], "💡", "blue_background")
+
+
+# ============ Pre-serialized Blocks ============
+
+# The legacy page is mostly fixed structure, so blocks are serialized once at
+# import and only the user text is encoded per request. A sentinel marks
+# where the text goes; templates are stored as (prefix, suffix) byte pairs.
+_SLOT = "\x00slot\x00"
+
+
+def _template(block: dict) -> Tuple[bytes, bytes]:
+    prefix, suffix = orjson.dumps(block).split(orjson.dumps(_SLOT))
+    return prefix, suffix
+
+
+def _fill(template: Tuple[bytes, bytes], content: str) -> bytes:
+    prefix, suffix = template
+    return prefix + orjson.dumps(content) + suffix
+
+
+_BULLET_JSON = _template(_bullet(_SLOT))
+_CALLOUT_JSON = _template(_one_liner_callout(_SLOT))
+_DIVIDER_JSON = orjson.dumps(_DIVIDER)
+_TAKEAWAYS_HEADING_JSON = orjson.dumps(_heading("🎯 Key Takeaways"))
+_INSIGHTS_HEADING_JSON = orjson.dumps(_heading("✨ Notable Insights"))
+
+
+async def create_notion_page(notion_token: str, database_id: str, title: str, url: str, 
+                             one_liner: str, takeaways: list, insights: list) -> str:
+    """Create a Notion page with the summary using user's token.
+    Legacy function kept for backward compatibility.
     
-    response = notion.pages.create(
-        parent={"database_id": database_id},
-        properties={
+    Sends pre-serialized JSON straight to the Notion API over a shared
+    connection pool instead of going through notion-client. The page is
+    created with the first 100 blocks and any overflow is appended in
+    100-block batches, in order (concurrent appends would interleave).
+    """
+    children = [_fill(_CALLOUT_JSON, one_liner), _DIVIDER_JSON, _TAKEAWAYS_HEADING_JSON]
+    children.extend(_fill(_BULLET_JSON, takeaway) for takeaway in takeaways)
+    children += [_DIVIDER_JSON, _INSIGHTS_HEADING_JSON]
+    children.extend(_fill(_BULLET_JSON, insight) for insight in insights)
+    
+    headers = {
+        "Authorization": f"Bearer {notion_token}",
+        "Notion-Version": NOTION_VERSION,
+        "Content-Type": "application/json",
+    }
+    head = orjson.dumps({
+        "parent": {"database_id": database_id},
+        "properties": {
             "Title": {"title": [{"text": {"content": title}}]},
             "URL": {"url": url},
-            "Date Added": {"date": {"start": date.today().isoformat()}}
+            "Date Added": {"date": {"start": _today_iso()}}
         },
-        children=children
-    )
-    
-    return response["url"]
+    })
+    body = head[:-1] + b',"children":[' + b",".join(children[:NOTION_MAX_BLOCKS_PER_REQUEST]) + b"]}"
+    
+    response = await _notion_http.post("/pages", content=body, headers=headers)
+    response.raise_for_status()
+    page = orjson.loads(response.content)
+    
+    for i in range(NOTION_MAX_BLOCKS_PER_REQUEST, len(children), NOTION_MAX_BLOCKS_PER_REQUEST):
+        batch = b",".join(children[i:i + NOTION_MAX_BLOCKS_PER_REQUEST])
+        response = await _notion_http.patch(
+            f"/blocks/{page['id']}/children",
+            content=b'{"children":[' + batch + b"]}",
+            headers=headers,
+        )
+        response.raise_for_status()
+    
+    return page["url"]
 
 
 def _timestamp_to_link(timestamp_str: str, video_id: str) -> str:
@@ -86,6 +468,16 @@ def _timestamp_to_link(timestamp_str: str, video_id: str) -> str:
         return ""
 
 
+# Trailing lecture-page sections that are a heading plus one block per item:
+# (LectureNotes attribute, heading, max items, block factory)
+_LIST_SECTIONS = (
+    ("notable_quotes", "💬 Notable Quotes", 8, _quote),
+    ("resources_mentioned", "🔗 Resources Mentioned", 10, _bullet),
+    ("action_items", "✅ Action Items", 8, _todo),
+    ("questions_raised", "❓ Questions to Explore", 5, _bullet),
+)
+
+
 def create_lecture_notes_page(notion_token: str, database_id: str, 
                                notes: LectureNotes, video_url: str,
                                video_id: str = "") -> str:
@@ -95,75 +487,40 @@ def create_lecture_notes_page(notion_token: str, database_id: str,
     and organized structure based on content type. Includes clickable
     YouTube timestamp links when video_id is provided.
     """
-    notion = NotionClient(auth=notion_token)
-    
-    # Content type icons
-    type_icons = {
-        ContentType.LECTURE: "📚",
-        ContentType.INTERVIEW: "🎙️",
-        ContentType.TUTORIAL: "🔧",
-        ContentType.DOCUMENTARY: "🎬",
-        ContentType.GENERAL: "📝"
-    }
+    notion = _notion_for(notion_token)
     
     children = []
+    append = children.append
     
     # 1. Overview callout
-    children.append({
-        "object": "block",
-        "type": "callout",
-        "callout": {
-            "rich_text": [{"type": "text", "text": {"content": notes.overview}}],
-            "icon": {"emoji": type_icons.get(notes.content_type, "📝")},
-            "color": "blue_background"
-        }
-    })
+    append(_callout(
+        [_text(notes.overview)], _CONTENT_TYPE_ICONS.get(notes.content_type, "📝"), "blue_background"
+    ))
     
     # 2. Table of Contents (if available) - with clickable timestamp links
     if notes.table_of_contents:
-        children.append({"object": "block", "type": "divider", "divider": {}})
-        children.append({
-            "object": "block",
-            "type": "heading_2",
-            "heading_2": {"rich_text": [{"type": "text", "text": {"content": "📑 Table of Contents"}}]}
-        })
-        for item in notes.table_of_contents[:10]:
+        append(_DIVIDER)
+        append(_heading("📑 Table of Contents"))
+        for item in islice(notes.table_of_contents, 10):
             section = item.get("section", "") if isinstance(item, dict) else str(item)
             timestamp = item.get("timestamp", "") if isinstance(item, dict) else ""
             desc = item.get("description", "") if isinstance(item, dict) else ""
             
             rich_text_parts = []
-            if timestamp and video_id:
-                link = _timestamp_to_link(timestamp, video_id)
-                if link:
-                    rich_text_parts.append({
-                        "type": "text",
-                        "text": {"content": f"[{timestamp}] ", "link": {"url": link}},
-                        "annotations": {"color": "blue"}
-                    })
-            rich_text_parts.append({"type": "text", "text": {"content": section}})
+            link = _timestamp_to_link(timestamp, video_id)
+            if link:
+                rich_text_parts.append(_text(f"[{timestamp}] ", link, color="blue"))
+            rich_text_parts.append(_text(section))
             if desc:
-                rich_text_parts.append({
-                    "type": "text",
-                    "text": {"content": f" - {desc}"},
-                    "annotations": {"color": "gray"}
-                })
+                rich_text_parts.append(_text(f" - {desc}", color="gray"))
             
-            children.append({
-                "object": "block",
-                "type": "bulleted_list_item",
-                "bulleted_list_item": {"rich_text": rich_text_parts}
-            })
+            append(_rich_bullet(rich_text_parts))
     
     # 3. Main Concepts
     if notes.main_concepts:
-        children.append({"object": "block", "type": "divider", "divider": {}})
-        children.append({
-            "object": "block",
-            "type": "heading_2",
-            "heading_2": {"rich_text": [{"type": "text", "text": {"content": "🧠 Main Concepts"}}]}
-        })
-        for concept in notes.main_concepts[:12]:
+        append(_DIVIDER)
+        append(_heading("🧠 Main Concepts"))
+        for concept in islice(notes.main_concepts, 12):
             if isinstance(concept, dict):
                 concept_name = concept.get("concept", "Concept")
                 definition = concept.get("definition", "")
@@ -171,209 +528,85 @@ def create_lecture_notes_page(notion_token: str, database_id: str,
                 timestamp = concept.get("timestamp", "")
                 
                 toggle_header = []
-                if timestamp and video_id:
-                    link = _timestamp_to_link(timestamp, video_id)
-                    if link:
-                        toggle_header.append({
-                            "type": "text",
-                            "text": {"content": f"[{timestamp}] ", "link": {"url": link}},
-                            "annotations": {"color": "blue"}
-                        })
-                toggle_header.append({
-                    "type": "text",
-                    "text": {"content": f"📌 {concept_name}"},
-                    "annotations": {"bold": True}
-                })
+                link = _timestamp_to_link(timestamp, video_id)
+                if link:
+                    toggle_header.append(_text(f"[{timestamp}] ", link, color="blue"))
+                toggle_header.append(_text(f"📌 {concept_name}", bold=True))
                 
                 toggle_content = []
                 if definition:
-                    toggle_content.append({
-                        "object": "block",
-                        "type": "paragraph",
-                        "paragraph": {"rich_text": [{"type": "text", "text": {"content": definition}}]}
-                    })
-                for ex in examples[:3]:
-                    toggle_content.append({
-                        "object": "block",
-                        "type": "bulleted_list_item",
-                        "bulleted_list_item": {"rich_text": [
-                            {"type": "text", "text": {"content": "Example: "}, "annotations": {"bold": True}},
-                            {"type": "text", "text": {"content": str(ex)}}
-                        ]}
-                    })
+                    toggle_content.append(_paragraph(definition))
+                for ex in islice(examples, 3):
+                    toggle_content.append(_rich_bullet([_text("Example: ", bold=True), _text(str(ex))]))
                 
-                children.append({
+                append({
                     "object": "block",
                     "type": "toggle",
                     "toggle": {
                         "rich_text": toggle_header,
-                        "children": toggle_content if toggle_content else [
-                            {"object": "block", "type": "paragraph", "paragraph": {"rich_text": []}}
-                        ]
+                        "children": toggle_content or [_EMPTY_PARAGRAPH]
                     }
                 })
             else:
-                children.append({
-                    "object": "block",
-                    "type": "bulleted_list_item",
-                    "bulleted_list_item": {"rich_text": [{"type": "text", "text": {"content": str(concept)}}]}
-                })
+                append(_bullet(concept))
     
     # 4. Key Insights
     if notes.key_insights:
-        children.append({"object": "block", "type": "divider", "divider": {}})
-        children.append({
-            "object": "block",
-            "type": "heading_2",
-            "heading_2": {"rich_text": [{"type": "text", "text": {"content": "💡 Key Insights"}}]}
-        })
-        for insight in notes.key_insights[:15]:
+        append(_DIVIDER)
+        append(_heading("💡 Key Insights"))
+        for insight in islice(notes.key_insights, 15):
             if isinstance(insight, dict):
-                insight_text = insight.get("insight", str(insight))
+                insight_text = insight["insight"] if "insight" in insight else str(insight)
                 context = insight.get("context", "")
                 timestamp = insight.get("timestamp", "")
                 
                 rich_text_parts = []
-                if timestamp and video_id:
-                    link = _timestamp_to_link(timestamp, video_id)
-                    if link:
-                        rich_text_parts.append({
-                            "type": "text",
-                            "text": {"content": f"⏱️ {timestamp} ", "link": {"url": link}},
-                            "annotations": {"color": "blue", "bold": True}
-                        })
-                rich_text_parts.append({"type": "text", "text": {"content": insight_text}})
+                link = _timestamp_to_link(timestamp, video_id)
+                if link:
+                    rich_text_parts.append(_text(f"⏱️ {timestamp} ", link, color="blue", bold=True))
+                rich_text_parts.append(_text(insight_text))
                 if context:
-                    rich_text_parts.append({
-                        "type": "text",
-                        "text": {"content": f"\n{context}"},
-                        "annotations": {"color": "gray"}
-                    })
+                    rich_text_parts.append(_text(f"\n{context}", color="gray"))
             else:
-                rich_text_parts = [{"type": "text", "text": {"content": str(insight)}}]
+                rich_text_parts = [_text(str(insight))]
             
-            children.append({
-                "object": "block",
-                "type": "callout",
-                "callout": {
-                    "rich_text": rich_text_parts,
-                    "icon": {"emoji": "💡"},
-                    "color": "yellow_background"
-                }
-            })
+            append(_callout(rich_text_parts, "💡", "yellow_background"))
     
     # 5. Detailed Notes
     if notes.detailed_notes:
-        children.append({"object": "block", "type": "divider", "divider": {}})
-        children.append({
-            "object": "block",
-            "type": "heading_2",
-            "heading_2": {"rich_text": [{"type": "text", "text": {"content": "📝 Detailed Notes"}}]}
-        })
-        for section in notes.detailed_notes[:8]:
+        append(_DIVIDER)
+        append(_heading("📝 Detailed Notes"))
+        for section in islice(notes.detailed_notes, 8):
             if isinstance(section, dict):
                 section_name = section.get("section", "Section")
                 points = section.get("points", [])
                 
-                children.append({
-                    "object": "block",
-                    "type": "heading_3",
-                    "heading_3": {"rich_text": [{"type": "text", "text": {"content": section_name}}]}
-                })
-                for point in points[:10]:
-                    children.append({
-                        "object": "block",
-                        "type": "bulleted_list_item",
-                        "bulleted_list_item": {"rich_text": [{"type": "text", "text": {"content": str(point)}}]}
-                    })
-    
-    # 6. Notable Quotes
-    if notes.notable_quotes:
-        children.append({"object": "block", "type": "divider", "divider": {}})
-        children.append({
-            "object": "block",
-            "type": "heading_2",
-            "heading_2": {"rich_text": [{"type": "text", "text": {"content": "💬 Notable Quotes"}}]}
-        })
-        for quote in notes.notable_quotes[:8]:
-            children.append({
-                "object": "block",
-                "type": "quote",
-                "quote": {"rich_text": [{"type": "text", "text": {"content": str(quote)}}]}
-            })
-    
-    # 7. Resources Mentioned
-    if notes.resources_mentioned:
-        children.append({"object": "block", "type": "divider", "divider": {}})
-        children.append({
-            "object": "block",
-            "type": "heading_2",
-            "heading_2": {"rich_text": [{"type": "text", "text": {"content": "🔗 Resources Mentioned"}}]}
-        })
-        for resource in notes.resources_mentioned[:10]:
-            children.append({
-                "object": "block",
-                "type": "bulleted_list_item",
-                "bulleted_list_item": {"rich_text": [{"type": "text", "text": {"content": str(resource)}}]}
-            })
-    
-    # 8. Action Items
-    if notes.action_items:
-        children.append({"object": "block", "type": "divider", "divider": {}})
-        children.append({
-            "object": "block",
-            "type": "heading_2",
-            "heading_2": {"rich_text": [{"type": "text", "text": {"content": "✅ Action Items"}}]}
-        })
-        for action in notes.action_items[:8]:
-            children.append({
-                "object": "block",
-                "type": "to_do",
-                "to_do": {
-                    "rich_text": [{"type": "text", "text": {"content": str(action)}}],
-                    "checked": False
-                }
-            })
-    
-    # 9. Questions Raised
-    if notes.questions_raised:
-        children.append({"object": "block", "type": "divider", "divider": {}})
-        children.append({
-            "object": "block",
-            "type": "heading_2",
-            "heading_2": {"rich_text": [{"type": "text", "text": {"content": "❓ Questions to Explore"}}]}
-        })
-        for question in notes.questions_raised[:5]:
-            children.append({
-                "object": "block",
-                "type": "bulleted_list_item",
-                "bulleted_list_item": {"rich_text": [{"type": "text", "text": {"content": str(question)}}]}
-            })
-    
-    # Notion has a limit of 100 blocks per API request
-    # For long videos, we need to create the page with initial blocks,
-    # then append additional blocks in subsequent requests
-    BATCH_SIZE = 100
-    
-    # Split children into batches
-    first_batch = children[:BATCH_SIZE]
-    remaining_batches = [
-        children[i:i + BATCH_SIZE] 
-        for i in range(BATCH_SIZE, len(children), BATCH_SIZE)
-    ]
-    
-    # Log if we have multiple batches
+                append(_heading3(section_name))
+                children.extend(map(_bullet, islice(points, 10)))
+    
+    # 6-9. Flat list sections
+    for attr, heading, limit, factory in _LIST_SECTIONS:
+        items = getattr(notes, attr)
+        if items:
+            append(_DIVIDER)
+            append(_heading(heading))
+            children.extend(map(factory, islice(items, limit)))
+    
+    # Notion takes at most 100 children per request: create the page with the
+    # first batch, then append the rest in order
+    first_batch = children[:NOTION_MAX_BLOCKS_PER_REQUEST]
+    overflow = children[NOTION_MAX_BLOCKS_PER_REQUEST:]
     total_blocks = len(children)
-    if remaining_batches:
-        print(f"  → Notion: {total_blocks} blocks, splitting into {1 + len(remaining_batches)} batches")
+    if overflow:
+        print(f"  → Notion: {total_blocks} blocks, appending {len(overflow)} after page creation")
     
-    # Create page with first batch
-    response = notion.pages.create(
+    response = _create_page(
+        notion,
         parent={"database_id": database_id},
         properties={
             "Title": {"title": [{"text": {"content": notes.title}}]},
             "URL": {"url": video_url},
-            "Date Added": {"date": {"start": date.today().isoformat()}}
+            "Date Added": {"date": {"start": _today_iso()}}
         },
         children=first_batch
     )
@@ -381,38 +614,18 @@ def create_lecture_notes_page(notion_token: str, database_id: str,
     page_id = response["id"]
     page_url = response["url"]
     
-    # Append remaining batches if any
-    if remaining_batches:
-        appended_blocks = len(first_batch)
-        for batch_num, batch in enumerate(remaining_batches, start=2):
+    if overflow:
+        appended_blocks = len(first_batch) + _append_blocks(notion, page_id, overflow)
+        if appended_blocks < total_blocks:
+            # Page exists with partial content; say so on the page
             try:
-                notion.blocks.children.append(
-                    block_id=page_id,
-                    children=batch
-                )
-                appended_blocks += len(batch)
-                print(f"  → Notion: Appended batch {batch_num}/{1 + len(remaining_batches)} ({len(batch)} blocks)")
-            except Exception as e:
-                # Log error but don't crash - page exists with partial content
-                print(f"  → Notion: Failed to append batch {batch_num}: {type(e).__name__}: {e}")
-                # Add a note that content was truncated
-                try:
-                    notion.blocks.children.append(
-                        block_id=page_id,
-                        children=[{
-                            "object": "block",
-                            "type": "callout",
-                            "callout": {
-                                "rich_text": [{"type": "text", "text": {"content": f"Note: Some content could not be saved ({total_blocks - appended_blocks} blocks). View the video for complete content."}}],
-                                "icon": {"emoji": "⚠️"},
-                                "color": "gray_background"
-                            }
-                        }]
-                    )
-                except Exception:
-                    pass  # Best effort - don't fail if we can't add the warning
-                break  # Stop trying additional batches after a failure
-        
+                missing = total_blocks - appended_blocks
+                _append_batch(notion, page_id, [_callout(
+                    [_text(f"Note: Some content could not be saved ({missing} blocks). View the video for complete content.")],
+                    "⚠️", "gray_background"
+                )])
+            except Exception:
+                pass  # Best effort - don't fail if we can't add the warning
         print(f"  → Notion: Successfully saved {appended_blocks}/{total_blocks} blocks")
     
     return page_url
@@ -428,14 +641,15 @@ def create_knowledge_map_page(notion_token: str, database_id: str,
     Returns:
         URL of the created Notion page
     """
-    notion = NotionClient(auth=notion_token)
-    today_str = date.today().strftime("%Y-%m-%d")
+    notion = _notion_for(notion_token)
+    today_str = _today_iso()
     
     topic_count = len(knowledge_map.topics)
     title_text = f"🗺️ Knowledge Map — {today_str}"
     
     # Create the page
-    page = notion.pages.create(
+    page = _create_page(
+        notion,
         parent={"database_id": database_id},
         properties={
             "Title": {"title": [{"text": {"content": title_text}}]},
@@ -465,7 +679,7 @@ def create_knowledge_map_page(notion_token: str, database_id: str,
     })
     
     # Divider
-    blocks.append({"object": "block", "type": "divider", "divider": {}})
+    blocks.append(_DIVIDER)
     
     # Topics section header
     blocks.append({
@@ -506,7 +720,7 @@ def create_knowledge_map_page(notion_token: str, database_id: str,
                 }
             })
             
-            for fact in topic.facts[:10]:  # Cap at 10 facts per topic
+            for fact in islice(topic.facts, 10):  # Cap at 10 facts per topic
                 source_text = f" — {fact.source_title}" if fact.source_title else ""
                 # Fact as bulleted list with source
                 rich_text = [
@@ -568,7 +782,7 @@ def create_knowledge_map_page(notion_token: str, database_id: str,
     
     # Connections section
     if knowledge_map.connections:
-        blocks.append({"object": "block", "type": "divider", "divider": {}})
+        blocks.append(_DIVIDER)
         blocks.append({
             "object": "block",
             "type": "heading_2",
@@ -592,15 +806,7 @@ def create_knowledge_map_page(notion_token: str, database_id: str,
                 }
             })
     
-    # Append blocks in batches (Notion limit: 100 blocks per request)
-    batch_size = 100
-    for i in range(0, len(blocks), batch_size):
-        batch = blocks[i:i + batch_size]
-        try:
-            notion.blocks.children.append(block_id=page_id, children=batch)
-        except Exception as e:
-            print(f"  → Notion: Error appending batch {i // batch_size + 1}: {e}")
-            break
+    _append_blocks(notion, page_id, blocks)
     
     print(f"  → Notion: Knowledge map page created with {len(blocks)} blocks")
     return page_url
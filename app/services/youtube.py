@@ -10,18 +10,50 @@ Provides functions for extracting video IDs, titles, and transcripts
 from YouTube videos using multiple fallback methods.
 """
 
-import os
 import re
-import json
 import time
-import tempfile
-import urllib.request
-from typing import Optional, List, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import BinaryIO, Iterable, Optional, List, Tuple
 
+import httpx
+import ijson
+import orjson
 import yt_dlp
 
-from ..config import PREFERRED_LANGUAGES
+from ..config import PREFERRED_LANGUAGES, YTDLP_FALLBACK_ENABLED
 from ..models import TranscriptSegment
+from .cache import cache_get, cache_set
+
+
+# Shared pool for oembed, InnerTube and caption downloads. These run in worker
+# threads (see get_transcript_with_timestamps callers); httpx.Client is thread-safe.
+_http = httpx.Client(http2=True, timeout=30, follow_redirects=True)
+
+
+def close_http_client() -> None:
+    """Close the pooled YouTube HTTP client (app shutdown)."""
+    _http.close()
+
+
+class _StreamReader:
+    """Minimal read()-only file view over a streaming httpx response, for ijson."""
+
+    def __init__(self, response: httpx.Response):
+        self._chunks = response.iter_bytes()
+
+    def read(self, size: int = -1) -> bytes:
+        if size == 0:  # ijson probes read(0) to tell bytes from str
+            return b""
+        return next(self._chunks, b"")
+
+
+# Compiled once at import: all supported URL shapes in a single alternation
+_VIDEO_ID_RE = re.compile(
+    r'(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/shorts/|youtube\.com/live/|youtube\.com/embed/)'
+    r'([a-zA-Z0-9_-]{11})'
+)
+_BARE_VIDEO_ID_RE = re.compile(r'[a-zA-Z0-9_-]{11}')
 
 
 def _retry_on_429(func, max_retries: int = 3, base_delay: float = 2.0):
@@ -90,156 +122,205 @@ def _retry_on_429(func, max_retries: int = 3, base_delay: float = 2.0):
     raise last_error if last_error else Exception("Retry failed")
 
 
+def _collapse_whitespace(text: str) -> str:
+    """Collapse whitespace runs to single spaces and trim the ends.
+    
+    str.split() with no separator is implemented in C and skips the regex
+    engine entirely, which matters on megabyte-sized transcripts.
+    """
+    return ' '.join(text.split())
+
+
+def _join_words(texts: Iterable[str]) -> str:
+    """Join text fragments with whitespace collapsed, in a single pass.
+    
+    Same result as _collapse_whitespace(' '.join(texts)) without building
+    the intermediate joined string first.
+    """
+    return ' '.join([word for text in texts for word in text.split()])
+
+
+@lru_cache(maxsize=4096)
 def extract_video_id(url: str) -> Optional[str]:
     """Extract video ID from various YouTube URL formats."""
     if not url:
         return None
-    patterns = [
-        r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/shorts\/|youtube\.com\/live\/)([a-zA-Z0-9_-]{11})',
-        r'(?:youtube\.com\/embed\/)([a-zA-Z0-9_-]{11})',
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-    if re.match(r'^[a-zA-Z0-9_-]{11}$', url):
-        return url
-    return None
+    match = _VIDEO_ID_RE.search(url)
+    if match:
+        return match.group(1)
+    return url if _BARE_VIDEO_ID_RE.fullmatch(url) else None
 
 
 def get_video_title(video_id: str) -> str:
-    """Get video title using oembed API (no auth required)."""
+    """Get video title using oembed API (no auth required).
+    
+    Memoized in-process and cached on disk by video ID; failed lookups
+    return 'Untitled Video' and are not cached, so they're retried next time.
+    """
     try:
-        oembed_url = f"https://www.youtube.com/oembed?url=https://www.youtube.com/watch?v={video_id}&format=json"
-        with urllib.request.urlopen(oembed_url, timeout=10) as response:
-            data = json.loads(response.read().decode('utf-8'))
-            return data.get('title', 'Untitled Video')
-    except (urllib.error.URLError, json.JSONDecodeError, KeyError, TimeoutError):
+        return _lookup_title(video_id)
+    except (httpx.HTTPError, orjson.JSONDecodeError, KeyError):
         return 'Untitled Video'
 
 
+@lru_cache(maxsize=2048)
+def _lookup_title(video_id: str) -> str:
+    """Disk cache, then oembed. Raises on failure (lru_cache never stores exceptions)."""
+    cached = cache_get("title", video_id)
+    if cached:
+        return cached
+    oembed_url = f"https://www.youtube.com/oembed?url=https://www.youtube.com/watch?v={video_id}&format=json"
+    response = _http.get(oembed_url, timeout=10)
+    response.raise_for_status()
+    title = orjson.loads(response.content).get('title', 'Untitled Video')
+    cache_set("title", video_id, title)
+    return title
+
+
+def forget_title(video_id: str) -> None:
+    """Drop memoized titles (the disk entry is removed by cache.invalidate_video)."""
+    # lru_cache can't evict a single key; invalidation is a rare admin action
+    _lookup_title.cache_clear()
+
+
+# oEmbed title lookups are independent of the transcript download, so they run
+# on this pool while the transcript is fetched instead of before/after it
+_title_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="yt-title")
+
+
+def _prefetch_title(video_id: str) -> "Future[str]":
+    """Start get_video_title in the background; call .result() when it's needed."""
+    return _title_pool.submit(get_video_title, video_id)
+
+
+# Transcript extraction blocks for seconds at a time (429 backoff, yt-dlp), so
+# async callers run it here rather than in the default executor that the
+# short Notion/Supabase to_thread calls share
+transcript_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="yt-transcript")
+
+
 def get_transcript(url: str) -> Tuple[str, str]:
-    """Fetch transcript. Tries youtube-transcript-api first, falls back to yt-dlp.
+    """Fetch transcript text and title.
     
-    Supports multiple languages with preference order:
-    1. English (manual or auto)
-    2. Video's original language (auto-generated)
-    3. Translation to English (if available)
-    4. yt-dlp fallback with expanded language support
+    Thin wrapper over get_transcript_with_timestamps, so the plain and
+    timestamped flows share one extraction and one cache entry per video.
     
     Returns:
         Tuple of (transcript_text, video_title)
     """
+    _, transcript, title = get_transcript_with_timestamps(url)
+    return transcript, title
+
+
+def _raw_entries(fetched) -> List[dict]:
+    """Normalize a fetched transcript to [{text, start, duration}] dicts."""
+    # FetchedTranscript (v1.2.4+) or a list of snippet objects (older versions)
+    if hasattr(fetched, 'to_raw_data'):
+        return fetched.to_raw_data()
+    return [{'text': s.text, 'start': s.start, 'duration': s.duration} for s in fetched]
+
+
+def _fetch_caption_entries(video_id: str) -> Optional[List[dict]]:
+    """Fetch raw caption entries with youtube-transcript-api.
     
-    video_id = extract_video_id(url)
-    if not video_id:
-        raise Exception("Could not extract video ID")
+    Lists the video's transcripts once and resolves the preferred language
+    with a single find_transcript(PREFERRED_LANGUAGES) call (manual before
+    auto-generated, in preference order). Then tries any transcript, then an
+    English translation.
     
-    print(f"  → Attempting transcript extraction for video: {video_id}")
+    Returns None when the video has no usable transcript. Other errors
+    (rate limits, IP blocks) propagate so callers can retry or fall back.
+    """
+    from youtube_transcript_api import NoTranscriptFound, TranscriptsDisabled, YouTubeTranscriptApi
+    from youtube_transcript_api._errors import (
+        NotTranslatable, PoTokenRequired, TranslationLanguageNotAvailable, YouTubeRequestFailed,
+    )
     
-    # Try youtube-transcript-api first (more reliable on servers)
+    # v1.2.4+ requires instance, not class methods (and list() not list_transcripts())
     try:
-        print("  → Trying youtube-transcript-api...")
-        from youtube_transcript_api import YouTubeTranscriptApi
-        
-        # v1.2.4+ requires instance, not class methods
-        ytt_api = YouTubeTranscriptApi()
-        
-        # Strategy 1: Try simple direct fetch first (most reliable)
-        print("  → Trying direct fetch...")
-        for lang in PREFERRED_LANGUAGES:
+        transcript_list = YouTubeTranscriptApi().list(video_id)
+    except TranscriptsDisabled:
+        print("  → Transcripts are disabled for this video")
+        return None
+    
+    available = [f"{t.language_code}({'manual' if not t.is_generated else 'auto'})" for t in transcript_list]
+    print(f"  → Available: {', '.join(available) if available else 'none'}")
+    
+    # Errors tied to one caption track, where another track may still work
+    track_errors = (PoTokenRequired, YouTubeRequestFailed)
+    
+    try:
+        transcript = transcript_list.find_transcript(PREFERRED_LANGUAGES)
+        entries = _raw_entries(transcript.fetch())
+        print(f"  → Found transcript in language: {transcript.language_code}")
+        return entries
+    except NoTranscriptFound:
+        print("  → No preferred language found, trying any available transcript...")
+    except track_errors as e:
+        print(f"  → Preferred transcript failed: {type(e).__name__}")
+    
+    for transcript in transcript_list:
+        try:
+            entries = _raw_entries(transcript.fetch())
+            print(f"  → Using {transcript.language} ({transcript.language_code}) transcript")
+            return entries
+        except track_errors as e:
+            print(f"  → Failed to fetch {transcript.language_code}: {type(e).__name__}")
+    
+    for transcript in transcript_list:
+        if transcript.is_translatable:
             try:
-                fetched = ytt_api.fetch(video_id, languages=[lang])
-                transcript_data = fetched.to_raw_data() if hasattr(fetched, 'to_raw_data') else list(fetched)
-                transcript = ' '.join([entry['text'] if isinstance(entry, dict) else entry.text for entry in transcript_data])
-                transcript = re.sub(r'\s+', ' ', transcript).strip()
-                
-                title = get_video_title(video_id)
-                print(f"  → Got transcript in {lang} ({len(transcript)} chars)")
-                return transcript, title
-            except Exception as e:
-                print(f"  → fetch({lang}) failed: {type(e).__name__}")
+                entries = _raw_entries(transcript.translate('en').fetch())
+                print(f"  → Translated from {transcript.language} to English")
+                return entries
+            except (NotTranslatable, TranslationLanguageNotAvailable) + track_errors:
                 continue
-        
-        # Strategy 2: List all transcripts and try each (v1.2.4 renamed list_transcripts to list)
-        try:
-            transcript_list = ytt_api.list(video_id)  # Note: list() not list_transcripts()
-            
-            # Strategy 1: Try to find transcript in preferred languages
-            transcript_data = None
-            for lang in PREFERRED_LANGUAGES:
-                try:
-                    transcript = transcript_list.find_transcript([lang])
-                    fetched = transcript.fetch()
-                    transcript_data = fetched.to_raw_data() if hasattr(fetched, 'to_raw_data') else fetched
-                    print(f"  → Found transcript in language: {lang}")
-                    break
-                except Exception:
-                    continue
-            
-            # Strategy 2: Get ANY available transcript (manual or generated)
-            if not transcript_data:
-                print("  → No preferred language found, trying any available transcript...")
-                try:
-                    for transcript in transcript_list:
-                        try:
-                            fetched = transcript.fetch()
-                            transcript_data = fetched.to_raw_data() if hasattr(fetched, 'to_raw_data') else fetched
-                            print(f"  → Using {transcript.language} ({transcript.language_code}) transcript")
-                            break
-                        except Exception as fetch_err:
-                            print(f"  → Failed to fetch {transcript.language_code}: {type(fetch_err).__name__}")
-                            continue
-                except Exception:
-                    pass
-            
-            # Strategy 3: Try translation to English
-            if not transcript_data:
-                print("  → Trying translation to English...")
-                try:
-                    for transcript in transcript_list:
-                        if transcript.is_translatable:
-                            translated = transcript.translate('en')
-                            fetched = translated.fetch()
-                            transcript_data = fetched.to_raw_data() if hasattr(fetched, 'to_raw_data') else fetched
-                            print(f"  → Translated from {transcript.language} to English")
-                            break
-                except Exception as trans_err:
-                    print(f"  → Translation failed: {type(trans_err).__name__}")
-            
-            if transcript_data:
-                transcript = ' '.join([entry['text'] for entry in transcript_data])
-                transcript = re.sub(r'\s+', ' ', transcript).strip()
-                
-                title = get_video_title(video_id)
-                print(f"  → Got transcript via youtube-transcript-api ({len(transcript)} chars)")
-                return transcript, title
-                
-        except Exception as list_err:
-            print(f"  → list() failed: {type(list_err).__name__}: {list_err}")
-        
-        print("  → youtube-transcript-api could not get transcript, trying yt-dlp")
-            
-    except ImportError as ie:
-        print(f"  → youtube-transcript-api not installed: {ie}, using yt-dlp")
-    except Exception as e:
-        print(f"  → youtube-transcript-api failed: {type(e).__name__}: {e}, trying yt-dlp")
     
-    # Fallback to yt-dlp
-    print("  → Falling back to yt-dlp...")
-    return _get_transcript_ytdlp(url)
+    return None
 
 
 def get_transcript_with_timestamps(url: str) -> Tuple[List[TranscriptSegment], str, str]:
+    """Fetch timestamped transcript, served from the on-disk cache when possible.
+    
+    See _fetch_transcript_with_timestamps for the extraction strategy.
+    
+    Returns: (segments: List[TranscriptSegment], flat_text: str, title: str)
+    """
+    video_id = extract_video_id(url)
+    if not video_id:
+        raise Exception("Could not extract video ID")
+    
+    cached = cache_get("segments", video_id)
+    if cached:
+        print(f"  → Using cached timestamped transcript for: {video_id}")
+        segments = [TranscriptSegment(text=t, start_time=s, end_time=e) for t, s, e in cached["segments"]]
+        return segments, cached["text"], cached["title"]
+    
+    segments, flat_text, title = _fetch_transcript_with_timestamps(url)
+    cache_set("segments", video_id, {
+        "segments": [[s.text, s.start_time, s.end_time] for s in segments],
+        "text": flat_text,
+        "title": title,
+    })
+    return segments, flat_text, title
+
+
+def _fetch_transcript_with_timestamps(url: str) -> Tuple[List[TranscriptSegment], str, str]:
     """Fetch transcript with timestamp data for each segment.
     
     Returns: (segments: List[TranscriptSegment], flat_text: str, title: str)
     
-    This enhanced version preserves timing information for:
+    Timing information is preserved for:
     - Generating timestamped notes
     - Creating clickable video links
     - Identifying natural section breaks
     
+    Languages are tried in preference order:
+    1. PREFERRED_LANGUAGES, manual before auto-generated
+    2. Any available transcript
+    3. Translation to English (if available)
+    4. InnerTube / yt-dlp fallback with expanded language support
+    
     Uses retry logic with exponential backoff to handle YouTube 429 errors.
     """
     video_id = extract_video_id(url)
@@ -248,80 +329,11 @@ def get_transcript_with_timestamps(url: str) -> Tuple[List[TranscriptSegment], s
     
     print(f"  → Extracting timestamped transcript for: {video_id}")
     
-    # Get title early (less likely to be rate limited)
-    title = get_video_title(video_id)
+    # Title is fetched alongside the transcript (less likely to be rate limited)
+    title_future = _prefetch_title(video_id)
     
-    # Wrap entire extraction in retry logic
     def try_extract_transcript():
-        from youtube_transcript_api import YouTubeTranscriptApi
-        
-        # v1.2.4+ requires instance, not class methods
-        ytt_api = YouTubeTranscriptApi()
-        
-        # Strategy 1: Simple direct fetch (most reliable in v1.2.4)
-        for lang in PREFERRED_LANGUAGES:
-            try:
-                fetched = ytt_api.fetch(video_id, languages=[lang])
-                # Handle FetchedTranscript (v1.2.4) or raw list (older versions)
-                if hasattr(fetched, 'to_raw_data'):
-                    transcript_data = fetched.to_raw_data()
-                else:
-                    # Convert FetchedTranscriptSnippet objects to dicts
-                    transcript_data = [{'text': s.text, 'start': s.start, 'duration': s.duration} for s in fetched]
-                print(f"  → Got transcript via fetch() in {lang}")
-                return transcript_data
-            except Exception as e:
-                err_str = str(e).lower()
-                if 'no transcript' not in err_str and 'could not find' not in err_str:
-                    print(f"  → fetch({lang}): {type(e).__name__}")
-                continue
-        
-        # Strategy 2: List all available and try each (v1.2.4: list() not list_transcripts())
-        try:
-            transcript_list = ytt_api.list(video_id)
-            
-            # Log available transcripts
-            available = [f"{t.language_code}({'manual' if not t.is_generated else 'auto'})" for t in transcript_list]
-            print(f"  → Available: {', '.join(available) if available else 'none'}")
-            
-            # Try preferred languages first
-            for lang in PREFERRED_LANGUAGES:
-                try:
-                    transcript = transcript_list.find_transcript([lang])
-                    fetched = transcript.fetch()
-                    if hasattr(fetched, 'to_raw_data'):
-                        return fetched.to_raw_data()
-                    return [{'text': s.text, 'start': s.start, 'duration': s.duration} for s in fetched]
-                except Exception:
-                    continue
-            
-            # Try any available transcript
-            for transcript in transcript_list:
-                try:
-                    fetched = transcript.fetch()
-                    if hasattr(fetched, 'to_raw_data'):
-                        return fetched.to_raw_data()
-                    return [{'text': s.text, 'start': s.start, 'duration': s.duration} for s in fetched]
-                except Exception as e:
-                    print(f"  → {transcript.language_code}: {type(e).__name__}")
-                    continue
-            
-            # Try translation to English
-            for transcript in transcript_list:
-                if transcript.is_translatable:
-                    try:
-                        translated = transcript.translate('en')
-                        fetched = translated.fetch()
-                        if hasattr(fetched, 'to_raw_data'):
-                            return fetched.to_raw_data()
-                        return [{'text': s.text, 'start': s.start, 'duration': s.duration} for s in fetched]
-                    except Exception:
-                        continue
-                        
-        except Exception as list_err:
-            print(f"  → list() failed: {type(list_err).__name__}: {list_err}")
-        
-        return None
+        return _fetch_caption_entries(video_id)
     
     # Try with retry logic for 429 errors
     transcript_data = None
@@ -351,40 +363,31 @@ def get_transcript_with_timestamps(url: str) -> Tuple[List[TranscriptSegment], s
                     end_time=start + duration
                 ))
         
-        flat_text = ' '.join([s.text for s in segments])
-        flat_text = re.sub(r'\s+', ' ', flat_text).strip()
+        flat_text = _join_words(s.text for s in segments)
         
         print(f"  → Got {len(segments)} timestamped segments ({len(flat_text)} chars)")
-        return segments, flat_text, title
+        return segments, flat_text, title_future.result()
     
-    # Fallback: Try yt-dlp with retry (wraps single call, no cascade)
-    print("  → Falling back to yt-dlp...")
+    # Fallback: InnerTube caption lookup (then yt-dlp) with retry (wraps single call, no cascade)
     try:
-        def try_ytdlp():
-            return _get_transcript_ytdlp(url)
+        def try_fallback():
+            return _get_transcript_fallback(url)
         
-        flat_text, ytdlp_title = _retry_on_429(try_ytdlp, max_retries=2, base_delay=5.0)
-        title = ytdlp_title or title
+        flat_text, ytdlp_title = _retry_on_429(try_fallback, max_retries=2, base_delay=5.0)
+        title = ytdlp_title or title_future.result()
         
-        # Create pseudo-segments
+        # Create pseudo-segments: 75 words is ~30 seconds at 150 wpm
         words = flat_text.split()
-        words_per_segment = 75  # ~30 seconds at 150 wpm
-        segments = []
-        
-        for i in range(0, len(words), words_per_segment):
-            chunk_words = words[i:i + words_per_segment]
-            estimated_start = (i / 150) * 60
-            segments.append(TranscriptSegment(
-                text=' '.join(chunk_words),
-                start_time=estimated_start,
-                end_time=estimated_start + 30
-            ))
+        segments = [
+            TranscriptSegment(' '.join(words[i:i + 75]), (i / 150) * 60, (i / 150) * 60 + 30)
+            for i in range(0, len(words), 75)
+        ]
         
         return segments, flat_text, title
         
     except Exception as e:
         error_str = str(e).lower()
-        print(f"  → yt-dlp failed: {type(e).__name__}: {str(e)[:100]}")
+        print(f"  → Fallback extraction failed: {type(e).__name__}: {str(e)[:100]}")
         
         # All fallbacks exhausted - return appropriate error
         if '429' in error_str or 'too many' in error_str or 'bot' in error_str:
@@ -395,6 +398,108 @@ def get_transcript_with_timestamps(url: str) -> Tuple[List[TranscriptSegment], s
             raise
 
 
+def _get_transcript_fallback(url: str) -> Tuple[str, str]:
+    """Server-side fallback: InnerTube caption lookup, then yt-dlp if enabled.
+    
+    Returns:
+        Tuple of (transcript_text, video_title)
+    """
+    video_id = extract_video_id(url)
+    try:
+        print("  → Falling back to InnerTube caption lookup...")
+        return _get_transcript_innertube(video_id)
+    except Exception as e:
+        if not YTDLP_FALLBACK_ENABLED:
+            raise
+        print(f"  → InnerTube failed: {type(e).__name__}: {str(e)[:100]}")
+    
+    print("  → Falling back to yt-dlp...")
+    return _get_transcript_ytdlp(url)
+
+
+# InnerTube player API (what the YouTube Android app calls). Returns caption
+# track URLs directly, without spinning up a yt-dlp extractor.
+_INNERTUBE_PLAYER_URL = "https://www.youtube.com/youtubei/v1/player"
+_INNERTUBE_CLIENT_VERSION = "19.09.37"
+_INNERTUBE_USER_AGENT = f"com.google.android.youtube/{_INNERTUBE_CLIENT_VERSION} (Linux; U; Android 11) gzip"
+
+
+def _get_transcript_innertube(video_id: str) -> Tuple[str, str]:
+    """Fetch transcript via a single InnerTube player call plus the json3 caption download.
+    
+    Returns:
+        Tuple of (transcript_text, video_title)
+    """
+    payload = {
+        "context": {
+            "client": {
+                "clientName": "ANDROID",
+                "clientVersion": _INNERTUBE_CLIENT_VERSION,
+                "androidSdkVersion": 30,
+                "hl": "en",
+            }
+        },
+        "videoId": video_id,
+    }
+    response = _http.post(
+        _INNERTUBE_PLAYER_URL,
+        content=orjson.dumps(payload),
+        headers={
+            'Content-Type': 'application/json',
+            'User-Agent': _INNERTUBE_USER_AGENT,
+        },
+        timeout=15,
+    )
+    response.raise_for_status()
+    player = orjson.loads(response.content)
+    
+    title = player.get('videoDetails', {}).get('title') or 'Untitled Video'
+    tracks = (
+        player.get('captions', {})
+        .get('playerCaptionsTracklistRenderer', {})
+        .get('captionTracks', [])
+    )
+    caption_url = _pick_caption_track(tracks)
+    if not caption_url:
+        raise Exception("No subtitles available for this video")
+    
+    transcript = _download_json3(f"{caption_url}&fmt=json3")
+    
+    if not transcript:
+        raise Exception("Could not extract transcript text")
+    
+    print(f"  → Got transcript via InnerTube ({len(transcript)} chars)")
+    return transcript, title
+
+
+def _pick_caption_track(tracks: List[dict]) -> Optional[str]:
+    """Pick the best caption track URL: manual in a preferred language, then
+    auto-generated ("asr") in a preferred language, then whatever exists."""
+    for want_auto in (False, True):
+        for lang in PREFERRED_LANGUAGES:
+            for track in tracks:
+                if track.get('languageCode') == lang and (track.get('kind') == 'asr') == want_auto:
+                    return track.get('baseUrl')
+    return tracks[0].get('baseUrl') if tracks else None
+
+
+def _json3_to_text(source: BinaryIO) -> str:
+    """Flatten a json3 caption document into normalized plain text.
+    
+    Streams segment text straight from a binary file-like object (e.g. the
+    HTTP response) with ijson, so neither the document nor per-event dicts
+    are ever built; only the words of the final transcript are kept.
+    """
+    return _join_words(ijson.items(source, 'events.item.segs.item.utf8'))
+
+
+def _download_json3(url: str) -> str:
+    """Stream a json3 caption document through _json3_to_text."""
+    with _http.stream("GET", url) as response:
+        response.raise_for_status()
+        return _json3_to_text(_StreamReader(response))
+
+
 def _get_transcript_ytdlp(url: str) -> Tuple[str, str]:
     """Fetch transcript using yt-dlp (fallback method). Returns (transcript, title)."""
     
@@ -419,58 +524,45 @@ def _get_transcript_ytdlp(url: str) -> Tuple[str, str]:
         'extractor_retries': 3,
     }
     
-    with tempfile.TemporaryDirectory() as tmpdir:
-        ydl_opts['outtmpl'] = os.path.join(tmpdir, '%(id)s.%(ext)s')
-        
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            title = info.get('title', 'Untitled Video')
-            
-            subtitles = info.get('subtitles', {})
-            auto_captions = info.get('automatic_captions', {})
-            
-            transcript_url = None
-            
-            # Try manual subtitles first
-            for lang in PREFERRED_LANGUAGES:
-                if lang in subtitles:
-                    for fmt in subtitles[lang]:
-                        if fmt.get('ext') == 'json3':
-                            transcript_url = fmt.get('url')
-                            break
-                if transcript_url:
+    # Metadata only: nothing is written to disk, so no output dir/template is
+    # needed, and the extractor is closed before the subtitle download starts
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+    
+    title = info.get('title', 'Untitled Video')
+    
+    subtitles = info.get('subtitles', {})
+    auto_captions = info.get('automatic_captions', {})
+    
+    transcript_url = None
+    
+    # Try manual subtitles first
+    for lang in PREFERRED_LANGUAGES:
+        if lang in subtitles:
+            for fmt in subtitles[lang]:
+                if fmt.get('ext') == 'json3':
+                    transcript_url = fmt.get('url')
                     break
-            
-            # Fall back to auto-generated
-            if not transcript_url:
-                for lang in PREFERRED_LANGUAGES:
-                    if lang in auto_captions:
-                        for fmt in auto_captions[lang]:
-                            if fmt.get('ext') == 'json3':
-                                transcript_url = fmt.get('url')
-                                break
-                    if transcript_url:
+        if transcript_url:
+            break
+    
+    # Fall back to auto-generated
+    if not transcript_url:
+        for lang in PREFERRED_LANGUAGES:
+            if lang in auto_captions:
+                for fmt in auto_captions[lang]:
+                    if fmt.get('ext') == 'json3':
+                        transcript_url = fmt.get('url')
                         break
-            
-            if not transcript_url:
-                raise Exception("No subtitles available for this video")
-            
-            with urllib.request.urlopen(transcript_url) as response:
-                transcript_data = json.loads(response.read().decode('utf-8'))
-            
-            events = transcript_data.get('events', [])
-            texts = []
-            for event in events:
-                segs = event.get('segs', [])
-                for seg in segs:
-                    text = seg.get('utf8', '').strip()
-                    if text and text != '\n':
-                        texts.append(text)
-            
-            transcript = ' '.join(texts)
-            transcript = re.sub(r'\s+', ' ', transcript).strip()
-            
-            if not transcript:
-                raise Exception("Could not extract transcript text")
-            
-            return transcript, title
+            if transcript_url:
+                break
+    
+    if not transcript_url:
+        raise Exception("No subtitles available for this video")
+    
+    transcript = _download_json3(transcript_url)
+    
+    if not transcript:
+        raise Exception("Could not extract transcript text")
+    
+    return transcript, title
@@ -15,13 +15,18 @@ import asyncio
 import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
 from app.config import ALLOWED_ORIGINS, validate_startup, setup_logging
-from app.routers import auth, summarize, history, status, config_router, knowledge
+from app.routers import auth, summarize, history, status, config_router, knowledge, cache_router
+from app.routers.auth import reset_monthly_usage
+from app.services import gemini, notion, youtube
+from app.services.cache import prune_expired
+from app.services.jobs import cleanup_old_jobs
 
 logger = logging.getLogger(__name__)
 
@@ -44,18 +49,30 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     cleanup_task.cancel()
+    await gemini.close_http_clients()
+    await notion.close_http_client()
+    youtube.close_http_client()
     logger.info("Application shutting down")
 
 
 async def _periodic_job_cleanup():
-    """Periodically clean up old jobs (every hour)."""
-    from app.services.jobs import cleanup_old_jobs
+    """Periodically clean up old jobs and expired cache entries, apply
+    monthly usage resets and resume orphaned bulk jobs (every hour)."""
     while True:
         try:
             await asyncio.sleep(3600)  # 1 hour
             count = await cleanup_old_jobs(max_age_hours=24)
             if count > 0:
                 logger.info(f"Cleaned up {count} old jobs")
+            pruned = await asyncio.to_thread(prune_expired)
+            if pruned > 0:
+                logger.info(f"Pruned {pruned} expired cache entries")
+            reset = await asyncio.to_thread(reset_monthly_usage)
+            if reset > 0:
+                logger.info(f"Reset monthly usage for {reset} users")
+            resumed = await summarize.resume_bulk_jobs()
+            if resumed > 0:
+                logger.info(f"Resumed {resumed} bulk jobs")
         except asyncio.CancelledError:
             break
         except Exception as e:
@@ -68,6 +85,7 @@ app = FastAPI(
     version="3.6.0",
     description="Summarize YouTube videos and save to Notion",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Add rate limiter to app state
@@ -81,7 +99,7 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS if ALLOWED_ORIGINS != ["*"] else ["*"],
     allow_credentials=True,
-    allow_methods=["GET", "POST", "OPTIONS"],
+    allow_methods=["GET", "POST", "DELETE", "OPTIONS"],
     allow_headers=["Authorization", "Content-Type"],
 )
 
@@ -92,6 +110,7 @@ app.include_router(history.router)
 app.include_router(status.router)
 app.include_router(config_router.router)
 app.include_router(knowledge.router)
+app.include_router(cache_router.router)
 
 
 @app.get("/")
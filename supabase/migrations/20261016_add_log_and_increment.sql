@@ -0,0 +1,26 @@
+-- Migration: Log a summary and bump the usage counter in one round-trip
+-- Previously the API made two calls per summary (summaries insert + increment_summaries)
+
+CREATE OR REPLACE FUNCTION log_and_increment(
+    p_user_id UUID,
+    p_url TEXT,
+    p_title TEXT,
+    p_notion_url TEXT DEFAULT NULL
+)
+RETURNS UUID AS $$
+DECLARE
+    new_id UUID;
+BEGIN
+    INSERT INTO public.summaries (user_id, youtube_url, title, notion_url)
+    VALUES (p_user_id, p_url, p_title, p_notion_url)
+    RETURNING id INTO new_id;
+
+    UPDATE public.users
+    SET
+        summaries_this_month = summaries_this_month + 1,
+        updated_at = NOW()
+    WHERE id = p_user_id;
+
+    RETURN new_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
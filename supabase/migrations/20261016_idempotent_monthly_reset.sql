@@ -0,0 +1,21 @@
+-- Migration: Make the monthly usage reset safe to run on a schedule
+-- Only rows last reset before the current month are touched, so the API can
+-- call it hourly instead of resetting users one by one on their next request
+
+DROP FUNCTION IF EXISTS reset_monthly_summaries();
+
+CREATE OR REPLACE FUNCTION reset_monthly_summaries()
+RETURNS INTEGER AS $$
+DECLARE
+    reset_count INTEGER;
+BEGIN
+    UPDATE public.users
+    SET
+        summaries_this_month = 0,
+        summaries_reset_at = NOW()
+    WHERE summaries_reset_at < date_trunc('month', NOW());
+
+    GET DIAGNOSTICS reset_count = ROW_COUNT;
+    RETURN reset_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
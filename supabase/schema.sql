@@ -71,15 +71,45 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql SECURITY DEFINER;
 
--- Function to reset monthly summaries (run via cron)
+-- Function to log a summary and increment the count in one transaction
+CREATE OR REPLACE FUNCTION log_and_increment(
+    p_user_id UUID,
+    p_url TEXT,
+    p_title TEXT,
+    p_notion_url TEXT DEFAULT NULL
+)
+RETURNS UUID AS $$
+DECLARE
+    new_id UUID;
+BEGIN
+    INSERT INTO public.summaries (user_id, youtube_url, title, notion_url)
+    VALUES (p_user_id, p_url, p_title, p_notion_url)
+    RETURNING id INTO new_id;
+
+    UPDATE public.users
+    SET
+        summaries_this_month = summaries_this_month + 1,
+        updated_at = NOW()
+    WHERE id = p_user_id;
+
+    RETURN new_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Function to reset monthly summaries (run hourly by the API; idempotent)
 CREATE OR REPLACE FUNCTION reset_monthly_summaries()
-RETURNS VOID AS $$
+RETURNS INTEGER AS $$
+DECLARE
+    reset_count INTEGER;
 BEGIN
-    UPDATE public.users 
-    SET 
+    UPDATE public.users
+    SET
         summaries_this_month = 0,
         summaries_reset_at = NOW()
-    WHERE subscription_tier = 'free';
+    WHERE summaries_reset_at < date_trunc('month', NOW());
+
+    GET DIAGNOSTICS reset_count = ROW_COUNT;
+    RETURN reset_count;
 END;
 $$ LANGUAGE plpgsql SECURITY DEFINER;
 
@@ -0,0 +1,285 @@
+"""
+Tests for token verification and the user profile cache in the auth router.
+
+Supabase is mocked; tokens are signed locally with a test secret.
+"""
+
+import asyncio
+import time
+
+import jwt
+import pytest
+from fastapi import HTTPException
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.routers import auth
+
+
+SECRET = "test-jwt-secret-at-least-32-bytes-long"
+
+
+def _token(sub="user-1", secret=SECRET, **claims):
+    payload = {"sub": sub, "aud": "authenticated", "email": "a@b.c", "exp": int(time.time()) + 60}
+    payload.update(claims)
+    return jwt.encode(payload, secret, algorithm="HS256")
+
+
+def _mock_supabase(profile):
+    client = MagicMock()
+    client.table.return_value.select.return_value.in_.return_value.execute.return_value.data = [profile]
+    return client
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    auth._user_cache.clear()
+    auth._token_cache.clear()
+    auth._me_cache.clear()
+    yield
+    auth._user_cache.clear()
+    auth._token_cache.clear()
+    auth._me_cache.clear()
+
+
+class TestLocalVerification:
+    """Tests for get_current_user with SUPABASE_JWT_SECRET configured."""
+
+    @pytest.mark.asyncio
+    async def test_profile_cached_after_first_lookup(self):
+        client = _mock_supabase({"id": "user-1", "subscription_tier": "pro"})
+        with patch.object(auth, "SUPABASE_JWT_SECRET", SECRET), patch.object(auth, "supabase", client):
+            first = await auth.get_current_user(f"Bearer {_token()}")
+            second = await auth.get_current_user(f"Bearer {_token()}")
+
+        assert first == second == {"id": "user-1", "subscription_tier": "pro"}
+        client.auth.get_user.assert_not_called()
+        client.table.return_value.select.assert_called_once_with(auth.USER_PROFILE_COLUMNS)
+
+    @pytest.mark.asyncio
+    async def test_missing_profile_created(self):
+        client = _mock_supabase(None)
+        client.table.return_value.select.return_value.in_.return_value.execute.return_value.data = []
+        with patch.object(auth, "SUPABASE_JWT_SECRET", SECRET), patch.object(auth, "supabase", client):
+            user = await auth.get_current_user(f"Bearer {_token()}")
+
+        assert user["id"] == "user-1" and user["subscription_tier"] == "free"
+        client.table.return_value.insert.assert_called_once_with(user)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_query(self):
+        client = MagicMock()
+        client.table.return_value.select.return_value.in_.return_value.execute.return_value.data = [
+            {"id": "user-1", "subscription_tier": "pro"}, {"id": "user-2", "subscription_tier": "free"},
+        ]
+        with patch.object(auth, "SUPABASE_JWT_SECRET", SECRET), patch.object(auth, "supabase", client):
+            users = await asyncio.gather(*(
+                auth.get_current_user(f"Bearer {_token(sub)}") for sub in ("user-1", "user-2", "user-1")
+            ))
+
+        assert [u["subscription_tier"] for u in users] == ["pro", "free", "pro"]
+        client.table.return_value.select.return_value.in_.assert_called_once_with("id", ["user-1", "user-2"])
+
+    @pytest.mark.asyncio
+    async def test_failed_lookup_not_treated_as_new_user(self):
+        client = MagicMock()
+        client.table.return_value.select.return_value.in_.return_value.execute.side_effect = RuntimeError("timeout")
+        with patch.object(auth, "SUPABASE_JWT_SECRET", SECRET), patch.object(auth, "supabase", client):
+            with pytest.raises(HTTPException) as exc:
+                await auth.get_current_user(f"Bearer {_token()}")
+
+        assert exc.value.status_code == 401
+        client.table.return_value.insert.assert_not_called()
+        assert auth._profile_flush is None and not auth._pending_profiles
+
+    @pytest.mark.asyncio
+    async def test_bad_signature_rejected(self):
+        client = _mock_supabase({"id": "user-1"})
+        with patch.object(auth, "SUPABASE_JWT_SECRET", SECRET), patch.object(auth, "supabase", client):
+            with pytest.raises(HTTPException) as exc:
+                await auth.get_current_user(f"Bearer {_token(secret='another-secret-that-is-also-32-bytes')}")
+
+        assert exc.value.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_expired_token_rejected(self):
+        client = _mock_supabase({"id": "user-1"})
+        with patch.object(auth, "SUPABASE_JWT_SECRET", SECRET), patch.object(auth, "supabase", client):
+            with pytest.raises(HTTPException) as exc:
+                await auth.get_current_user(f"Bearer {_token(exp=int(time.time()) - 10)}")
+
+        assert exc.value.status_code == 401
+
+
+class TestRemoteVerification:
+    """Tests for the per-token cache used when tokens are verified by Supabase."""
+
+    @pytest.mark.asyncio
+    async def test_supabase_asked_once_per_token(self):
+        client = _mock_supabase({"id": "user-1"})
+        client.auth.get_user.return_value.user.id = "user-1"
+        client.auth.get_user.return_value.user.email = "a@b.c"
+        token = _token()
+        with patch.object(auth, "SUPABASE_JWT_SECRET", None), patch.object(auth, "supabase", client):
+            await auth.get_current_user(f"Bearer {token}")
+            auth._forget_user("user-1")  # Force the profile lookup again
+            await auth.get_current_user(f"Bearer {token}")
+
+        assert client.auth.get_user.call_count == 1
+        assert token not in str(auth._token_cache._data)
+
+    @pytest.mark.asyncio
+    async def test_only_cache_miss_leaves_event_loop(self):
+        client = _mock_supabase({"id": "user-1"})
+        client.auth.get_user.return_value.user.id = "user-1"
+        token = _token()
+        with patch.object(auth, "SUPABASE_JWT_SECRET", None), patch.object(auth, "supabase", client), \
+             patch.object(auth.asyncio, "to_thread", wraps=auth.asyncio.to_thread) as to_thread:
+            await auth._identify(token)
+            await auth._identify(token)
+
+        assert [c.args[0] for c in to_thread.call_args_list] == [auth._verify_token]
+
+    def test_ttl_capped_by_token_expiry(self):
+        assert auth._token_ttl(_token(exp=int(time.time()) + 5)) <= 5
+        assert auth._token_ttl(_token(exp=int(time.time()) - 5)) <= 0
+
+
+class TestProfileCache:
+    """Tests for cache expiry and invalidation."""
+
+    def test_usage_write_counted_in_cache(self):
+        auth._remember_user({"id": "user-1", "summaries_this_month": 1})
+        with patch.object(auth, "supabase", MagicMock()):
+            auth.increment_usage("user-1")
+            auth.log_summary_and_increment("user-1", "https://youtu.be/x", "T")
+
+        assert auth._cached_user("user-1")["summaries_this_month"] == 3
+
+    def test_usage_write_without_cached_profile(self):
+        with patch.object(auth, "supabase", MagicMock()):
+            auth.increment_usage("user-1")
+
+        assert auth._cached_user("user-1") is None
+
+    def test_expired_entry_ignored(self):
+        auth._user_cache.set("user-1", {"id": "user-1"}, ttl=-1)
+        assert auth._cached_user("user-1") is None
+
+    def test_eviction_keeps_size_bounded(self):
+        cache = auth._TTLCache(maxsize=3, ttl=60)
+        for i in range(5):
+            cache.set(str(i), i)
+        assert cache.get("0") is None
+        assert cache.get("4") == 4
+        assert len(cache._data) == 3
+
+    def test_returns_copy(self):
+        auth._remember_user({"id": "user-1", "subscription_tier": "free"})
+        auth._cached_user("user-1")["subscription_tier"] = "admin"
+        assert auth._cached_user("user-1")["subscription_tier"] == "free"
+
+
+class TestProfileEndpoint:
+    """Tests for the cached /me response."""
+
+    @pytest.mark.asyncio
+    async def test_response_reused_until_usage_changes(self):
+        user = {"id": "user-1", "email": "a@b.c", "subscription_tier": "free", "summaries_this_month": 1}
+        first = await auth.get_profile(user)
+        assert await auth.get_profile({**user, "summaries_this_month": 2}) is first
+
+        with patch.object(auth, "supabase", MagicMock()):
+            auth.increment_usage("user-1")
+        fresh = await auth.get_profile({**user, "summaries_this_month": 2})
+
+        assert fresh["summaries_remaining"] == first["summaries_remaining"] - 1
+
+
+class TestMonthlyReset:
+    """Tests for the month rollover in check_rate_limit."""
+
+    def test_reset_only_applies_to_stale_rows(self):
+        client = MagicMock()
+        user = {"id": "user-1", "subscription_tier": "free", "summaries_this_month": 99,
+                "summaries_reset_at": "2020-01-15T00:00:00+00:00"}
+        with patch.object(auth, "supabase", client):
+            assert auth.check_rate_limit(user) == auth.FREE_TIER_LIMIT
+
+        update = client.table.return_value.update.return_value
+        update.eq.assert_called_once_with("id", "user-1")
+        column, month_start = update.eq.return_value.lt.call_args.args
+        assert column == "summaries_reset_at"
+        assert month_start.endswith("T00:00:00+00:00") and month_start[8:10] == "01"
+
+    def test_scheduled_reset_drops_cached_profiles(self):
+        client = MagicMock()
+        client.rpc.return_value.execute.return_value.data = 2
+        auth._remember_user({"id": "user-1", "summaries_this_month": 9})
+        with patch.object(auth, "supabase", client):
+            assert auth.reset_monthly_usage() == 2
+
+        client.rpc.assert_called_once_with("reset_monthly_summaries", {})
+        assert auth._cached_user("user-1") is None
+
+
+class TestNotionDatabaseDiscovery:
+    """Tests for picking the summaries database after OAuth (Notion and Supabase mocked)."""
+
+    def _run(self, existing_id, notion):
+        client = MagicMock()
+        client.table.return_value.select.return_value.eq.return_value.limit.return_value.execute.return_value.data = [
+            {"notion_database_id": existing_id}
+        ]
+        with patch.object(auth, "supabase", client), \
+             patch("app.services.notion._notion_for", return_value=notion):
+            return auth._find_notion_database("user-1", "tok")
+
+    def test_existing_database_reused_without_search(self):
+        notion = MagicMock()
+        assert self._run("db-old", notion) == "db-old"
+        notion.databases.retrieve.assert_called_once_with(database_id="db-old")
+        notion.search.assert_not_called()
+
+    def test_keyword_match_preferred(self):
+        notion = MagicMock()
+        notion.databases.retrieve.side_effect = RuntimeError("no access")
+        notion.search.return_value = {"results": [
+            {"id": "db-1", "title": [{"plain_text": "Reading list"}]},
+            {"id": "db-2", "title": [{"plain_text": "YouTube Notes"}]},
+        ]}
+        assert self._run("db-old", notion) == "db-2"
+
+    def test_later_pages_searched_until_match(self):
+        notion = MagicMock()
+        notion.search.side_effect = [
+            {"results": [{"id": "db-1", "title": [{"plain_text": "Reading list"}]}], "has_more": True, "next_cursor": "c2"},
+            {"results": [{"id": "db-2", "title": [{"plain_text": "Watch later"}]}], "has_more": True, "next_cursor": "c3"},
+        ]
+        assert self._run(None, notion) == "db-2"
+        assert notion.search.call_count == 2
+        assert notion.search.call_args.kwargs["start_cursor"] == "c2"
+
+
+class TestNotionCallback:
+    """Tests for the deep-link redirects returned by the OAuth callback."""
+
+    @pytest.mark.asyncio
+    async def test_failed_exchange_redirects_with_error(self):
+        response = MagicMock(status_code=400, text="bad code")
+        with patch.object(auth, "NOTION_CLIENT_ID", "client"), patch.object(auth, "NOTION_CLIENT_SECRET", "secret"), \
+             patch.object(auth, "exchange_oauth_code", AsyncMock(return_value=response)):
+            redirect = await auth.notion_auth_callback("code", "user-1:nonce")
+
+        assert redirect.status_code == 302
+        assert redirect.headers["location"] == "watchlater://notion-connected?success=false&error=token_exchange_failed"
+
+    @pytest.mark.asyncio
+    async def test_unconfigured_server(self):
+        with patch.object(auth, "NOTION_CLIENT_SECRET", None):
+            redirect = await auth.notion_auth_callback("code", "user-1:nonce")
+
+        assert redirect.headers["location"].endswith("error=server_not_configured")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,82 @@
+"""
+Tests for the on-disk video cache.
+"""
+
+import os
+import pytest
+
+from app.services import cache
+from app.services.cache import (
+    cache_get, cache_set, content_hash, invalidate_video, prune_expired
+)
+
+
+@pytest.fixture(autouse=True)
+def tmp_cache_dir(tmp_path, monkeypatch):
+    """Point the cache at a fresh temp directory for each test."""
+    monkeypatch.setattr(cache, "_cache_dir", str(tmp_path))
+    yield tmp_path
+
+
+class TestCacheGetSet:
+    def test_round_trip(self):
+        cache_set("title", "dQw4w9WgXcQ", "Never Gonna Give You Up")
+        assert cache_get("title", "dQw4w9WgXcQ") == "Never Gonna Give You Up"
+
+    def test_missing_key_returns_none(self):
+        assert cache_get("title", "missing12345") is None
+
+    def test_expired_entry_returns_none(self):
+        cache_set("title", "dQw4w9WgXcQ", "Old", ttl_seconds=-1)
+        assert cache_get("title", "dQw4w9WgXcQ") is None
+
+    def test_unsafe_key_is_hashed(self, tmp_cache_dir):
+        cache_set("notes", "../../etc/passwd", {"a": 1})
+        assert cache_get("notes", "../../etc/passwd") == {"a": 1}
+        files = os.listdir(tmp_cache_dir / "notes")
+        assert len(files) == 1 and ".." not in files[0]
+
+    def test_corrupt_entry_returns_none(self, tmp_cache_dir):
+        (tmp_cache_dir / "title").mkdir()
+        (tmp_cache_dir / "title" / "dQw4w9WgXcQ.json").write_text("{not json")
+        assert cache_get("title", "dQw4w9WgXcQ") is None
+
+
+class TestContentHash:
+    def test_part_boundaries_matter(self):
+        assert content_hash("a\nb") != content_hash("a", "b")
+        assert content_hash("a", "b") != content_hash("ab")
+        assert content_hash("a", "b") != content_hash("a", "b", "")
+
+    def test_stable(self):
+        assert content_hash("v1", "title", "text") == content_hash("v1", "title", "text")
+
+    def test_non_str_part_rejected(self):
+        with pytest.raises(TypeError):
+            content_hash("v1", None)
+
+
+class TestInvalidation:
+    def test_invalidate_removes_all_namespaces(self):
+        vid = "dQw4w9WgXcQ"
+        cache_set("title", vid, "T")
+        cache_set("segments", vid, {"segments": []})
+        cache_set("notes", f"{vid}-{content_hash('x')}", {"title": "T"})
+        cache_set("title", "otherVideo1", "Other")
+
+        assert invalidate_video(vid) == 3
+        assert cache_get("title", vid) is None
+        assert cache_get("title", "otherVideo1") == "Other"
+
+    def test_invalidate_rejects_unsafe_id(self):
+        assert invalidate_video("../x") == 0
+
+    def test_prune_expired(self):
+        cache_set("title", "expired0001", "E", ttl_seconds=-1)
+        cache_set("title", "fresh000001", "F")
+        assert prune_expired() == 1
+        assert cache_get("title", "fresh000001") == "F"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -2,9 +2,18 @@
 Unit tests for Gemini service functions.
 """
 
+import json
 import pytest
+import httpx
+from unittest.mock import AsyncMock, MagicMock, patch
 from app.models import ContentType
-from app.services.gemini import detect_content_type
+from app.services.gemini import (
+    call_gemini_api,
+    detect_content_type,
+    build_batch_jsonl,
+    parse_batch_results,
+    notes_from_batch_response,
+)
 
 
 class TestDetectContentType:
@@ -60,6 +69,191 @@ class TestDetectContentType:
         result = detect_content_type(transcript, "Some Video")
         assert result == ContentType.GENERAL
 
+    def test_priority_order_not_position(self):
+        """Test that a higher-priority type wins even if it appears later."""
+        transcript = "Welcome to today's lecture. Let me show you step by step."
+        assert detect_content_type(transcript, "Video") == ContentType.TUTORIAL
+
+    def test_overlapping_phrases(self):
+        """Test that a phrase starting inside another type's phrase is still seen."""
+        assert detect_content_type("welcome to the show to learn", "Video") == ContentType.TUTORIAL
+
+    def test_only_transcript_head_inspected(self):
+        """Test that cues past the first 5000 characters are ignored."""
+        transcript = "x" * 5000 + " welcome to today's lecture"
+        assert detect_content_type(transcript, "Video") == ContentType.GENERAL
+
+
+class TestSampleTranscript:
+    """Tests for fitting long transcripts into the prompt budget."""
+
+    def test_short_transcript_untouched(self):
+        from app.services.gemini import _sample_transcript
+        assert _sample_transcript("short", max_chars=100) == "short"
+
+    def test_keeps_head_middle_and_tail(self):
+        from app.services.gemini import _sample_transcript, _OMITTED_MARKER
+        transcript = "A" * 400 + "M" * 200 + "Z" * 400
+        head, middle, tail = _sample_transcript(transcript, max_chars=100).split(_OMITTED_MARKER)
+        assert (head, middle, tail) == ("A" * 60, "M" * 20, "Z" * 20)
+
+    def test_cuts_snap_to_whitespace(self):
+        from app.services.gemini import _sample_transcript, _OMITTED_MARKER
+        transcript = "".join(f"\n[{i:02d}:00] word{i} more" for i in range(100))
+        pieces = _sample_transcript(transcript, max_chars=300).split(_OMITTED_MARKER)
+        words = set(transcript.split())
+        for piece in pieces:
+            assert piece and set(piece.split()) <= words  # Only whole words and markers
+
+    def test_long_timestamped_prompt_keeps_instructions(self):
+        from app.models import TranscriptSegment
+        from app.services import gemini
+        segments = [TranscriptSegment(f"word{i} " * 20, i * 5, i * 5 + 5) for i in range(3000)]
+        with patch.object(gemini._sample_transcript, "__defaults__", (20000,)):
+            prompt, _ = gemini.prepare_segments_prompt(segments, "T")
+
+        assert len(prompt) < 30000
+        assert "word2999" in prompt  # The end of the video survives
+        assert '"questionsRaised"' in prompt  # And so does the output format after it
+
+
+def _response_with_text(text: str) -> dict:
+    return {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+
+
+class TestReportedContentType:
+    """Tests for taking contentType from the model's own output."""
+
+    def _parse(self, content_type):
+        from app.services.gemini import _parse_segments_notes
+        doc = json.dumps({"title": "T", "overview": "O", "contentType": content_type})
+        return _parse_segments_notes(_response_with_text(doc), ContentType.LECTURE).content_type
+
+    def test_model_classification_wins(self):
+        assert self._parse("Interview") == ContentType.INTERVIEW
+
+    def test_unknown_value_keeps_hint(self):
+        assert self._parse("detected content type") == ContentType.LECTURE
+        assert self._parse(None) == ContentType.LECTURE
+
+    def test_fenced_output_parsed(self):
+        from app.services.gemini import _strip_code_fence
+        assert _strip_code_fence('```json\n{"a": 1}\n```') == '{"a": 1}'
+        assert _strip_code_fence('```\n{"a": 1}```') == '{"a": 1}'
+        assert _strip_code_fence('{"a": "```"}') == '{"a": "```"}'
+
+
+class TestBatchApi:
+    """Tests for Gemini batch JSONL building and result parsing."""
+
+    def test_jsonl_has_one_line_per_prompt(self):
+        payload = build_batch_jsonl(["first", "second"])
+        lines = payload.decode("utf-8").strip().split("\n")
+        assert len(lines) == 2
+
+    def test_jsonl_line_shape(self):
+        line = json.loads(build_batch_jsonl(["hello"]).decode("utf-8"))
+        assert line["key"] == "0"
+        assert line["request"]["contents"][0]["parts"][0]["text"] == "hello"
+        assert "generationConfig" in line["request"]
+
+    def test_parse_results_keyed_by_index(self):
+        payload = (
+            json.dumps({"key": "1", "response": _response_with_text("b")}) + "\n" +
+            json.dumps({"key": "0", "response": _response_with_text("a")}) + "\n"
+        ).encode("utf-8")
+        results = parse_batch_results(payload)
+        assert results[0]["candidates"][0]["content"]["parts"][0]["text"] == "a"
+        assert results[1]["candidates"][0]["content"]["parts"][0]["text"] == "b"
+
+    def test_parse_results_error_maps_to_none(self):
+        payload = json.dumps({"key": "0", "error": {"code": 400}}).encode("utf-8")
+        assert parse_batch_results(payload) == {0: None}
+
+    def test_notes_from_valid_response(self):
+        response = _response_with_text(json.dumps({"title": "T", "overview": "O"}))
+        notes = notes_from_batch_response(response, ContentType.LECTURE, "Fallback")
+        assert notes.title == "T"
+        assert notes.content_type == ContentType.LECTURE
+
+    def test_notes_from_missing_response(self):
+        with pytest.raises(ValueError):
+            notes_from_batch_response(None, ContentType.LECTURE, "Fallback")
+
+    def test_notes_from_malformed_response(self):
+        with pytest.raises(ValueError):
+            notes_from_batch_response(_response_with_text("not json"), ContentType.LECTURE, "X")
+
+
+class TestCallGeminiApi:
+    """Tests for retry behaviour of the async generateContent call."""
+
+    def _response(self, status, body=b"{}"):
+        request = httpx.Request("POST", "https://example.test")
+        return httpx.Response(status, content=body, request=request)
+
+    def test_encoded_body_matches_dict(self):
+        from app.services.gemini import _build_request_body, _encode_request_body
+        prompt = 'Quote " backslash \\ newline \n 한국어'
+        assert json.loads(_encode_request_body(prompt)) == _build_request_body(prompt)
+
+    @pytest.mark.asyncio
+    async def test_retries_rate_limit_without_blocking(self):
+        http = MagicMock()
+        http.post = AsyncMock(side_effect=[self._response(429), self._response(200, b'{"ok": true}')])
+        with patch("app.services.gemini._async_http", http), \
+             patch("app.services.gemini.asyncio.sleep", new=AsyncMock()) as sleep:
+            result = await call_gemini_api("prompt")
+
+        assert result == {"ok": True}
+        assert http.post.await_count == 2
+        sleep.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_client_error_not_retried(self):
+        http = MagicMock()
+        http.post = AsyncMock(return_value=self._response(400))
+        with patch("app.services.gemini._async_http", http):
+            with pytest.raises(httpx.HTTPStatusError):
+                await call_gemini_api("prompt")
+
+        assert http.post.await_count == 1
+
+
+class TestNotesCache:
+    """Tests for cached notes in process_long_transcript (Gemini mocked)."""
+
+    @pytest.fixture(autouse=True)
+    def tmp_cache_dir(self, tmp_path, monkeypatch):
+        from app.services import cache
+        monkeypatch.setattr(cache, "_cache_dir", str(tmp_path))
+
+    async def _run(self):
+        from app.models import LectureNotes, TranscriptSegment
+        from app.services.gemini import process_long_transcript
+        segments = [TranscriptSegment("hello world", 0, 30)]
+        notes = LectureNotes(title="T", content_type=ContentType.GENERAL, overview="O", key_insights=[])
+        with patch("app.services.gemini._process_segments", new=AsyncMock(return_value=notes)) as generate:
+            await process_long_transcript(segments, "T", "dQw4w9WgXcQ")
+        return generate.await_count
+
+    @pytest.mark.asyncio
+    async def test_repeat_served_from_cache(self):
+        assert await self._run() == 1
+        assert await self._run() == 0
+
+    @pytest.mark.asyncio
+    async def test_version_bump_invalidates(self):
+        await self._run()
+        with patch("app.services.gemini.NOTES_CACHE_VERSION", "v-next"):
+            assert await self._run() == 1
+
+    @pytest.mark.asyncio
+    async def test_model_change_invalidates(self):
+        await self._run()
+        with patch("app.services.gemini.GEMINI_MODEL", "gemini-next"):
+            assert await self._run() == 1
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -230,3 +230,22 @@ class TestCondenseSummary:
 
         assert result["title"] == "Untitled"
         assert result["videoId"] == ""
+
+
+# ============ Supabase Client ============
+
+class TestSupabaseClient:
+    def test_failed_creation_retried(self, monkeypatch):
+        from unittest.mock import MagicMock, patch
+        from app.services import knowledge_map
+
+        client = MagicMock()
+        monkeypatch.setattr(knowledge_map, "_supabase", None)
+        monkeypatch.setattr(knowledge_map, "SUPABASE_URL", "https://x.supabase.co")
+        monkeypatch.setattr(knowledge_map, "SUPABASE_KEY", "key")
+        with patch("supabase.create_client", side_effect=[RuntimeError("dns"), client]) as create:
+            assert knowledge_map._get_supabase() is None
+            assert knowledge_map._get_supabase() is client
+            assert knowledge_map._get_supabase() is client
+
+        assert create.call_count == 2
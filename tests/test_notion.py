@@ -0,0 +1,191 @@
+"""
+Tests for Notion page construction and batching.
+
+The Notion client is mocked; these tests check the block payloads and the
+order of API calls, not the network.
+"""
+
+import orjson
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.notion import (
+    create_notion_page, NOTION_MAX_BLOCKS_PER_REQUEST, _notion_for,
+    _bullet, _text, _fill, _BULLET_JSON, exchange_oauth_code, _append_blocks, _append_batch, _create_page,
+    _today_iso, _TokenBucket,
+)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_clients():
+    """Drop cached clients so each test sees its own mock."""
+    _notion_for.cache_clear()
+    yield
+    _notion_for.cache_clear()
+
+
+def _mock_http():
+    page = MagicMock(content=b'{"id": "page-1", "url": "https://notion.so/page-1"}')
+    http = MagicMock()
+    http.post = AsyncMock(return_value=page)
+    http.patch = AsyncMock(return_value=MagicMock(content=b"{}"))
+    return http
+
+
+class TestCreateNotionPage:
+    """Tests for the legacy summary page."""
+
+    @pytest.mark.asyncio
+    async def test_small_page_single_request(self):
+        http = _mock_http()
+        with patch("app.services.notion._notion_http", http):
+            url = await create_notion_page("tok", "db", "Title", "https://youtu.be/x", "One liner", ["a", "b"], ["c"])
+
+        assert url == "https://notion.so/page-1"
+        body = orjson.loads(http.post.call_args.kwargs["content"])
+        assert body["parent"] == {"database_id": "db"}
+        assert body["properties"]["Title"]["title"][0]["text"]["content"] == "Title"
+        # callout, divider, heading, 2 bullets, divider, heading, 1 bullet
+        assert len(body["children"]) == 8
+        assert body["children"][0]["callout"]["rich_text"][0]["text"]["content"] == "One liner"
+        assert http.post.call_args.kwargs["headers"]["Authorization"] == "Bearer tok"
+        http.patch.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_overflow_appended_in_order(self):
+        http = _mock_http()
+        takeaways = [f"t{i}" for i in range(250)]
+        with patch("app.services.notion._notion_http", http):
+            await create_notion_page("tok", "db", "Title", "https://youtu.be/x", "One liner", takeaways, [])
+
+        first = orjson.loads(http.post.call_args.kwargs["content"])["children"]
+        appends = [orjson.loads(c.kwargs["content"])["children"] for c in http.patch.call_args_list]
+        assert len(first) == NOTION_MAX_BLOCKS_PER_REQUEST
+        assert all(len(batch) <= NOTION_MAX_BLOCKS_PER_REQUEST for batch in appends)
+        assert all(c.args[0] == "/blocks/page-1/children" for c in http.patch.call_args_list)
+
+        texts = [
+            b["bulleted_list_item"]["rich_text"][0]["text"]["content"]
+            for b in first + [blk for batch in appends for blk in batch]
+            if b["type"] == "bulleted_list_item"
+        ]
+        assert texts == takeaways
+
+    def test_template_matches_factory(self):
+        text = 'Quotes " and \\ backslashes, emoji 🎯'
+        assert orjson.loads(_fill(_BULLET_JSON, text)) == _bullet(text)
+
+
+class TestClientReuse:
+    """Tests for the per-token client cache."""
+
+    def test_same_token_reuses_client(self):
+        assert _notion_for("tok-a") is _notion_for("tok-a")
+        assert _notion_for("tok-a") is not _notion_for("tok-b")
+
+
+class TestAppendBlocks:
+    """Tests for batched appends with rate-limit retries."""
+
+    def _rate_limited(self):
+        import httpx
+        from notion_client import APIErrorCode, APIResponseError
+        return APIResponseError(httpx.Response(429, headers={"retry-after": "0"}), "slow down", APIErrorCode.RateLimited)
+
+    def test_rate_limited_batch_retried(self):
+        notion = MagicMock()
+        notion.blocks.children.append.side_effect = [self._rate_limited(), None, None]
+        blocks = [_bullet(str(i)) for i in range(150)]
+        with patch("app.services.notion.time.sleep") as sleep:
+            assert _append_blocks(notion, "page-1", blocks) == 150
+
+        sleep.assert_called_once_with(0.0)
+        sent = [c.kwargs["children"] for c in notion.blocks.children.append.call_args_list]
+        assert [len(b) for b in sent] == [100, 100, 50]
+
+    def test_stops_after_failed_batch(self):
+        notion = MagicMock()
+        notion.blocks.children.append.side_effect = [None, RuntimeError("boom")]
+        blocks = [_bullet(str(i)) for i in range(250)]
+        assert _append_blocks(notion, "page-1", blocks) == 100
+        assert notion.blocks.children.append.call_count == 2
+
+
+class TestBlockFactories:
+    """Tests for the shared block builders."""
+
+    def test_non_string_content_stringified(self):
+        assert _bullet(42)["bulleted_list_item"]["rich_text"][0]["text"]["content"] == "42"
+
+    def test_string_content_passed_through(self):
+        text = "point"
+        assert _bullet(text)["bulleted_list_item"]["rich_text"][0]["text"]["content"] is text
+
+    def test_text_run_link_and_annotations(self):
+        assert _text("a") == {"type": "text", "text": {"content": "a"}}
+        assert _text("[1:00] ", "https://youtu.be/x?t=60", color="blue") == {
+            "type": "text",
+            "text": {"content": "[1:00] ", "link": {"url": "https://youtu.be/x?t=60"}},
+            "annotations": {"color": "blue"},
+        }
+
+
+class TestTokenBucket:
+    """Tests for pacing appends under Notion's request rate."""
+
+    def test_burst_then_paced(self):
+        bucket = _TokenBucket(rate=2.0, capacity=2)
+        with patch("app.services.notion.time.sleep") as sleep:
+            bucket.acquire()
+            bucket.acquire()
+            sleep.assert_not_called()
+            bucket.acquire()
+            bucket.acquire()
+
+        waits = [c.args[0] for c in sleep.call_args_list]
+        assert waits[0] == pytest.approx(0.5, abs=0.05)
+        assert waits[1] == pytest.approx(1.0, abs=0.05)
+
+    def test_page_create_and_appends_share_token_bucket(self):
+        first, second = MagicMock(), MagicMock()  # e.g. a client evicted from _notion_for, and its replacement
+        first.options.auth = second.options.auth = "tok-bucket"
+        bucket = MagicMock()
+        with patch("app.services.notion._rate_limiter", return_value=bucket) as limiter:
+            _create_page(first, parent={})
+            _append_batch(second, "page-1", [])
+
+        assert [c.args[0] for c in limiter.call_args_list] == ["tok-bucket", "tok-bucket"]
+        assert bucket.acquire.call_count == 2
+        second.blocks.children.append.assert_called_once()
+
+
+class TestOAuth:
+    """Tests for the OAuth token exchange on the shared pool."""
+
+    @pytest.mark.asyncio
+    async def test_code_exchanged_with_basic_auth(self):
+        http = _mock_http()
+        with patch("app.services.notion._notion_http", http):
+            await exchange_oauth_code("code-1", "https://app/cb", "client", "secret")
+
+        http.post.assert_awaited_once()
+        assert http.post.call_args.args == ("/oauth/token",)
+        assert http.post.call_args.kwargs["headers"]["Authorization"] == "Basic Y2xpZW50OnNlY3JldA=="
+        assert http.post.call_args.kwargs["json"] == {
+            "grant_type": "authorization_code", "code": "code-1", "redirect_uri": "https://app/cb",
+        }
+
+
+class TestTodayIso:
+    """Tests for the cached "Date Added" value."""
+
+    def test_matches_today_and_reuses_value(self):
+        from datetime import date
+        assert _today_iso() == date.today().isoformat()
+        with patch("app.services.notion.date") as mock_date:
+            _today_iso()
+        mock_date.today.assert_not_called()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -48,6 +48,23 @@ class TestFriendlyErrors:
         result = get_friendly_error("Video unavailable - private")
         assert "available" in result.lower() or "private" in result.lower()
 
+    def test_invalid_url_any_order(self):
+        from app.routers.summarize import get_friendly_error
+        assert get_friendly_error("URL is invalid") == get_friendly_error("Invalid URL")
+        assert "URL" in get_friendly_error("URL is invalid")
+
+    def test_priority_follows_category_order(self):
+        from app.routers.summarize import get_friendly_error
+        # Connection appears first in the text but "no transcript" ranks higher
+        result = get_friendly_error("connection reset, invalid: no transcript at url")
+        assert result == get_friendly_error("No transcript found")
+
+    def test_overlapping_phrases(self):
+        from app.routers.summarize import get_friendly_error
+        # "no transcript" overlaps "transcriptsdisabled", which ranks higher
+        result = get_friendly_error("no transcriptsdisabled")
+        assert result == get_friendly_error("TranscriptsDisabled")
+
     def test_unknown_error_passthrough(self):
         from app.routers.summarize import get_friendly_error
         result = get_friendly_error("Some completely unknown error xyz")
@@ -6,6 +6,9 @@ Verifies that routes are correctly wired, return proper status codes,
 and produce valid response shapes.
 """
 
+import asyncio
+from unittest.mock import patch
+
 import pytest
 from fastapi.testclient import TestClient
 from main import app
@@ -92,10 +95,257 @@ class TestAuthRequiredEndpoints:
         )
         assert response.status_code in (401, 403, 422)
 
+    def test_summarize_bulk_requires_auth(self):
+        response = client.post(
+            "/summarize/bulk",
+            json={"urls": ["https://youtu.be/dQw4w9WgXcQ"]}
+        )
+        assert response.status_code in (401, 403, 422)
+
+    def test_summarize_batch_requires_auth(self):
+        response = client.post(
+            "/summarize/batch",
+            json={"requests": [{"url": "https://youtu.be/dQw4w9WgXcQ"}]}
+        )
+        assert response.status_code in (401, 403, 422)
+
     def test_summaries_requires_auth(self):
         response = client.get("/summaries")
         assert response.status_code in (401, 403, 422)
 
 
+class TestBatchProcessing:
+    """Tests for the concurrent /summarize/batch runner."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        from app.models import SummarizeRequest
+        from app.routers.summarize import process_batch_jobs, BATCH_CONCURRENCY
+
+        active = 0
+        peak = 0
+        done = []
+
+        async def fake_job(job_id, **kwargs):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            done.append(job_id)
+
+        jobs = [(f"job-{i}", SummarizeRequest(url=f"https://youtu.be/{i:011d}"), f"{i:011d}") for i in range(20)]
+        with patch("app.routers.summarize.process_summarization_job", side_effect=fake_job):
+            await process_batch_jobs(jobs, {"id": "user-1"})
+
+        assert sorted(done) == sorted(job_id for job_id, _, _ in jobs)
+        assert peak == BATCH_CONCURRENCY
+
+
+class TestCoalesce:
+    """Tests for in-flight request coalescing."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_run(self):
+        from app.routers.summarize import coalesce, _inflight
+
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "notes"
+
+        results = await asyncio.gather(*(coalesce("notes:abc", work) for _ in range(5)))
+
+        assert results == ["notes"] * 5
+        assert calls == 1
+        assert "notes:abc" not in _inflight
+
+    @pytest.mark.asyncio
+    async def test_failure_reaches_every_waiter(self):
+        from app.routers.summarize import coalesce, _inflight
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            *(coalesce("transcript:abc", work) for _ in range(3)), return_exceptions=True
+        )
+
+        assert all(isinstance(r, ValueError) for r in results)
+        assert "transcript:abc" not in _inflight
+
+    @pytest.mark.asyncio
+    async def test_follower_takes_over_when_leader_cancelled(self):
+        from app.routers.summarize import coalesce
+
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return calls
+
+        leader = asyncio.create_task(coalesce("transcript:xyz", work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(coalesce("transcript:xyz", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        assert await follower == 2
+        assert leader.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_transcripts_fetched_on_dedicated_pool(self):
+        import threading
+        from app.routers.summarize import _fetch_transcript
+
+        def fake_fetch(url):
+            return [], threading.current_thread().name, "Title"
+
+        with patch("app.routers.summarize.get_transcript_with_timestamps", side_effect=fake_fetch):
+            _, thread_name, _ = await _fetch_transcript("https://youtu.be/dQw4w9WgXcQ")
+
+        assert thread_name.startswith("yt-transcript")
+
+
+class TestNotionFailFast:
+    """Tests for the Notion database check that runs alongside the transcript fetch."""
+
+    @pytest.mark.asyncio
+    async def test_revoked_database_fails_before_gemini(self):
+        import time
+        from app.routers.summarize import process_summarization_job
+
+        def slow_transcript(url):
+            time.sleep(0.05)
+            return [], "text", "Title"
+
+        user = {"id": "user-1", "notion_access_token": "tok", "notion_database_id": "db"}
+        with patch("app.routers.summarize.update_job") as update_job, \
+             patch("app.routers.summarize.get_transcript_with_timestamps", side_effect=slow_transcript), \
+             patch("app.routers.summarize.check_database_access",
+                   side_effect=Exception("Notion database not accessible (unauthorized). Please reconnect Notion.")), \
+             patch("app.routers.summarize.process_long_transcript") as generate:
+            await process_summarization_job("job-12345678", user, "https://youtu.be/dQw4w9WgXcQ", None, "dQw4w9WgXcQ")
+
+        generate.assert_not_called()
+        final = update_job.call_args.kwargs
+        assert final["stage"] == "Failed"
+        assert "reconnect Notion" in final["error"]
+
+    @pytest.mark.asyncio
+    async def test_ingest_checks_database_before_gemini(self):
+        from app.models import SourceType
+        from app.routers.summarize import process_ingest_job
+
+        user = {"id": "user-1", "notion_access_token": "tok", "notion_database_id": "db"}
+        with patch("app.routers.summarize.update_job") as update_job, \
+             patch("app.routers.summarize.extract_content", return_value=([], "Title", SourceType.ARTICLE)), \
+             patch("app.routers.summarize.check_database_access",
+                   side_effect=Exception("Notion database not accessible (unauthorized). Please reconnect Notion.")), \
+             patch("app.routers.summarize.process_long_transcript") as generate:
+            await process_ingest_job("job-12345678", user, "https://example.com/post", SourceType.ARTICLE)
+
+        generate.assert_not_called()
+        assert update_job.call_args.kwargs["stage"] == "Failed"
+
+    def test_other_task_failures_logged(self, caplog):
+        from app.routers.summarize import _raise_first
+
+        eg = ExceptionGroup("tasks", [ValueError("extract broke"), RuntimeError("notion broke")])
+        with pytest.raises(ValueError, match="extract broke"):
+            _raise_first("job-12345678", eg)
+        assert "notion broke" in caplog.text
+
+
+class TestSummarizationJob:
+    """Tests for process_summarization_job through the real notes cache (Gemini mocked)."""
+
+    @pytest.mark.asyncio
+    async def test_client_transcript_without_title(self, tmp_path, monkeypatch):
+        from unittest.mock import AsyncMock
+        from app.models import ContentType, LectureNotes
+        from app.routers.summarize import process_summarization_job
+        from app.services import cache
+
+        monkeypatch.setattr(cache, "_cache_dir", str(tmp_path))
+        notes = LectureNotes(title="T", content_type=ContentType.GENERAL, overview="O", key_insights=[])
+        with patch("app.routers.summarize.update_job") as update_job, \
+             patch("app.services.gemini._process_segments", new=AsyncMock(return_value=notes)) as generate, \
+             patch("app.routers.summarize.save_notes", return_value=(None, "summary-1")):
+            await process_summarization_job(
+                "job-12345678", {"id": "user-1"}, "https://youtu.be/dQw4w9WgXcQ",
+                "hello world transcript", "dQw4w9WgXcQ",
+            )
+
+        generate.assert_awaited_once()
+        assert generate.await_args.args[1] is None  # The title really was missing
+        final = update_job.call_args.kwargs
+        assert final["stage"] == "Complete", final.get("error")
+        assert final["result"]["summaryId"] == "summary-1"
+
+
+
+class TestBulkJob:
+    """Tests for process_bulk_job and resuming it after a restart (Gemini mocked)."""
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_item_not_saved(self):
+        import orjson
+        from unittest.mock import AsyncMock
+        from app.models import ContentType
+        from app.routers.summarize import process_bulk_job
+
+        good = {"candidates": [{"content": {"parts": [{"text": orjson.dumps({"title": "T", "overview": "O"}).decode()}]}}]}
+        with patch("app.routers.summarize.update_job") as update_job, \
+             patch("app.routers.summarize._fetch_transcript", new=AsyncMock(return_value=([], "", "Title"))), \
+             patch("app.routers.summarize.prepare_segments_prompt", return_value=("prompt", ContentType.LECTURE)), \
+             patch("app.routers.summarize.submit_batch", return_value="batches/1"), \
+             patch("app.routers.summarize.get_batch", return_value={"metadata": {"state": "BATCH_STATE_SUCCEEDED"}}), \
+             patch("app.routers.summarize.download_batch_results", return_value={0: None, 1: good}), \
+             patch("app.routers.summarize.save_notes", return_value=(None, "summary-1")) as save_notes:
+            await process_bulk_job(
+                "job-12345678", {"id": "user-1"},
+                ["https://youtu.be/aaaaaaaaaaa", "https://youtu.be/bbbbbbbbbbb"],
+            )
+
+        save_notes.assert_called_once()  # No placeholder page (or quota charge) for the failed item
+        items = update_job.call_args.kwargs["result"]["items"]
+        assert items[0]["error"] and items[0]["summaryId"] is None
+        assert items[1]["error"] is None and items[1]["summaryId"] == "summary-1"
+
+    @pytest.mark.asyncio
+    async def test_idle_job_resumed(self):
+        from datetime import datetime, timedelta
+        from unittest.mock import AsyncMock
+        from app.routers.summarize import resume_bulk_jobs, BULK_WAITING_STAGE
+        from app.services.jobs import JobStatus, create_job, update_job, _fallback_jobs
+
+        items = [{"url": "u", "video_id": "v", "title": "T", "error": None, "content_type": "lecture", "prompt_index": 0}]
+        with patch("app.services.jobs._get_supabase", return_value=None):
+            orphan = await create_job("user-1", "summarize-bulk")
+            await update_job(
+                orphan.id, status=JobStatus.PROCESSING, stage=BULK_WAITING_STAGE,
+                result={"batchId": "batches/1", "deadline": 123.0, "items": items},
+            )
+            live = await create_job("user-1", "summarize-bulk")
+            await update_job(live.id, status=JobStatus.PROCESSING, stage=BULK_WAITING_STAGE, result={})
+            _fallback_jobs[orphan.id].updated_at = datetime.utcnow() - timedelta(hours=1)
+
+            with patch("app.routers.summarize._load_user_profile", new=AsyncMock(return_value={"id": "user-1"})), \
+                 patch("app.routers.summarize._finish_bulk_job", new=AsyncMock()) as finish:
+                assert await resume_bulk_jobs() == 1
+                await asyncio.sleep(0)
+
+        _fallback_jobs.pop(orphan.id)
+        _fallback_jobs.pop(live.id)
+        finish.assert_awaited_once_with(orphan.id, {"id": "user-1"}, "batches/1", 123.0, items)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -2,8 +2,16 @@
 Unit tests for YouTube service functions.
 """
 
+import io
+import json
+
+import httpx
 import pytest
-from app.services.youtube import extract_video_id
+from unittest.mock import MagicMock, patch
+from app.services.youtube import (
+    extract_video_id, _collapse_whitespace, _join_words, _pick_caption_track, _json3_to_text,
+    _fetch_caption_entries, _download_json3,
+)
 
 
 class TestExtractVideoId:
@@ -80,5 +88,150 @@ class TestVideoIdEdgeCases:
         assert extract_video_id(url) == "dQw4w9WgXcQ"
 
 
+class TestInnertubeHelpers:
+    """Tests for InnerTube caption track selection and json3 flattening."""
+    
+    def test_prefers_manual_over_auto(self):
+        tracks = [
+            {"languageCode": "en", "kind": "asr", "baseUrl": "auto-en"},
+            {"languageCode": "en", "baseUrl": "manual-en"},
+        ]
+        assert _pick_caption_track(tracks) == "manual-en"
+    
+    def test_prefers_language_order(self):
+        tracks = [
+            {"languageCode": "ko", "baseUrl": "manual-ko"},
+            {"languageCode": "en", "kind": "asr", "baseUrl": "auto-en"},
+        ]
+        # Manual in any preferred language beats auto-generated
+        assert _pick_caption_track(tracks) == "manual-ko"
+    
+    def test_falls_back_to_any_track(self):
+        tracks = [{"languageCode": "xx", "baseUrl": "other"}]
+        assert _pick_caption_track(tracks) == "other"
+    
+    def test_no_tracks(self):
+        assert _pick_caption_track([]) is None
+    
+    def test_json3_to_text(self):
+        data = {"events": [
+            {"segs": [{"utf8": "Hello"}, {"utf8": "\n"}]},
+            {"tStartMs": 100},
+            {"segs": [{"utf8": "  world  "}]},
+        ]}
+        assert _json3_to_text(io.BytesIO(json.dumps(data).encode())) == "Hello world"
+    
+    def test_collapse_whitespace(self):
+        assert _collapse_whitespace("  a\n\tb   c\u00a0d ") == "a b c d"
+    
+    def test_join_words_matches_join_then_collapse(self):
+        texts = ["  Hello\n", "", "big   world ", "\tagain"]
+        assert _join_words(texts) == _collapse_whitespace(" ".join(texts)) == "Hello big world again"
+    
+    def test_json3_without_events(self):
+        assert _json3_to_text(io.BytesIO(b'{"wireMagic": "pb3"}')) == ""
+
+    def test_json3_streamed_from_pool(self):
+        body = json.dumps({"events": [{"segs": [{"utf8": "Hello "}, {"utf8": "there"}]}]}).encode()
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, stream=httpx.ByteStream(body)))
+        with patch("app.services.youtube._http", httpx.Client(transport=transport)):
+            assert _download_json3("https://www.youtube.com/api/timedtext?v=x&fmt=json3") == "Hello there"
+
+
+class TestCaptionEntries:
+    """Tests for youtube-transcript-api track selection (API mocked)."""
+
+    def _track(self, code, entries=None, error=None):
+        track = MagicMock(language_code=code, language=code, is_generated=False, is_translatable=False)
+        if error:
+            track.fetch.side_effect = error
+        else:
+            track.fetch.return_value.to_raw_data.return_value = entries or [{"text": code, "start": 0, "duration": 1}]
+        return track
+
+    def _run(self, transcript_list):
+        api = MagicMock()
+        api.return_value.list.return_value = transcript_list
+        with patch("youtube_transcript_api.YouTubeTranscriptApi", api):
+            return _fetch_caption_entries("dQw4w9WgXcQ")
+
+    def test_preferred_resolved_in_one_call(self):
+        from app.config import PREFERRED_LANGUAGES
+        ko = self._track("ko")
+        transcript_list = MagicMock()
+        transcript_list.__iter__ = lambda self: iter([ko])
+        transcript_list.find_transcript.return_value = ko
+
+        assert self._run(transcript_list) == [{"text": "ko", "start": 0, "duration": 1}]
+        transcript_list.find_transcript.assert_called_once_with(PREFERRED_LANGUAGES)
+
+    def test_any_track_when_no_preferred(self):
+        from youtube_transcript_api import NoTranscriptFound
+        sw = self._track("sw")
+        transcript_list = MagicMock()
+        transcript_list.__iter__ = lambda self: iter([sw])
+        transcript_list.find_transcript.side_effect = NoTranscriptFound("dQw4w9WgXcQ", ["en"], [])
+
+        assert self._run(transcript_list)[0]["text"] == "sw"
+
+    def test_disabled_returns_none(self):
+        from youtube_transcript_api import TranscriptsDisabled
+        api = MagicMock()
+        api.return_value.list.side_effect = TranscriptsDisabled("dQw4w9WgXcQ")
+        with patch("youtube_transcript_api.YouTubeTranscriptApi", api):
+            assert _fetch_caption_entries("dQw4w9WgXcQ") is None
+
+
+class TestVideoTitle:
+    """Tests for the in-process title memo (network and disk cache mocked)."""
+
+    def setup_method(self):
+        from app.services.youtube import forget_title
+        forget_title("dQw4w9WgXcQ")
+
+    def _oembed(self, body):
+        return httpx.Response(200, content=body, request=httpx.Request("GET", "https://www.youtube.com/oembed"))
+
+    def test_title_memoized(self):
+        from app.services.youtube import get_video_title
+        with patch("app.services.youtube.cache_get", return_value=None), \
+             patch("app.services.youtube.cache_set"), \
+             patch("app.services.youtube._http.get",
+                   return_value=self._oembed(b'{"title": "Never Gonna"}')) as get:
+            assert get_video_title("dQw4w9WgXcQ") == "Never Gonna"
+            assert get_video_title("dQw4w9WgXcQ") == "Never Gonna"
+
+        assert get.call_count == 1
+
+    def test_failure_not_memoized(self):
+        from app.services.youtube import get_video_title
+        with patch("app.services.youtube.cache_get", return_value=None), \
+             patch("app.services.youtube.cache_set"), \
+             patch("app.services.youtube._http.get",
+                   side_effect=[httpx.ConnectError("down"), self._oembed(b'{"title": "Back"}')]):
+            assert get_video_title("dQw4w9WgXcQ") == "Untitled Video"
+            assert get_video_title("dQw4w9WgXcQ") == "Back"
+
+    def test_title_fetched_while_transcript_downloads(self):
+        import threading
+        from app.services.youtube import _fetch_transcript_with_timestamps
+        title_started = threading.Event()
+
+        def fake_title(video_id):
+            title_started.set()
+            return "Never Gonna"
+
+        def fake_captions(video_id):
+            # Only returns if the title lookup is already running alongside it
+            assert title_started.wait(timeout=2)
+            return [{"text": "hello", "start": 0, "duration": 1}]
+
+        with patch("app.services.youtube.get_video_title", side_effect=fake_title), \
+             patch("app.services.youtube._fetch_caption_entries", side_effect=fake_captions):
+            segments, text, title = _fetch_transcript_with_timestamps("dQw4w9WgXcQ")
+
+        assert (text, title) == ("hello", "Never Gonna")
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])